@@ -0,0 +1,126 @@
+"""
+Deterministic generated fixtures of realistic size for the benchmark suite
+"""
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+ASSET_TYPES = [
+    ("OriginalFile", "video/quicktime"),
+    ("Mp4VideoFile", "video/mp4"),
+    ("MdMp4VideoFile", "video/mp4"),
+    ("HdMp4VideoFile", "video/mp4"),
+    ("IphoneVideoFile", "video/mp4"),
+    ("StillImageFile", "image/jpeg"),
+    ("StoryboardFile", "image/jpeg"),
+]
+
+EPOCH = datetime(2015, 1, 1, tzinfo=timezone.utc)
+
+
+def _timestamp(rng) -> str:
+    return (EPOCH + timedelta(seconds=rng.randrange(10 ** 8))).isoformat()
+
+
+def media_data(rng: random.Random, media_id: int) -> dict:
+    hashed_id = f"{rng.getrandbits(40):010x}"
+    return {
+        "id": media_id,
+        "name": f"Lesson {media_id}: {rng.getrandbits(32):08x}",
+        "hashed_id": hashed_id,
+        "description": "<p>" + " ".join(f"word{rng.randrange(1000)}" for _ in range(30)) + "</p>",
+        "project": {"id": rng.randrange(1, 500), "name": "Course material", "hashed_id": "12345hdkbu"},
+        "type": "Video",
+        "section": "Trailers",
+        "status": "ready",
+        "progress": 1.0,
+        "thumbnail": {
+            "url": f"https://embed-ssl.wistia.com/deliveries/{hashed_id}.jpg?image_crop_resized=200x120",
+            "width": 200,
+            "height": 120,
+        },
+        "duration": round(rng.uniform(10, 3600), 3),
+        "created": _timestamp(rng),
+        "updated": _timestamp(rng),
+        "assets": [
+            {
+                "url": f"https://embed-ssl.wistia.com/deliveries/{rng.getrandbits(160):040x}.bin",
+                "width": 1280,
+                "height": 720,
+                "fileSize": rng.randrange(10 ** 5, 10 ** 9),
+                "contentType": content_type,
+                "type": asset_type,
+            }
+            for asset_type, content_type in ASSET_TYPES
+        ],
+        "embedCode": f'<iframe src="https://fast.wistia.net/embed/iframe/{hashed_id}"></iframe>',
+    }
+
+
+def media_page(per_page: int = 100, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    return json.dumps([media_data(rng, media_id) for media_id in range(1, per_page + 1)]).encode()
+
+
+def project_page(per_page: int = 100, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    projects = [
+        {
+            "id": project_id,
+            "name": f"Project {project_id}",
+            "hashed_id": f"{rng.getrandbits(40):010x}",
+            "mediaCount": rng.randrange(500),
+            "created": _timestamp(rng),
+            "updated": _timestamp(rng),
+            "anonymousCanUpload": False,
+            "anonymousCanDownload": False,
+            "public": bool(rng.getrandbits(1)),
+            "publicId": f"{rng.getrandbits(40):010x}",
+        }
+        for project_id in range(1, per_page + 1)
+    ]
+    return json.dumps(projects).encode()
+
+
+MEDIA_EVENT_TYPES = [
+    "media.created",
+    "media.processing",
+    "media.ready",
+    "media.failed",
+    "media.updated",
+    "media.deleted",
+]
+
+
+def webhook_delivery(event_count: int = 50, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    events = []
+    for _ in range(event_count):
+        event_type = rng.choice(MEDIA_EVENT_TYPES)
+        hashed_id = f"{rng.getrandbits(40):010x}"
+        if event_type == "media.deleted":
+            payload = {"media": {"id": hashed_id}}
+        else:
+            payload = {
+                "media": {
+                    "id": hashed_id,
+                    "name": f"Lesson {rng.getrandbits(32):08x}",
+                    "url": f"https://example.wistia.com/medias/{hashed_id}",
+                    "duration": round(rng.uniform(10, 3600), 3),
+                    "thumbnail": {"url": f"https://embed.wistia.com/deliveries/{hashed_id}.jpg"},
+                }
+            }
+            if event_type == "media.updated":
+                payload["previous_attributes"] = {"name": "Old name"}
+        events.append(
+            {
+                "uuid": f"{rng.getrandbits(128):032x}",
+                "type": event_type,
+                "payload": payload,
+                "metadata": {"account_id": "0sxav1wj8o"},
+                "generated_at": "2020-03-31T21:56:45Z",
+            }
+        )
+    delivery = {"hook": {"uuid": "a4ab9eb6-ab82-4dae-86f2-29f744f7d031"}, "events": events}
+    return json.dumps(delivery).encode()
@@ -0,0 +1,276 @@
+"""
+Benchmark runner for the client, schema and webhook hot paths
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --compare bench.json --threshold 0.1
+    python -m benchmarks.run --only parse_media_page --only validate_webhook_signature_64kb
+
+Each benchmark is timed over several repeats after a warm-up; results are written
+as JSON with environment details so runs from different releases can be compared.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import wistia
+from wistia.schema import Media, Project
+from wistia.webhooks import (
+    compute_signature_hash,
+    parse_webhook_event_delivery,
+    validate_webhook_signature,
+)
+
+from benchmarks import fixtures
+
+BENCHMARKS = {}
+
+
+def benchmark(items: int, repeat: int = 7):
+    """
+    Register a benchmark. The decorated function does the setup and returns the
+    callable to time; `items` is the number of records handled per call.
+    """
+
+    def decorator(setup):
+        BENCHMARKS[setup.__name__] = (setup, items, repeat)
+        return setup
+
+    return decorator
+
+
+@benchmark(items=100)
+def parse_media_page():
+    page = fixtures.media_page(per_page=100)
+
+    def run():
+        return [Media(media_data, strict=False) for media_data in json.loads(page)]
+
+    return run
+
+
+@benchmark(items=100)
+def parse_project_page():
+    page = fixtures.project_page(per_page=100)
+
+    def run():
+        return [Project(project_data, strict=False) for project_data in json.loads(page)]
+
+    return run
+
+
+@benchmark(items=100)
+def serialize_media_page_to_primitive():
+    medias = [Media(media_data, strict=False) for media_data in json.loads(fixtures.media_page(per_page=100))]
+
+    def run():
+        return json.dumps([media.to_primitive() for media in medias])
+
+    return run
+
+
+@benchmark(items=100)
+def serialize_media_page_jsonl():
+    import io
+
+    from wistia.serialize import write_jsonl
+
+    medias = [Media(media_data, strict=False) for media_data in json.loads(fixtures.media_page(per_page=100))]
+
+    def run():
+        return write_jsonl(io.BytesIO(), medias, reuse_raw=False)
+
+    return run
+
+
+@benchmark(items=50)
+def parse_webhook_event_delivery_50_events():
+    delivery = fixtures.webhook_delivery(event_count=50)
+    return lambda: parse_webhook_event_delivery(delivery)
+
+
+@benchmark(items=100, repeat=9)
+def validate_webhook_signature_64kb():
+    body = fixtures.webhook_delivery(event_count=150)[: 64 * 1024]
+    signature = compute_signature_hash(body, "secret")
+
+    def run():
+        for _ in range(100):
+            validate_webhook_signature(body, signature, "secret")
+
+    return run
+
+
+@benchmark(items=2000, repeat=3)
+def crawl_all_medias_over_http():
+    from wistia.fakeserver import FakeWistiaServer
+
+    server = FakeWistiaServer(random_seed=0)
+    server.store.seed(media_count=2000, project_count=20)
+    server.start()
+    client = server.client()
+
+    def run():
+        medias = []
+        for project in client.list_all_projects():
+            page = 1
+            while True:
+                medias_page = client.list_medias(project_id=project.id, page=page)
+                if not medias_page:
+                    break
+                medias.extend(medias_page)
+                page += 1
+        return medias
+
+    run.teardown = server.stop
+    return run
+
+
+def _crawl_server():
+    # Every response delayed by a typical API round trip, which a real crawl spends most of its time waiting on
+    from wistia.fakeserver import FakeWistiaServer, fixed_latency
+
+    server = FakeWistiaServer(latency=fixed_latency(0.1), random_seed=0)
+    server.store.seed(media_count=2000, project_count=20)
+    server.start()
+    return server
+
+
+@benchmark(items=2000, repeat=3)
+def crawl_all_medias_one_process():
+    server = _crawl_server()
+    client = server.client()
+
+    def run():
+        medias = []
+        for project in client.list_all_projects():
+            page = 1
+            while True:
+                medias_page = client.list_medias(project_id=project.id, page=page)
+                medias.extend(medias_page)
+                if len(medias_page) < 100:
+                    break
+                page += 1
+        return medias
+
+    run.teardown = server.stop
+    return run
+
+
+@benchmark(items=2000, repeat=3)
+def crawl_all_medias_multiprocess():
+    from wistia.crawl import crawl_account
+
+    server = _crawl_server()
+
+    def run():
+        return [
+            media
+            for page in crawl_account("fake", processes=8, base_url=server.url)
+            for media in page.medias
+        ]
+
+    run.teardown = server.stop
+    return run
+
+
+def time_benchmark(name: str, quick: bool = False) -> dict:
+    setup, items, repeat = BENCHMARKS[name]
+    if quick:
+        repeat = 1
+    run = setup()
+    try:
+        run()  # warm-up
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+    finally:
+        teardown = getattr(run, "teardown", None)
+        if teardown:
+            teardown()
+
+    median = statistics.median(timings)
+    return {
+        "name": name,
+        "items_per_call": items,
+        "repeat": repeat,
+        "min_s": min(timings),
+        "median_s": median,
+        "mean_s": statistics.mean(timings),
+        "stdev_s": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "items_per_s": items / median if median else None,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "wistiapy_version": wistia.__version__,
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """:return: descriptions of benchmarks slower than the baseline by more than `threshold`"""
+    baseline_by_name = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline_by_name.get(result["name"])
+        if not previous:
+            continue
+        change = result["median_s"] / previous["median_s"] - 1
+        if change > threshold:
+            regressions.append(f"{result['name']}: {change:+.1%} ({previous['median_s']:.6f}s -> {result['median_s']:.6f}s)")
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Run the wistiapy benchmark suite.")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before flagging a regression")
+    parser.add_argument("--quick", action="store_true", help="single repeat, for smoke testing")
+    options = parser.parse_args(args)
+
+    results = []
+    for name in options.only or BENCHMARKS:
+        result = time_benchmark(name, quick=options.quick)
+        results.append(result)
+        print(f"{name:45} median {result['median_s'] * 1000:10.3f} ms  {result['items_per_s']:12.1f} items/s")
+
+    report = {"environment": environment(), "results": results}
+    if options.output:
+        with open(options.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if options.compare:
+        with open(options.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), options.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
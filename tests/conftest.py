@@ -0,0 +1,3 @@
+# Also registered through the package's pytest11 entry point once installed;
+# imported here so the suite runs from a source checkout too
+from wistia.pytest_plugin import fake_wistia_server  # noqa: F401
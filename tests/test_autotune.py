@@ -0,0 +1,74 @@
+import json
+
+from wistia.autotune import PageSettings, PageTuner
+from wistia.fakeserver import FakeWistiaServer, fixed_latency
+from wistia.hedging import Hedger
+
+
+def expected_hashed_ids(server):
+    return [
+        media.hashed_id
+        for page in range(1, 5)
+        for media in server.store.list_medias(sort_by="created", page=page, per_page=100)
+    ]
+
+
+def test_tuned_listing_yields_every_record_once(fake_wistia_server, tmp_path):
+    tuner = PageTuner(str(tmp_path / "pagination.json"), max_workers=4, per_page_steps=(10, 20, 50))
+    client = fake_wistia_server.client()
+    medias = list(tuner.iter_records(client, "medias", sort_by="created"))
+    assert [media.hashed_id for media in medias] == expected_hashed_ids(fake_wistia_server)
+    assert client.instrumentation == []
+
+    projects = list(tuner.iter_records(client, "projects"))
+    assert len(projects) == 3
+
+
+def test_tuned_settings_are_saved_and_reused(fake_wistia_server, tmp_path):
+    state_path = str(tmp_path / "pagination.json")
+    tuner = PageTuner(state_path, per_page_steps=(10, 20, 50))
+    list(tuner.iter_records(fake_wistia_server.client(), "medias", sort_by="created"))
+
+    with open(state_path) as state_file:
+        saved = json.load(state_file)["medias"]
+    assert saved["per_page"] in (10, 20, 50)
+    assert 1 <= saved["workers"] <= 8
+    assert saved["records_per_second"] > 0
+    assert saved["bytes_per_page"] > 0
+    assert PageTuner(state_path).settings("medias") == PageSettings(saved["per_page"], saved["workers"])
+
+
+def test_page_sizes_are_measured_through_hedged_requests(fake_wistia_server):
+    tuner = PageTuner(per_page_steps=(10, 20))
+    hedger = Hedger(min_samples=1, max_extra=1.0)
+    hedger.observe("medias.json", 5.0)  # every request may be hedged, so none runs on the fetching thread
+    client = fake_wistia_server.client(hedging=hedger)
+    list(tuner.iter_records(client, "medias", sort_by="created"))
+    client.close()
+    assert tuner.state["medias"]["bytes_per_page"] > 0
+
+
+def test_page_sizes_only_change_on_page_boundaries():
+    tuner = PageTuner(per_page_steps=(10, 20, 50, 100))
+    neighbours = tuner._neighbours(PageSettings(20, 1), offset=60)
+    assert PageSettings(50, 1) not in neighbours
+    assert PageSettings(10, 1) in neighbours
+    assert PageSettings(50, 1) in tuner._neighbours(PageSettings(20, 1), offset=100)
+
+
+def test_rate_limited_rounds_are_retried_with_fewer_workers(tmp_path):
+    with FakeWistiaServer(rate_limit_rate=0.2, retry_after=0, random_seed=1) as server:
+        server.store.seed(media_count=120, project_count=1)
+        tuner = PageTuner(max_workers=4, per_page_steps=(10, 20))
+        medias = list(tuner.iter_records(server.client(), "medias", sort_by="created"))
+        assert server.fault_count > 0
+        assert [media.hashed_id for media in medias] == expected_hashed_ids(server)
+
+
+def test_concurrency_is_tuned_up_when_latency_dominates():
+    with FakeWistiaServer(latency=fixed_latency(0.05)) as server:
+        server.store.seed(media_count=600, project_count=1)
+        tuner = PageTuner(max_workers=4, per_page_steps=(10,))
+        tuner.state["medias"] = {"per_page": 10, "workers": 1}
+        list(tuner.iter_records(server.client(), "medias", sort_by="created"))
+    assert tuner.state["medias"]["workers"] > 1
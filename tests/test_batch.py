@@ -0,0 +1,105 @@
+import pytest
+import requests
+import responses
+
+from wistia.batch import BatchExecutor, RateLimiter
+from wistia.client import WistiaClient
+from wistia.fakeserver import FakeWistiaServer
+from wistia.instrumentation import MetricsRegistry
+
+
+@responses.activate
+def test_update_media_sends_only_given_fields():
+    responses.add(responses.PUT, "https://api.wistia.com/v1/medias/abc.json", json={}, status=200)
+    WistiaClient().update_media("abc", name="New name")
+    assert responses.calls[0].request.body == "name=New+name"
+
+
+@responses.activate
+def test_copy_media_hits_correct_endpoint():
+    responses.add(responses.POST, "https://api.wistia.com/v1/medias/abc/copy.json", json={}, status=201)
+    WistiaClient().copy_media("abc", project_id="xyz")
+    assert responses.calls[0].request.body == "project_id=xyz"
+
+
+@responses.activate
+def test_create_project_encodes_booleans():
+    responses.add(responses.POST, "https://api.wistia.com/v1/projects.json", json={}, status=201)
+    WistiaClient().create_project("Course", public=True)
+    assert responses.calls[0].request.body == "name=Course&public=true"
+
+
+@pytest.fixture
+def executor(fake_wistia_server):
+    return BatchExecutor(fake_wistia_server.client(), max_workers=4, requests_per_second=None)
+
+
+def test_batch_move_and_collect_errors(fake_wistia_server, executor):
+    store = fake_wistia_server.store
+    target = store.create_project("Target")
+    hashed_ids = [media.hashed_id for media in store.list_medias(per_page=30)]
+
+    result = executor.run("move_media", hashed_ids + ["missing"], project_id=target.hashed_id)
+
+    assert len(result.succeeded) == 30
+    assert list(result.failed) == ["missing"]
+    assert result.failed["missing"].response.status_code == 404
+    assert len(store.list_medias(project_id=target.id)) == 30
+    assert not any(hashed_id in store.medias for hashed_id in hashed_ids)
+
+
+def test_batch_dry_run_changes_nothing(fake_wistia_server, executor):
+    hashed_ids = [media.hashed_id for media in fake_wistia_server.store.list_medias(per_page=10)]
+    result = executor.run("delete_media", hashed_ids, dry_run=True)
+    assert result.planned == hashed_ids
+    assert not result.succeeded
+    assert all(hashed_id in fake_wistia_server.store.medias for hashed_id in hashed_ids)
+
+
+def test_batch_retries_rate_limited_requests():
+    calls = []
+
+    def flaky(hashed_id):
+        calls.append(hashed_id)
+        if len(calls) == 1:
+            response = requests.Response()
+            response.status_code = 429
+            response.headers["Retry-After"] = "0"
+            raise requests.HTTPError(response=response)
+        return hashed_id.upper()
+
+    executor = BatchExecutor(client=None, max_workers=1, requests_per_second=None)
+    result = executor.run(flaky, ["a", "b"], idempotent=True)
+    assert result.succeeded == {"a": "A", "b": "B"}
+    assert result.retries == 1
+
+
+def test_rate_limited_move_retries_single_requests():
+    with FakeWistiaServer(rate_limit_rate=0.3, retry_after=0, random_seed=3) as server:
+        store = server.store
+        store.seed(media_count=40, project_count=1)
+        target = store.create_project("Target")
+        hashed_ids = [media.hashed_id for media in store.list_medias(per_page=40)]
+        metrics = MetricsRegistry()
+        client = server.client(instrumentation=metrics)
+
+        result = BatchExecutor(client, max_workers=4, requests_per_second=None, max_retries=20).run(
+            "move_media", hashed_ids, project_id=target.hashed_id
+        )
+
+    assert server.fault_count > 0
+    assert result.ok
+    assert result.retries == sum(metrics.retries.values())
+    # Each media was copied exactly once
+    assert len(store.list_medias(project_id=target.id, per_page=100)) == 40
+    assert len(store.medias) == 40
+
+
+def test_rate_limiter_spaces_out_requests():
+    import time
+
+    limiter = RateLimiter(rate=100, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.045
@@ -0,0 +1,103 @@
+import pytest
+
+from wistia.caption_index import CaptionIndex
+from wistia.instrumentation import MetricsRegistry
+from wistia.schema import CaptionTrack
+
+INTRO = """1
+00:00:01,000 --> 00:00:04,000
+Welcome to the quarterly results.
+
+2
+00:00:05,000 --> 00:00:09,000
+Revenue grew in every region.
+"""
+
+OUTRO = """1
+00:10:00,000 --> 00:10:03,000
+Thanks for watching, see you next quarter.
+"""
+
+
+@pytest.fixture
+def captioned(fake_wistia_server):
+    store = fake_wistia_server.store
+    hashed_ids = [media.hashed_id for media in store.list_medias(per_page=10)]
+    store.create_captions(hashed_ids[0], "eng", caption_text=INTRO)
+    store.create_captions(hashed_ids[1], "eng", caption_text=OUTRO)
+    store.create_captions(hashed_ids[1], "spa", caption_text=OUTRO.replace("Thanks", "Gracias"))
+    return hashed_ids
+
+
+def test_build_and_search(fake_wistia_server, captioned, tmp_path):
+    index = CaptionIndex(str(tmp_path / "captions.db"))
+    index.build(fake_wistia_server.client(), captioned)
+    assert len(index) == 3
+
+    hits = index.search("quarterly RESULTS")
+    assert [(hit.hashed_id, hit.language, hit.start, hit.end) for hit in hits] == [
+        (captioned[0], "eng", 1.0, 4.0)
+    ]
+    assert {hit.language for hit in index.search("quarter")} == {"eng", "spa"}
+    assert index.search('"see you" OR revenue', raw=True)
+    assert index.search('"unbalanced') == []
+    assert index.search("") == []
+    assert index.search("  ", raw=True) == []
+    index.close()
+
+    # Stored on disk
+    reopened = CaptionIndex(str(tmp_path / "captions.db"))
+    assert len(reopened.search("revenue")) == 1
+
+
+def test_client_caption_changes_are_synced_incrementally(fake_wistia_server, captioned, tmp_path):
+    index = CaptionIndex(str(tmp_path / "captions.db"))
+    client = fake_wistia_server.client()
+    index.build(client, captioned)
+    metrics = MetricsRegistry()
+    client.instrumentation.append(metrics)
+    index.watch(client)
+
+    client.update_captions(captioned[0], "eng", caption_text=INTRO.replace("Revenue", "Profit"))
+    client.delete_captions(captioned[1], "spa")
+    client.create_captions(captioned[2], "eng", caption_text=INTRO.replace("Revenue", "Profit"))
+    assert index.sync() == 3
+
+    assert index.search("revenue") == []
+    assert {hit.hashed_id for hit in index.search("profit")} == {captioned[0], captioned[2]}
+    assert {hit.language for hit in index.search("quarter")} == {"eng"}
+    # Only the three changed medias were fetched again
+    assert metrics.request_count("medias/{id}/captions.json") == 3 + 1
+
+
+def test_webhooks_update_the_index(fake_wistia_server, captioned, tmp_path):
+    from tests.test_webhooks import delivery_template, media_event_data_template
+    from wistia.webhooks import parse_webhook_event_delivery
+
+    store = fake_wistia_server.store
+    client = fake_wistia_server.client()
+    index = CaptionIndex(str(tmp_path / "captions.db"))
+    index.build(client, captioned)
+
+    def deliver(event_type, hashed_id):
+        event = {**media_event_data_template, "type": event_type}
+        event["payload"] = {"media": {**event["payload"]["media"], "id": hashed_id}}
+        index.handle_event_delivery(
+            parse_webhook_event_delivery({**delivery_template, "events": [event]}), client
+        )
+
+    store.update_captions(captioned[1], "eng", caption_text=OUTRO.replace("watching", "listening"))
+    deliver("media.updated", captioned[1])
+    assert [hit.hashed_id for hit in index.search("listening")] == [captioned[1]]
+
+    deliver("media.deleted", captioned[0])
+    assert index.search("revenue") == []
+
+
+def test_tracks_without_text_are_indexed_empty(tmp_path):
+    index = CaptionIndex(str(tmp_path / "captions.db"))
+    track = CaptionTrack({"language": "eng", "text": None}, strict=False)
+    assert index.index_tracks("abc123", [track]) == 1
+    assert len(index) == 1
+    assert index.search("anything") == []
+    index.close()
@@ -0,0 +1,109 @@
+import pytest
+
+from wistia.captions import Captions, Cue
+from wistia.dummy import DummyWistiaClient
+
+SRT = """1
+00:00:01,000 --> 00:00:04,500
+Hello there.
+
+2
+00:00:05,000 --> 00:00:07,250
+Two lines
+of text.
+
+3
+01:00:00,000 --> 01:00:02,000
+An hour in.
+"""
+
+VTT = """WEBVTT
+
+NOTE This is a comment
+
+intro
+00:01.000 --> 00:04.500 align:start position:10%
+Hello there.
+
+00:00:05.000 --> 00:00:07.250
+Two lines
+of text.
+
+01:00:00.000 --> 01:00:02.000
+An hour in.
+"""
+
+
+def test_parse_srt_and_vtt_to_the_same_cues():
+    srt = Captions.from_text(SRT)
+    assert list(srt) == [
+        Cue(1.0, 4.5, "Hello there."),
+        Cue(5.0, 7.25, "Two lines\nof text."),
+        Cue(3600.0, 3602.0, "An hour in."),
+    ]
+    assert list(Captions.from_text(VTT)) == list(srt)
+
+
+def test_round_trip():
+    captions = Captions.from_text(SRT)
+    assert captions.to_srt() == SRT + "\n"
+    assert list(Captions.from_text(captions.to_vtt())) == list(captions)
+
+
+@pytest.mark.parametrize("seconds,expected", [
+    (0.5, None),
+    (1.0, "Hello there."),
+    (4.499, "Hello there."),
+    (4.5, None),
+    (6, "Two lines\nof text."),
+    (3601, "An hour in."),
+    (9999, None),
+])
+def test_cue_at(seconds, expected):
+    cue = Captions.from_text(SRT).cue_at(seconds)
+    assert (cue.text if cue else None) == expected
+
+
+def test_cue_at_with_overlapping_cues():
+    captions = Captions.from_cues([
+        Cue(0.0, 10.0, "Speaker A"),
+        Cue(2.0, 3.0, "Speaker B"),
+        Cue(4.0, 5.0, "Speaker C"),
+    ])
+    assert captions.cue_at(2.5).text == "Speaker B"
+    assert captions.cue_at(3.5).text == "Speaker A"
+    assert captions.cue_at(6.0).text == "Speaker A"
+    assert captions.cue_at(10.0) is None
+
+
+def test_cue_at_under_a_cue_spanning_the_video():
+    cues = [Cue(0.0, 5000.0, "Music")] + [Cue(number + 1.0, number + 1.5, f"Cue {number}") for number in range(4000)]
+    captions = Captions.from_cues(cues)
+    assert captions.cue_at(1234.2).text == "Cue 1233"
+    assert captions.cue_at(1234.7).text == "Music"
+    assert captions.cue_at(4500.0).text == "Music"
+    assert captions.cue_at(5000.0) is None
+
+
+def test_out_of_order_cues_are_sorted_and_file_is_streamed(tmp_path):
+    path = tmp_path / "captions.srt"
+    blocks = []
+    for number in range(3000):
+        timestamp = f"00:{number // 60:02d}:{number % 60:02d}"
+        blocks.append(f"{number}\n{timestamp},000 --> {timestamp},900\nCue {number}\n")
+    path.write_text("\ufeff" + "\n".join(reversed(blocks)), encoding="utf-8")
+
+    captions = Captions.from_file(str(path))
+    assert len(captions) == 3000
+    assert captions[0].text == "Cue 0"
+    assert captions.cue_at(1234.5).text == "Cue 1234"
+    assert [cue.text for cue in captions.cues_between(10, 13)] == ["Cue 10", "Cue 11", "Cue 12"]
+
+
+def test_dummy_stores_captions_as_srt():
+    client = DummyWistiaClient()
+    media = client.add_dummy_video(hashed_id="abc123")
+    client.create_captions(media.hashed_id, "eng", caption_text=VTT)
+    assert client.show_captions(media.hashed_id, "eng").text == Captions.from_text(SRT).to_srt()
+    client.update_captions(media.hashed_id, "eng", caption_text=Captions.from_text(SRT))
+    assert Captions.from_text(client.show_captions(media.hashed_id, "eng").text)[2].start == 3600
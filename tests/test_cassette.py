@@ -0,0 +1,88 @@
+import gzip
+
+import pytest
+
+from wistia.cassette import CassetteMiss, read_cassette
+from wistia.helpers import get_wistia_client
+
+
+def test_recorded_traffic_replays_without_the_server(fake_wistia_server, tmp_path):
+    cassette_path = str(tmp_path / "traffic.jsonl.gz")
+    recording_client = fake_wistia_server.client(api_password="top-secret")
+    recording_client.record_to(cassette_path)
+    recorded_projects = list(recording_client.list_all_projects())
+    recorded_medias = recording_client.list_medias(page=2)
+    recording_client.close()
+
+    replaying_client = get_wistia_client(replay_from=cassette_path)
+    assert [p.hashed_id for p in replaying_client.list_all_projects()] == [
+        p.hashed_id for p in recorded_projects
+    ]
+    assert [m.to_primitive() for m in replaying_client.list_medias(page=2)] == [
+        m.to_primitive() for m in recorded_medias
+    ]
+    with pytest.raises(CassetteMiss):
+        replaying_client.list_medias(page=3)
+
+
+def test_auth_headers_are_redacted(fake_wistia_server, tmp_path):
+    cassette_path = str(tmp_path / "traffic.jsonl.gz")
+    client = fake_wistia_server.client(api_password="top-secret")
+    client.record_to(cassette_path)
+    client.list_projects()
+    client.close()
+
+    with gzip.open(cassette_path, "rt") as cassette_file:
+        assert "top-secret" not in cassette_file.read()
+    [record] = read_cassette(cassette_path)
+    assert record["request_headers"]["Authorization"] == "[REDACTED]"
+    assert record["status"] == 200
+
+
+def test_recording_can_be_enabled_from_the_environment(fake_wistia_server, tmp_path, monkeypatch):
+    cassette_path = str(tmp_path / "traffic.jsonl.gz")
+    monkeypatch.setenv("WISTIA_RECORD_CASSETTE", cassette_path)
+    client = get_wistia_client(password="top-secret")
+    client.API_BASE_URL = fake_wistia_server.url
+    client.list_projects()
+    client.close()
+    assert len(list(read_cassette(cassette_path))) == 1
+
+
+def test_clients_recording_to_one_cassette_share_it(fake_wistia_server, tmp_path, monkeypatch):
+    cassette_path = str(tmp_path / "traffic.jsonl.gz")
+    monkeypatch.setenv("WISTIA_RECORD_CASSETTE", cassette_path)
+    clients = [get_wistia_client(password="top-secret") for _ in range(3)]
+    for client in clients:
+        client.API_BASE_URL = fake_wistia_server.url
+        client.list_projects()
+    for client in clients:
+        client.close()
+    assert len(list(read_cassette(cassette_path))) == 3
+
+    # Reopened once every writer has closed: appended to, not overwritten
+    client = get_wistia_client(password="top-secret")
+    client.API_BASE_URL = fake_wistia_server.url
+    client.list_projects()
+    client.close()
+    assert len(list(read_cassette(cassette_path))) == 4
+
+
+def test_recording_keeps_the_connection_pool_size(fake_wistia_server, tmp_path):
+    client = fake_wistia_server.client(max_connections=3)
+    client.record_to(str(tmp_path / "traffic.jsonl.gz"))
+    assert client.session.get_adapter("https://")._pool_maxsize == 3
+    client.close()
+
+
+def test_closing_one_recording_client_leaves_the_others_recording(fake_wistia_server, tmp_path):
+    cassette_path = str(tmp_path / "traffic.jsonl.gz")
+    first, second = fake_wistia_server.client(), fake_wistia_server.client()
+    first.record_to(cassette_path)
+    second.record_to(cassette_path)
+    first.list_projects()
+    first.close()
+    second.list_projects()
+    second.list_projects()
+    second.close()
+    assert len(list(read_cassette(cassette_path))) == 3
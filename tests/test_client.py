@@ -1,7 +1,15 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
 import responses
 import pytest
 
 from wistia.client import WistiaClient
+from wistia.fakeserver import FakeWistiaServer, fixed_latency
+from wistia.instrumentation import MetricsRegistry
+from wistia.resilience import deadline
 
 
 def generate_http_bearer_auth_string(password):
@@ -38,3 +46,105 @@ def test_purchase_captions_hits_correct_endpoint(wistia_client):
 
     wistia_client.purchase_captions(media_hashed_id)
     assert expected_url == responses.calls[0].request.url
+
+
+def test_concurrent_identical_gets_share_one_request():
+    with FakeWistiaServer(latency=fixed_latency(0.5)) as server:
+        media = server.store.add_dummy_video(hashed_id="abc123")
+        metrics = MetricsRegistry()
+        client = server.client()
+        client.instrumentation.append(metrics)
+        barrier = threading.Barrier(10)
+
+        def get_media(_):
+            barrier.wait()
+            return client.get(f"medias/{media.hashed_id}.json")
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(get_media, range(10)))
+
+    assert server.request_count == 1
+    assert metrics.coalesced["medias/{id}.json"] == 9
+    assert {result["hashed_id"] for result in results} == {media.hashed_id}
+    # Every caller gets its own copy
+    assert len({id(result) for result in results}) == 10
+
+
+def test_followers_do_not_inherit_the_leaders_deadline():
+    with FakeWistiaServer(latency=fixed_latency(0.5)) as server:
+        media = server.store.add_dummy_video(hashed_id="abc123")
+        client = server.client(thread_safe=True)
+        leader_started = threading.Event()
+
+        def leader():
+            with deadline(0.3):
+                leader_started.set()
+                return client.get(f"medias/{media.hashed_id}.json")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            leading = executor.submit(leader)
+            leader_started.wait()
+            time.sleep(0.05)
+            follower_result = client.get(f"medias/{media.hashed_id}.json")
+            with pytest.raises(requests.Timeout):
+                leading.result()
+
+    assert follower_result["hashed_id"] == media.hashed_id
+    assert server.request_count == 2
+
+
+def test_single_flight_can_be_disabled():
+    with FakeWistiaServer(latency=fixed_latency(0.1)) as server:
+        media = server.store.add_dummy_video(hashed_id="abc123")
+        client = server.client()
+        client.single_flight = False
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: client.show_media(media.hashed_id), range(4)))
+    assert server.request_count == 4
+
+
+def test_compressed_responses_are_measured(fake_wistia_server):
+    metrics = MetricsRegistry()
+    client = fake_wistia_server.client()
+    client.instrumentation.append(metrics)
+    medias = client.list_medias(per_page=100)
+
+    assert len(medias) == 100
+    assert "gzip" in client.session.headers["Accept-Encoding"]
+    key = ("GET", "medias.json")
+    assert 0 < metrics.wire_bytes_received[key] < metrics.bytes_received[key] / 2
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+def test_client_decodes_with_any_codec(fake_wistia_server, codec):
+    pytest.importorskip(codec)
+    client = WistiaClient(codec=codec)
+    client.API_BASE_URL = fake_wistia_server.url
+    assert client.codec.name == codec
+    assert len(client.list_medias(per_page=10)) == 10
+
+
+def test_thread_safe_client_under_load(fake_wistia_server):
+    store = fake_wistia_server.store
+    hashed_ids = [media.hashed_id for media in store.list_medias(per_page=64)]
+    client = fake_wistia_server.client(thread_safe=True, max_connections=32, single_flight=False)
+
+    def work(worker):
+        errors = []
+        for step in range(20):
+            hashed_id = hashed_ids[(worker * 20 + step) % len(hashed_ids)]
+            if client.show_media(hashed_id).hashed_id != hashed_id:
+                errors.append(f"show_media({hashed_id}) returned another media")
+            client.update_media_customizations(hashed_id, {"playerColor": f"{worker:06x}"})
+            if len(client.list_medias(page=step % 3 + 1, per_page=10)) != 10:
+                errors.append("short page")
+            client.list_captions(hashed_id)
+        return errors
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        errors = [error for worker_errors in executor.map(work, range(32)) for error in worker_errors]
+
+    assert errors == []
+    assert fake_wistia_server.request_count == 32 * 20 * 4
+    # Threads share one connection pool instead of reconnecting
+    assert fake_wistia_server.connection_count <= 32
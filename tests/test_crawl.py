@@ -0,0 +1,29 @@
+from wistia.crawl import crawl_account
+from wistia.schema import Media
+
+
+def test_crawl_account_covers_every_project(fake_wistia_server):
+    store = fake_wistia_server.store
+    pages = list(crawl_account("fake", processes=2, per_page=30, base_url=fake_wistia_server.url))
+
+    assert sorted({page.project["hashed_id"] for page in pages}) == sorted(store.projects)
+    crawled = [media for page in pages for media in page.medias]
+    assert len(crawled) == len(store.medias)
+    assert {media["hashed_id"] for media in crawled} == set(store.medias)
+    for page in pages:
+        assert 0 < len(page.medias) <= 30
+        assert all(media["project"]["id"] == page.project["id"] for media in page.medias)
+    assert isinstance(pages[0].media_models()[0], Media)
+
+
+def test_crawl_follows_stale_media_counts(fake_wistia_server):
+    store = fake_wistia_server.store
+    for project in store.projects.values():
+        project.media_count = 0
+    pages = list(crawl_account("fake", processes=2, per_page=30, base_url=fake_wistia_server.url))
+    assert len({media["hashed_id"] for page in pages for media in page.medias}) == len(store.medias)
+
+
+def test_crawl_empty_account(fake_wistia_server):
+    fake_wistia_server.store.projects.clear()
+    assert list(crawl_account("fake", base_url=fake_wistia_server.url)) == []
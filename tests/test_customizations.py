@@ -0,0 +1,76 @@
+from wistia.batch import BatchExecutor
+from wistia.customizations import apply_customizations, customizations_diff, merge_customizations
+from wistia.instrumentation import MetricsRegistry
+
+CAPTIONS_ON = {"plugin": {"captions-v1": {"onByDefault": False}}}
+
+
+def test_diff_keeps_only_changes():
+    current = {"playerColor": "54bbff", "plugin": {"captions-v1": {"onByDefault": False}, "share": {}}}
+    assert customizations_diff(current, CAPTIONS_ON) == {}
+    assert customizations_diff(current, {"playerColor": "000000", "plugin": {"share": None}}) == {
+        "playerColor": "000000",
+        "plugin": {"share": None},
+    }
+    # Deleting a key that is not set is a no-op
+    assert customizations_diff(current, {"autoPlay": None}) == {}
+
+
+def test_diff_has_same_effect_as_desired():
+    current = {"a": 1, "b": {"c": 2, "d": 3}, "e": "x"}
+    desired = {"a": 1, "b": {"c": 5, "d": None}, "e": None, "f": {"g": True}}
+    diff = customizations_diff(current, desired)
+    assert merge_customizations(current, diff) == merge_customizations(current, desired)
+    assert "a" not in diff
+
+
+def test_null_deletes_under_missing_keys_are_dropped():
+    disable = {"plugin": {"captions-v1": None, "share": {"on": None}}}
+    assert customizations_diff({}, disable) == {}
+    assert customizations_diff({"plugin": "legacy"}, disable) == {"plugin": {}}
+    assert customizations_diff({}, {"plugin": {"captions-v1": None, "share": {"on": True}}}) == {
+        "plugin": {"share": {"on": True}}
+    }
+    assert merge_customizations({}, disable) == {}
+    assert merge_customizations({"plugin": "legacy"}, {"plugin": {"a": None, "b": 1}}) == {"plugin": {"b": 1}}
+
+
+def test_disabling_missing_captions_costs_reads_only(fake_wistia_server):
+    hashed_ids = [media.hashed_id for media in fake_wistia_server.store.list_medias(per_page=5)]
+    metrics = MetricsRegistry()
+    client = fake_wistia_server.client()
+    client.instrumentation.append(metrics)
+    executor = BatchExecutor(client, max_workers=2, requests_per_second=None)
+    apply_customizations(client, dict.fromkeys(hashed_ids, {"plugin": {"captions-v1": None}}), executor=executor)
+    assert put_count(metrics) == 0
+
+
+def put_count(metrics):
+    return sum(count for (method, _, _), count in metrics.requests.items() if method == "PUT")
+
+
+def test_apply_customizations_only_writes_differences(fake_wistia_server):
+    store = fake_wistia_server.store
+    hashed_ids = [media.hashed_id for media in store.list_medias(per_page=20)]
+    for hashed_id in hashed_ids[:5]:
+        store.update_media_customizations(hashed_id, CAPTIONS_ON)
+    metrics = MetricsRegistry()
+    client = fake_wistia_server.client()
+    client.instrumentation.append(metrics)
+    executor = BatchExecutor(client, max_workers=4, requests_per_second=None)
+    desired = dict.fromkeys(hashed_ids + ["missing"], CAPTIONS_ON)
+
+    dry_run = apply_customizations(client, desired, executor=executor, dry_run=True)
+    assert sorted(dry_run.planned) == sorted(hashed_ids[5:])
+    assert put_count(metrics) == 0
+
+    result = apply_customizations(client, desired, executor=executor)
+    assert list(result.failed) == ["missing"]
+    assert len(result.succeeded) == 20
+    assert result.succeeded[hashed_ids[0]] == {}
+    assert result.succeeded[hashed_ids[5]] == CAPTIONS_ON
+    assert put_count(metrics) == 15
+    assert all(store.customizations[hashed_id] == CAPTIONS_ON for hashed_id in hashed_ids)
+
+    apply_customizations(client, desired, executor=executor)
+    assert put_count(metrics) == 15
@@ -0,0 +1,100 @@
+import pytest
+import requests
+
+from wistia.dummy import DummyWistiaClient
+
+
+@pytest.fixture
+def dummy_client():
+    client = DummyWistiaClient()
+    client.seed(media_count=1000, project_count=5)
+    return client
+
+
+def test_list_medias_paginates(dummy_client):
+    first_page = dummy_client.list_medias(page=1, per_page=100)
+    second_page = dummy_client.list_medias(page=2, per_page=100)
+    assert len(first_page) == 100
+    assert len(second_page) == 100
+    assert not {m.hashed_id for m in first_page} & {m.hashed_id for m in second_page}
+    assert dummy_client.list_medias(page=11, per_page=100) == []
+
+
+def test_list_medias_caps_per_page_at_api_maximum(dummy_client):
+    assert len(dummy_client.list_medias(per_page=500)) == 100
+
+
+@pytest.mark.parametrize("sort_by", ["name", "created", "updated", "id"])
+def test_list_medias_sorts(dummy_client, sort_by):
+    ascending = dummy_client.list_medias(sort_by=sort_by, sort_direction=1)
+    keys = [getattr(m, sort_by) for m in ascending]
+    assert keys == sorted(keys)
+
+    descending = dummy_client.list_medias(sort_by=sort_by, sort_direction=0)
+    keys = [getattr(m, sort_by) for m in descending]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_descending_pages_cover_everything_once(dummy_client):
+    seen = []
+    for page in range(1, 12):
+        seen.extend(m.hashed_id for m in dummy_client.list_medias(page=page, sort_direction=0))
+    assert len(seen) == len(set(seen)) == 1000
+
+
+def test_list_medias_filters_by_project(dummy_client):
+    project = dummy_client.list_projects()[0]
+    medias = []
+    for page in range(1, 20):
+        medias.extend(dummy_client.list_medias(project_id=project.id, page=page))
+    assert len(medias) == project.media_count
+    assert all(m.project.id == project.id for m in medias)
+
+
+def test_list_medias_filters_by_name_and_type(dummy_client):
+    media = dummy_client.list_medias()[0]
+    matching = dummy_client.list_medias(name=media.name, media_type=media.type)
+    assert [m.hashed_id for m in matching] == [media.hashed_id]
+    assert dummy_client.list_medias(name=media.name, media_type="Swf") == []
+
+
+def test_list_all_projects_pages_through_list_projects():
+    client = DummyWistiaClient()
+    client.seed(media_count=0, project_count=250)
+    projects = list(client.list_all_projects())
+    assert len(projects) == 250
+    assert [p.id for p in projects] == sorted(p.id for p in projects)
+
+
+def test_added_and_removed_medias_are_reflected_in_queries(dummy_client):
+    video = dummy_client.add_dummy_video(name="0000 first")
+    assert dummy_client.list_medias(sort_by="name")[0].hashed_id == video.hashed_id
+    del dummy_client.medias[video.hashed_id]
+    assert dummy_client.list_medias(name="0000 first") == []
+    with pytest.raises(requests.HTTPError):
+        dummy_client.show_media(video.hashed_id)
+
+
+def test_updated_medias_are_reindexed(dummy_client):
+    media = dummy_client.list_medias(per_page=1)[0]
+    old_name = media.name
+    dummy_client.update_media(media.hashed_id, name="Renamed")
+    assert dummy_client.list_medias(name=old_name) == []
+    assert [m.hashed_id for m in dummy_client.list_medias(name="Renamed")] == [media.hashed_id]
+
+
+def test_updated_projects_are_reindexed(dummy_client):
+    project = dummy_client.list_projects()[0]
+    dummy_client.update_project(project.hashed_id, name="000 first")
+    assert dummy_client.list_projects(sort_by="name")[0].hashed_id == project.hashed_id
+
+
+def test_copy_and_delete_keep_media_count(dummy_client):
+    source, target = dummy_client.list_projects()[:2]
+    source_count, target_count = source.media_count, target.media_count
+    media = dummy_client.list_medias(project_id=source.id, per_page=1)[0]
+
+    dummy_client.move_media(media.hashed_id, project_id=target.hashed_id)
+
+    assert dummy_client.show_project(source.hashed_id).media_count == source_count - 1
+    assert dummy_client.show_project(target.hashed_id).media_count == target_count + 1
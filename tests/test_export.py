@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from wistia.cli import main
+from wistia.export import AccountExporter, read_records
+
+
+@pytest.fixture
+def server_with_captions(fake_wistia_server):
+    store = fake_wistia_server.store
+    for media in store.list_medias(per_page=20):
+        store.create_captions(media.hashed_id, "eng", caption_text="1\n00:00:00,000 --> 00:00:01,000\nHi\n")
+    return fake_wistia_server
+
+
+@pytest.mark.parametrize("format,compress", [("jsonl", False), ("jsonl", True), ("csv", False), ("csv", True)])
+def test_export_writes_every_resource(server_with_captions, tmp_path, format, compress):
+    exporter = AccountExporter(
+        server_with_captions.client(), str(tmp_path), format=format, compress=compress, max_workers=4
+    )
+    exporter.run()
+
+    projects = list(read_records(exporter.output_path("projects"), format))
+    medias = list(read_records(exporter.output_path("medias"), format))
+    captions = list(read_records(exporter.output_path("captions"), format))
+    customizations = list(read_records(exporter.output_path("customizations"), format))
+    assert len(projects) == 3
+    assert len(medias) == 250
+    assert len({media["hashed_id"] for media in medias}) == 250
+    assert len(captions) == 20
+    assert len(customizations) == 250
+
+
+def test_interrupted_export_resumes_without_duplicates(server_with_captions, tmp_path):
+    client = server_with_captions.client()
+    original_list_captions = client.list_captions
+    calls = []
+
+    def flaky_list_captions(hashed_id):
+        calls.append(hashed_id)
+        if len(calls) == 100:
+            raise KeyboardInterrupt
+        return original_list_captions(hashed_id)
+
+    client.list_captions = flaky_list_captions
+    exporter = AccountExporter(client, str(tmp_path), compress=True, max_workers=2)
+    with pytest.raises(KeyboardInterrupt):
+        exporter.run(["medias", "captions"])
+
+    client.list_captions = original_list_captions
+    resumed = AccountExporter(client, str(tmp_path), compress=True, max_workers=2)
+    resumed.run(["medias", "captions"])
+
+    medias = list(read_records(resumed.output_path("medias"), "jsonl"))
+    captions = list(read_records(resumed.output_path("captions"), "jsonl"))
+    assert len(medias) == 250
+    assert len(captions) == 20
+    assert len({caption["hashed_id"] for caption in captions}) == 20
+
+
+def test_resumed_export_keeps_its_media_list(fake_wistia_server, tmp_path):
+    client = fake_wistia_server.client()
+    original_show = client.show_media_customizations
+    calls = []
+
+    def flaky_show(hashed_id):
+        calls.append(hashed_id)
+        if len(calls) == 100:
+            raise KeyboardInterrupt
+        return original_show(hashed_id)
+
+    client.show_media_customizations = flaky_show
+    exporter = AccountExporter(client, str(tmp_path), max_workers=2)
+    with pytest.raises(KeyboardInterrupt):
+        exporter.run(["customizations"])
+    listed = [media.hashed_id for media in fake_wistia_server.store.list_medias(sort_by="created", per_page=100)]
+
+    # Deleting a media that was already exported shifts a fresh listing
+    fake_wistia_server.store.delete_media(listed[0])
+    client.show_media_customizations = original_show
+    resumed = AccountExporter(client, str(tmp_path), max_workers=2)
+    resumed.run(["customizations"])
+
+    exported = [record["hashed_id"] for record in read_records(resumed.output_path("customizations"), "jsonl")]
+    assert len(exported) == len(set(exported)) == 250
+    assert not [name for name in os.listdir(tmp_path) if name.endswith("-ids.json")]
+
+
+def test_cli_export(fake_wistia_server, tmp_path):
+    exit_code = main([
+        "export", "-c", "secret", "--base-url", fake_wistia_server.url,
+        "-r", "projects,medias", "-f", "csv", "-o", str(tmp_path),
+    ])
+    assert exit_code == 0
+    assert len(list(read_records(str(tmp_path / "medias.csv"), "csv"))) == 250
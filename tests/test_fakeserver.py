@@ -0,0 +1,79 @@
+import pytest
+import requests
+
+from wistia.fakeserver import FakeWistiaServer, parse_latency
+
+
+def test_client_pages_through_medias_over_http(fake_wistia_server):
+    client = fake_wistia_server.client()
+    medias = []
+    for page in range(1, 5):
+        medias.extend(client.list_medias(page=page, per_page=100))
+    assert len(medias) == 250
+    assert medias[0].hashed_id == fake_wistia_server.store.list_medias()[0].hashed_id
+
+
+def test_client_lists_all_projects_over_http(fake_wistia_server):
+    client = fake_wistia_server.client()
+    projects = list(client.list_all_projects())
+    assert [p.hashed_id for p in projects] == [
+        p.hashed_id for p in fake_wistia_server.store.list_projects()
+    ]
+
+
+def test_captions_round_trip_over_http(fake_wistia_server):
+    client = fake_wistia_server.client()
+    media = client.list_medias()[0]
+    client.create_captions(media.hashed_id, "eng", caption_text="1\n00:00:00,000 --> 00:00:01,000\nHi\n")
+    assert [track.language for track in client.list_captions(media.hashed_id)] == ["eng"]
+    client.update_captions(media.hashed_id, "eng", caption_text="updated")
+    assert client.show_captions(media.hashed_id, "eng").text == "updated"
+    client.delete_captions(media.hashed_id, "eng")
+    assert client.list_captions(media.hashed_id) == []
+
+
+def test_customizations_are_merged(fake_wistia_server):
+    client = fake_wistia_server.client()
+    media = client.list_medias()[0]
+    client.enable_captions_for_media(media.hashed_id)
+    assert "captions-v1" in client.show_media_customizations(media.hashed_id)["plugin"]
+    client.enable_captions_for_media(media.hashed_id, enabled=False)
+    assert client.show_media_customizations(media.hashed_id)["plugin"] == {}
+
+
+def test_missing_media_is_404(fake_wistia_server):
+    with pytest.raises(requests.HTTPError) as error:
+        fake_wistia_server.client().show_media("does-not-exist")
+    assert error.value.response.status_code == 404
+
+
+def test_fault_injection():
+    with FakeWistiaServer(rate_limit_rate=1.0) as server:
+        with pytest.raises(requests.HTTPError) as error:
+            server.client().list_projects()
+    assert error.value.response.status_code == 429
+    assert error.value.response.headers["Retry-After"] == "1"
+    assert server.fault_count == 1
+
+
+def test_parse_latency():
+    assert parse_latency("fixed:0.25")() == 0.25
+    assert 0.01 <= parse_latency("uniform:0.01,0.02")() <= 0.02
+    assert parse_latency("lognormal:0.05,0.5")() > 0
+    with pytest.raises(ValueError):
+        parse_latency("gaussian:1")
+
+
+def test_handler_errors_are_json_500s(fake_wistia_server, monkeypatch):
+    def broken_handler(**kwargs):
+        raise KeyError("boom")
+
+    monkeypatch.setattr(fake_wistia_server, "_handle_list_projects", broken_handler)
+    client = fake_wistia_server.client()
+    with pytest.raises(requests.HTTPError) as error:
+        client.list_projects()
+    assert error.value.response.status_code == 500
+    assert error.value.response.json() == {"error": "Internal server error"}
+    # The connection stays usable
+    assert client.show_media(fake_wistia_server.store.list_medias(per_page=1)[0].hashed_id)
+    assert fake_wistia_server.connection_count == 1
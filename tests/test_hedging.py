@@ -0,0 +1,77 @@
+import threading
+import time
+from itertools import count
+
+from wistia.fakeserver import FakeWistiaServer
+from wistia.hedging import Hedger
+from wistia.instrumentation import MetricsRegistry
+
+
+def every_fifth_request_stalls():
+    requests_seen = count(1)
+    return lambda: 1.0 if next(requests_seen) % 5 == 0 else 0.01
+
+
+def test_slow_gets_are_hedged():
+    with FakeWistiaServer(latency=every_fifth_request_stalls()) as server:
+        server.store.add_dummy_video(hashed_id="abc123")
+        metrics = MetricsRegistry()
+        client = server.client(
+            instrumentation=metrics,
+            hedging=Hedger(percentile=50, max_extra=1.0, min_samples=3),
+        )
+        started_at = time.monotonic()
+        for _ in range(20):
+            assert client.show_media("abc123").hashed_id == "abc123"
+        elapsed = time.monotonic() - started_at
+        client.close()
+
+    # Without hedging the 4 stalled requests alone take 4s
+    assert elapsed < 2.5
+    assert metrics.hedges["medias/{id}.json"] >= 3
+    assert metrics.hedge_wins["medias/{id}.json"] >= 3
+
+
+def test_hedging_is_capped():
+    with FakeWistiaServer(latency=every_fifth_request_stalls()) as server:
+        server.store.add_dummy_video(hashed_id="abc123")
+        metrics = MetricsRegistry()
+        client = server.client(
+            instrumentation=metrics,
+            hedging=Hedger(percentile=50, max_extra=0.0, min_samples=3),
+        )
+        # The budget starts with room for one hedge
+        for _ in range(10):
+            client.show_media("abc123")
+        client.close()
+    assert metrics.hedges["medias/{id}.json"] == 1
+
+
+def test_hedge_delay_follows_the_latency_percentile():
+    hedger = Hedger(percentile=90, min_samples=10, min_delay=0.0)
+    assert hedger.delay("medias/{id}.json") is None
+    for latency in range(1, 11):
+        hedger.observe("medias/{id}.json", latency / 10)
+    assert hedger.delay("medias/{id}.json") == 1.0
+    assert hedger.delay("projects.json") is None
+
+
+def test_unhedged_calls_are_sent_on_the_calling_thread():
+    hedger = Hedger(min_samples=3)
+    threads = []
+
+    def send():
+        threads.append(threading.current_thread())
+        return "ok"
+
+    for _ in range(3):
+        assert hedger.call("projects.json", send) == "ok"
+    assert threads == [threading.current_thread()] * 3
+    assert len(hedger._latencies["projects.json"]) == 3
+
+    # With no budget left there is nothing to race against either
+    hedger._budget = 0.0
+    hedger.max_extra = 0.0
+    hedger.call("projects.json", send)
+    assert threads[-1] is threading.current_thread()
+    hedger.close()
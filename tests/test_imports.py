@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["requests", "schematics", "pydantic", "django"]
+
+
+def modules_loaded_by(statement):
+    script = (
+        f"import sys; {statement}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    return [module for module in output.split(",") if module]
+
+
+@pytest.mark.parametrize("statement", [
+    "import wistia",
+    "from wistia.webhooks import validate_webhook_signature",
+    "import wistia.pytest_plugin",
+])
+def test_import_does_not_load_heavy_dependencies(statement):
+    assert modules_loaded_by(statement) == []
+
+
+def test_lazy_exports_resolve():
+    import wistia
+    from wistia.client import WistiaClient
+    from wistia.webhooks import EventDelivery
+
+    assert wistia.WistiaClient is WistiaClient
+    assert wistia.webhooks.EventDelivery is EventDelivery
+    assert "get_wistia_client" in dir(wistia)
+    with pytest.raises(AttributeError):
+        wistia.NotAThing
@@ -0,0 +1,88 @@
+import pytest
+import requests
+import responses
+
+from wistia.client import WistiaClient
+from wistia.instrumentation import Instrumentation, MetricsRegistry, endpoint_template
+
+
+@pytest.mark.parametrize("rel_path,expected", [
+    ("medias.json", "medias.json"),
+    ("medias/abc123.json", "medias/{id}.json"),
+    ("medias/abc123/captions.json", "medias/{id}/captions.json"),
+    ("medias/abc123/captions/eng.json", "medias/{id}/captions/{language}.json"),
+    ("medias/abc123/captions/purchase.json", "medias/{id}/captions/purchase.json"),
+    ("medias/abc123/customizations.json", "medias/{id}/customizations.json"),
+    ("projects/xyz.json", "projects/{id}.json"),
+    ("projects/xyz/sharings/42.json", "projects/{id}/sharings/{id}.json"),
+])
+def test_endpoint_template(rel_path, expected):
+    assert endpoint_template(rel_path) == expected
+
+
+class RecordingInstrumentation(Instrumentation):
+    def __init__(self):
+        self.calls = []
+
+    def on_request_start(self, request):
+        self.calls.append(("start", request.endpoint))
+
+    def on_request_end(self, request):
+        self.calls.append(("end", request.endpoint, request.status_code, request.error is not None))
+
+    def on_parse(self, endpoint, seconds, count):
+        self.calls.append(("parse", endpoint, count))
+
+
+@responses.activate
+def test_hooks_are_called_around_requests():
+    responses.add(responses.GET, "https://api.wistia.com/v1/medias/abc/captions.json", json=[], status=200)
+    responses.add(responses.GET, "https://api.wistia.com/v1/medias/missing.json", json={}, status=404)
+    recorder = RecordingInstrumentation()
+    client = WistiaClient(instrumentation=recorder)
+
+    client.list_captions("abc")
+    with pytest.raises(requests.HTTPError):
+        client.show_media("missing")
+
+    assert recorder.calls == [
+        ("start", "medias/{id}/captions.json"),
+        ("end", "medias/{id}/captions.json", 200, False),
+        ("parse", "medias/{id}/captions.json", 0),
+        ("start", "medias/{id}.json"),
+        ("end", "medias/{id}.json", 404, True),
+    ]
+
+
+@responses.activate
+def test_metrics_registry_exports_prometheus_text():
+    responses.add(responses.GET, "https://api.wistia.com/v1/medias/abc/captions.json", json=[], status=200)
+    responses.add(responses.GET, "https://api.wistia.com/v1/medias/def/captions.json", json=[], status=200)
+    metrics = MetricsRegistry()
+    client = WistiaClient(instrumentation=[metrics])
+
+    client.list_captions("abc")
+    client.list_captions("def")
+
+    assert metrics.request_count("medias/{id}/captions.json") == 2
+    exported = metrics.to_prometheus()
+    assert (
+        'wistia_requests_total{method="GET",endpoint="medias/{id}/captions.json",status="200"} 2'
+        in exported
+    )
+    assert (
+        'wistia_request_duration_seconds_count{method="GET",endpoint="medias/{id}/captions.json"} 2'
+        in exported
+    )
+    assert 'le="+Inf"} 2' in exported
+    assert 'wistia_response_bytes_total{method="GET",endpoint="medias/{id}/captions.json"} 4' in exported
+
+
+@responses.activate
+def test_failing_hook_does_not_break_requests():
+    class Broken(Instrumentation):
+        def on_request_end(self, request):
+            raise RuntimeError("boom")
+
+    responses.add(responses.GET, "https://api.wistia.com/v1/medias.json", json=[], status=200)
+    assert WistiaClient(instrumentation=Broken()).list_medias() == []
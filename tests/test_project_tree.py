@@ -0,0 +1,75 @@
+import pytest
+
+from wistia.instrumentation import MetricsRegistry
+from wistia.project_tree import LIST_MEDIAS, SHOW_PROJECT, choose_strategy, fetch_project_tree
+
+
+@pytest.mark.parametrize("media_count,expected", [
+    (0, SHOW_PROJECT),
+    (50, SHOW_PROJECT),
+    (100, SHOW_PROJECT),
+    (2000, LIST_MEDIAS),
+])
+def test_choose_strategy(media_count, expected):
+    assert choose_strategy(media_count, per_page=100, max_workers=8) == expected
+
+
+def test_single_worker_always_uses_show_project():
+    assert choose_strategy(5000, max_workers=1) == SHOW_PROJECT
+
+
+def fetch_with_metrics(server, project, **kwargs):
+    metrics = MetricsRegistry()
+    client = server.client()
+    client.instrumentation.append(metrics)
+    return fetch_project_tree(client, project, **kwargs), metrics
+
+
+def test_small_project_uses_one_request(fake_wistia_server):
+    store = fake_wistia_server.store
+    project = store.create_project("Small")
+    for _ in range(3):
+        store.copy_media(store.list_medias()[0].hashed_id, project_id=project.hashed_id)
+    project = store.projects[project.hashed_id]
+
+    tree, metrics = fetch_with_metrics(fake_wistia_server, project)
+    assert len(tree.medias) == 3
+    assert metrics.request_count() == 1
+    assert metrics.request_count("projects/{id}.json") == 1
+
+
+def test_large_project_fetches_precomputed_pages(fake_wistia_server):
+    project = max(fake_wistia_server.store.list_projects(), key=lambda project: project.media_count)
+
+    tree, metrics = fetch_with_metrics(fake_wistia_server, project, per_page=10, max_workers=10)
+    assert {media.hashed_id for media in tree.medias} == {
+        media.hashed_id
+        for media in fake_wistia_server.store.list_medias(project_id=project.id, per_page=None)
+    }
+    # One request per page and no probing for an empty page
+    assert metrics.request_count("medias.json") == -(-project.media_count // 10)
+
+
+def test_stale_media_count_is_probed_past(fake_wistia_server):
+    store = fake_wistia_server.store
+    project = max(store.list_projects(), key=lambda project: project.media_count)
+    stale = store.projects[project.hashed_id]
+    actual_count = stale.media_count
+    stale.media_count = 20
+
+    tree, metrics = fetch_with_metrics(fake_wistia_server, stale, per_page=10, max_workers=2)
+    assert metrics.request_count("projects/{id}.json") == 0
+    assert len(tree.medias) == actual_count
+
+
+def test_exact_multiple_of_per_page_probes_one_page(fake_wistia_server):
+    store = fake_wistia_server.store
+    project = max(store.list_projects(), key=lambda project: project.media_count)
+    exact = store.projects[project.hashed_id]
+    for media in store.list_medias(project_id=project.id, per_page=None)[80:]:
+        store.delete_media(media.hashed_id)
+    exact.media_count = 80
+
+    tree, metrics = fetch_with_metrics(fake_wistia_server, exact, per_page=10, max_workers=8)
+    assert len(tree.medias) == 80
+    assert metrics.request_count("medias.json") == 9  # 8 pages and one probe
@@ -0,0 +1,128 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from wistia.receiver import WebhookReceiver
+from wistia.webhooks import compute_signature_hash
+
+from .test_webhooks import example_webhook_json_str
+
+SECRET_KEY = "s3cr3t"
+
+
+@pytest.fixture
+def receiver():
+    return WebhookReceiver(secret_key=SECRET_KEY, maxsize=2, retry_after=15)
+
+
+def call_wsgi(app, method="POST", path="/", body=b"", signature=None):
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+    if signature is not None:
+        environ["HTTP_X_WISTIA_SIGNATURE"] = signature
+    captured = {}
+
+    def start_response(status, headers):
+        captured["status"] = status
+        captured["headers"] = dict(headers)
+
+    response_body = b"".join(app(environ, start_response))
+    return captured["status"], captured["headers"], response_body
+
+
+def call_asgi(app, method="POST", path="/", body=b"", signature=None):
+    headers = [(b"content-type", b"application/json")]
+    if signature is not None:
+        headers.append((b"x-wistia-signature", signature.encode()))
+    scope = {"type": "http", "method": method, "path": path, "headers": headers}
+    incoming = [
+        {"type": "http.request", "body": body[:10], "more_body": True},
+        {"type": "http.request", "body": body[10:], "more_body": False},
+    ]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], dict(sent[0]["headers"]), sent[1]["body"]
+
+
+def signed_body():
+    body = example_webhook_json_str.encode()
+    return body, compute_signature_hash(body, SECRET_KEY)
+
+
+def test_wsgi_app_enqueues_signed_delivery(receiver):
+    body, signature = signed_body()
+    status, headers, response_body = call_wsgi(
+        receiver.wsgi_app, body=body, signature=signature
+    )
+    assert status == "200 OK"
+    assert receiver.stats.queue_depth == 1
+    assert receiver.get(block=False).body == body
+
+
+def test_wsgi_app_rejects_bad_signature(receiver):
+    body, _ = signed_body()
+    status, _, _ = call_wsgi(receiver.wsgi_app, body=body, signature="nope")
+    assert status == "401 Unauthorized"
+    assert receiver.stats.queue_depth == 0
+    assert receiver.stats.rejected_signature == 1
+
+
+def test_wsgi_app_sheds_load_when_queue_is_full(receiver):
+    body, signature = signed_body()
+    for _ in range(2):
+        call_wsgi(receiver.wsgi_app, body=body, signature=signature)
+    status, headers, _ = call_wsgi(receiver.wsgi_app, body=body, signature=signature)
+    assert status == "503 Service Unavailable"
+    assert headers["Retry-After"] == "15"
+    assert receiver.stats.shed == 1
+    assert receiver.stats.accepted == 2
+
+
+def test_metrics_endpoint_reports_queue_depth(receiver):
+    body, signature = signed_body()
+    call_wsgi(receiver.wsgi_app, body=body, signature=signature)
+    status, _, response_body = call_wsgi(receiver.wsgi_app, method="GET", path="/metrics")
+    assert status == "200 OK"
+    metrics = json.loads(response_body)
+    assert metrics["queue_depth"] == 1
+    assert metrics["queue_maxsize"] == 2
+
+
+def test_asgi_app_enqueues_signed_delivery(receiver):
+    body, signature = signed_body()
+    status, _, _ = call_asgi(receiver.asgi_app, body=body, signature=signature)
+    assert status == 200
+    delivery = next(receiver.iter_event_deliveries(timeout=0))
+    assert delivery.events[0].type == "media.failed"
+
+
+def test_asgi_app_sheds_load_with_retry_after(receiver):
+    body, signature = signed_body()
+    for _ in range(2):
+        call_asgi(receiver.asgi_app, body=body, signature=signature)
+    status, headers, _ = call_asgi(receiver.asgi_app, body=body, signature=signature)
+    assert status == 503
+    assert headers[b"retry-after"] == b"15"
+
+
+def test_malformed_deliveries_are_skipped(receiver):
+    for body in (b'{"hook": "not an event delivery"}', signed_body()[0]):
+        call_wsgi(receiver.wsgi_app, body=body, signature=compute_signature_hash(body, SECRET_KEY))
+    deliveries = list(receiver.iter_event_deliveries(timeout=0))
+    assert [delivery.events[0].type for delivery in deliveries] == ["media.failed"]
+    assert receiver.stats.malformed == 1
+    receiver.task_done()
+    assert receiver.queue.unfinished_tasks == 0
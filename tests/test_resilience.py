@@ -0,0 +1,138 @@
+import time
+
+import pytest
+import requests
+
+from wistia.fakeserver import FakeWistiaServer, fixed_latency
+from wistia.instrumentation import MetricsRegistry
+from wistia.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    clamp_timeout,
+    deadline,
+)
+
+
+def test_read_timeout_applies_by_default():
+    with FakeWistiaServer(latency=fixed_latency(1.0)) as server:
+        server.store.add_dummy_video(hashed_id="abc123")
+        client = server.client(timeout=(1.0, 0.2))
+        started_at = time.monotonic()
+        with pytest.raises(requests.Timeout):
+            client.show_media("abc123")
+    assert time.monotonic() - started_at < 0.9
+
+
+def test_deadline_bounds_a_multi_request_operation():
+    with FakeWistiaServer(latency=fixed_latency(0.3)) as server:
+        server.store.seed(media_count=0, project_count=3)
+        client = server.client()
+        assert len(list(client.list_all_projects(timeout=5))) == 3
+
+        started_at = time.monotonic()
+        with pytest.raises(requests.Timeout):
+            # The first page fits, the second (empty) page does not
+            list(client.list_all_projects(timeout=0.45))
+        assert time.monotonic() - started_at < 0.7
+
+
+def test_no_request_is_made_after_the_deadline(fake_wistia_server):
+    client = fake_wistia_server.client()
+    with deadline(0.1):
+        time.sleep(0.15)
+        with pytest.raises(DeadlineExceeded):
+            client.list_projects()
+    assert fake_wistia_server.request_count == 0
+
+
+def test_nested_deadlines_keep_the_earliest():
+    with deadline(0.1):
+        with deadline(60):
+            time.sleep(0.15)
+            with pytest.raises(DeadlineExceeded):
+                clamp_timeout((3.05, 30))
+
+
+def test_circuit_opens_and_recovers(fake_wistia_server):
+    fake_wistia_server.store.add_dummy_video(hashed_id="abc123")
+    metrics = MetricsRegistry()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.2)
+    client = fake_wistia_server.client(circuit_breaker=breaker, instrumentation=metrics)
+
+    fake_wistia_server.server_error_rate = 1.0
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            client.show_media("abc123")
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        client.show_media("abc123")
+    assert fake_wistia_server.request_count == 3
+
+    time.sleep(0.25)
+    assert breaker.state == HALF_OPEN
+    fake_wistia_server.server_error_rate = 0.0
+    assert client.show_media("abc123").hashed_id == "abc123"
+    assert breaker.state == CLOSED
+    assert metrics.circuit_changes == {OPEN: 1, HALF_OPEN: 1, CLOSED: 1}
+
+
+def test_failed_trial_reopens_the_circuit(fake_wistia_server):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+    client = fake_wistia_server.client(circuit_breaker=breaker)
+    fake_wistia_server.server_error_rate = 1.0
+    with pytest.raises(requests.HTTPError):
+        client.list_projects()
+    time.sleep(0.15)
+    with pytest.raises(requests.HTTPError):
+        client.list_projects()  # the trial
+    assert breaker.state == OPEN
+
+
+def test_client_errors_do_not_open_the_circuit(fake_wistia_server):
+    breaker = CircuitBreaker(failure_threshold=1)
+    client = fake_wistia_server.client(circuit_breaker=breaker)
+    with pytest.raises(requests.HTTPError):
+        client.show_media("missing")
+    assert breaker.state == CLOSED
+
+
+def test_callers_deadlines_and_interrupts_do_not_count_as_failures():
+    with FakeWistiaServer(latency=fixed_latency(0.3)) as server:
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = server.client(circuit_breaker=breaker)
+        with deadline(0.1):
+            with pytest.raises(requests.Timeout):
+                client.list_projects()
+        assert breaker.state == CLOSED
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_error(requests.ConnectionError())
+    breaker.before_request()  # the trial
+    breaker.record_error(KeyboardInterrupt())
+    assert breaker.failures == 1
+    breaker.before_request()  # the interrupted trial no longer holds the circuit
+    breaker.record_error(DeadlineExceeded())
+    assert breaker.failures == 1
+
+
+def test_stale_responses_are_served_while_the_api_fails(fake_wistia_server):
+    fake_wistia_server.store.add_dummy_video(hashed_id="abc123", name="Original")
+    metrics = MetricsRegistry()
+    client = fake_wistia_server.client(
+        circuit_breaker=CircuitBreaker(failure_threshold=1),
+        stale_cache_size=10,
+        instrumentation=metrics,
+    )
+    assert client.show_media("abc123").name == "Original"
+
+    fake_wistia_server.server_error_rate = 1.0
+    assert client.show_media("abc123").name == "Original"  # after a 5xx
+    assert client.show_media("abc123").name == "Original"  # circuit open
+    assert fake_wistia_server.request_count == 2
+    assert metrics.cache_hits["medias/{id}.json"] == 2
+    with pytest.raises(CircuitOpenError):
+        client.list_projects()  # never fetched, so nothing stale to serve
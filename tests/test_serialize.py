@@ -0,0 +1,59 @@
+import io
+import json
+
+import pytest
+
+from wistia.schema import Asset, CaptionTrack, Media, MediaStats, Project
+from wistia.serialize import raw_payload, to_wire, write_json, write_jsonl
+
+
+@pytest.mark.parametrize("model_cls", [Asset, CaptionTrack, Media, MediaStats, Project])
+def test_to_wire_matches_to_primitive(model_cls):
+    for _ in range(50):
+        model = model_cls.get_mock_object()
+        assert to_wire(model) == model.to_primitive()
+
+
+def test_to_wire_follows_export_rules():
+    media = Media.get_mock_object()
+    media.section = None  # omitted when None
+    media.duration = None  # kept as null
+    project = Project.get_mock_object()
+    project.medias = []  # omitted when empty
+    assert to_wire(media) == media.to_primitive()
+    assert "section" not in to_wire(media)
+    assert to_wire(project) == project.to_primitive()
+    project.medias = [media]
+    assert to_wire(project)["medias"] == [media.to_primitive()]
+
+
+def test_unchanged_models_reuse_their_raw_payload(fake_wistia_server):
+    client = fake_wistia_server.client(keep_raw=True)
+    medias = client.list_medias(per_page=10)
+    media = medias[0]
+    raw = raw_payload(media)
+    assert raw is not None
+    assert to_wire(media) is raw
+
+    media.thumbnail.width += 1
+    assert raw_payload(media) is None
+    assert to_wire(media)["thumbnail"]["width"] == media.thumbnail.width
+
+    assert raw_payload(fake_wistia_server.client().list_medias(per_page=1)[0]) is None
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+def test_write_jsonl_and_json(codec):
+    pytest.importorskip(codec)
+    medias = [Media.get_mock_object() for _ in range(5)]
+    jsonl = io.BytesIO()
+    assert write_jsonl(jsonl, medias, codec=codec) == 5
+    lines = jsonl.getvalue().decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [media.to_primitive() for media in medias]
+
+    array = io.BytesIO()
+    assert write_json(array, medias, codec=codec) == 5
+    assert json.loads(array.getvalue()) == [media.to_primitive() for media in medias]
+    empty = io.BytesIO()
+    write_json(empty, [])
+    assert json.loads(empty.getvalue()) == []
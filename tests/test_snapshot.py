@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from wistia.dummy import DummyWistiaClient
+from wistia.schema import Media
+from wistia.snapshot import (
+    SnapshotWriter,
+    diff_snapshots,
+    media_digest,
+    read_snapshot,
+    take_snapshot,
+    write_snapshot,
+)
+
+
+def test_digest_is_the_same_for_model_and_primitive():
+    store = DummyWistiaClient()
+    store.seed(media_count=3)
+    media = store.list_medias()[0]
+    assert media_digest(media) == media_digest(media.to_primitive())
+    media.name = "Renamed"
+    assert media_digest(media) != media_digest(store.list_medias()[1])
+
+
+def test_digest_ignores_raw_payload_formatting():
+    store = DummyWistiaClient()
+    store.seed(media_count=1)
+    raw = store.list_medias()[0].to_primitive()
+    raw["created"] = raw["created"].replace("+0000", "+00:00")
+    raw["unknownField"] = "ignored"
+    assert media_digest(raw) == media_digest(Media(raw, strict=False))
+    assert media_digest(raw) == media_digest(store.list_medias()[0])
+
+
+@pytest.mark.parametrize("chunk_size", [1000, 7])
+def test_snapshot_is_sorted_and_deduplicated(tmp_path, chunk_size):
+    path = str(tmp_path / "catalog.snap")
+    with SnapshotWriter(path, chunk_size=chunk_size) as writer:
+        for number in range(50, 0, -1):
+            writer.add_digest(f"m{number:03d}", bytes(16))
+        writer.add_digest("m010", b"\1" * 16)
+
+    records = list(read_snapshot(path))
+    assert [hashed_id for hashed_id, _ in records] == [f"m{number:03d}" for number in range(1, 51)]
+    assert dict(records)["m010"] == b"\1" * 16
+    # Temporary runs are cleaned up
+    assert os.listdir(tmp_path) == ["catalog.snap"]
+
+
+def test_diff_snapshots(fake_wistia_server, tmp_path):
+    store = fake_wistia_server.store
+    client = fake_wistia_server.client()
+    old_path, new_path = str(tmp_path / "old.snap"), str(tmp_path / "new.snap")
+    assert take_snapshot(client, old_path) == 250
+
+    medias = store.list_medias(per_page=None)
+    store.update_media(medias[0].hashed_id, name="Renamed")
+    store.delete_media(medias[1].hashed_id)
+    added = store.copy_media(medias[2].hashed_id)
+    take_snapshot(client, new_path)
+
+    diff = diff_snapshots(old_path, new_path)
+    assert diff.created == [added.hashed_id]
+    assert diff.updated == [medias[0].hashed_id]
+    assert diff.deleted == [medias[1].hashed_id]
+    assert diff_snapshots(new_path, new_path) == ([], [], [])
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-snapshot"
+    path.write_bytes(b"hello")
+    with pytest.raises(ValueError):
+        list(read_snapshot(str(path)))
+    assert write_snapshot(str(tmp_path / "empty.snap"), []) == 0
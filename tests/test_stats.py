@@ -0,0 +1,62 @@
+import responses
+
+from wistia.batch import BatchExecutor
+from wistia.client import WistiaClient
+from wistia.instrumentation import MetricsRegistry
+from wistia.stats import StatsCache, fetch_media_stats
+
+example_stats = {
+    "id": 181279,
+    "hashed_id": "abcde12345",
+    "name": "Introducing the Slimlist",
+    "stats": {
+        "pageLoads": 2,
+        "visitors": 2,
+        "percentOfVisitorsClickingPlay": 50,
+        "plays": 1,
+        "averagePercentWatched": 100,
+    },
+}
+
+
+@responses.activate
+def test_show_media_stats():
+    responses.add(
+        responses.GET, "https://api.wistia.com/v1/medias/abcde12345/stats.json", json=example_stats
+    )
+    media_stats = WistiaClient().show_media_stats("abcde12345")
+    assert media_stats.stats.plays == 1
+    assert media_stats.stats.percent_of_visitors_clicking_play == 50
+
+
+def test_bulk_stats_are_cached_within_freshness_window(fake_wistia_server, tmp_path):
+    store = fake_wistia_server.store
+    hashed_ids = [media.hashed_id for media in store.list_medias(per_page=20)]
+    store.stats[hashed_ids[0]] = {"plays": 42}
+    metrics = MetricsRegistry()
+    client = fake_wistia_server.client()
+    client.instrumentation.append(metrics)
+    executor = BatchExecutor(client, requests_per_second=None)
+    cache_path = str(tmp_path / "stats.json")
+
+    first = fetch_media_stats(client, hashed_ids, cache=StatsCache(max_age=60, path=cache_path), executor=executor)
+    assert first.ok
+    assert first.succeeded[hashed_ids[0]].stats.plays == 42
+    assert metrics.request_count("medias/{id}/stats.json") == 20
+
+    # A new cache instance (e.g. the next dashboard refresh) reads the saved entries
+    second = fetch_media_stats(client, hashed_ids, cache=StatsCache(max_age=60, path=cache_path), executor=executor)
+    assert second.cache_hits == 20
+    assert second.succeeded[hashed_ids[0]].stats.plays == 42
+    assert metrics.request_count("medias/{id}/stats.json") == 20
+    assert metrics.cache_hits["medias/{id}/stats.json"] == 20
+
+
+def test_stale_entries_are_refetched(fake_wistia_server):
+    client = fake_wistia_server.client()
+    hashed_id = fake_wistia_server.store.list_medias()[0].hashed_id
+    cache = StatsCache(max_age=60)
+    cache.put(hashed_id, client.show_media_stats(hashed_id), fetched_at=0)
+    result = fetch_media_stats(client, [hashed_id], cache=cache)
+    assert result.cache_hits == 0
+    assert hashed_id in result.succeeded
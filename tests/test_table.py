@@ -0,0 +1,103 @@
+import json
+import math
+import tracemalloc
+from datetime import datetime, timezone
+from os import path
+
+import pytest
+
+from wistia.dummy import DummyWistiaClient
+from wistia.schema import Media
+from wistia.table import MediaTable
+
+
+@pytest.fixture(params=[False, True], ids=["python", "numpy"])
+def use_numpy(request):
+    if request.param:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+@pytest.fixture
+def medias():
+    store = DummyWistiaClient()
+    store.seed(media_count=300, project_count=4)
+    return store.list_medias(per_page=None)
+
+
+def test_rows_round_trip(medias, use_numpy):
+    table = MediaTable(medias, use_numpy=use_numpy)
+    assert len(table) == 300
+    media = medias[7]
+    row = table[7]
+    assert (row.id, row.hashed_id, row.name, row.status) == (
+        media.id, media.hashed_id, media.name, media.status
+    )
+    assert row.project_id == media.project.id
+    assert row.created == media.created
+    assert row.to_media().to_primitive()["hashed_id"] == media.hashed_id
+    assert [asset.url for asset in row.assets] == [asset.url for asset in media.assets or []]
+    assert table[-1].hashed_id == medias[-1].hashed_id
+
+
+def test_build_from_primitives(medias):
+    table = MediaTable(media.to_primitive() for media in medias[:10])
+    assert [row.hashed_id for row in table] == [media.hashed_id for media in medias[:10]]
+    assert table[0].created == medias[0].created
+
+
+def test_flattened_assets():
+    with open(path.join(path.dirname(__file__), "test_media.json")) as media_file:
+        records = json.load(media_file)
+    table = MediaTable([Media(record, strict=False) for record in records] + records)
+    for row, record in zip(table, records + records):
+        assert [asset.to_dict() for asset in row.assets] == record["assets"]
+    assert len(table.asset_url) == 2 * sum(len(record["assets"]) for record in records)
+
+
+def test_filters_and_aggregates(medias, use_numpy):
+    table = MediaTable(medias, use_numpy=use_numpy)
+
+    expected_counts = {}
+    expected_durations = {}
+    for media in medias:
+        expected_counts[media.status] = expected_counts.get(media.status, 0) + 1
+        expected_durations[media.project.id] = (
+            expected_durations.get(media.project.id, 0.0) + (media.duration or 0.0)
+        )
+    assert table.count_by_status() == expected_counts
+    assert table.duration_by_project() == pytest.approx(expected_durations)
+
+    project_id = medias[0].project.id
+    cutoff = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    selected = table.filter(status="ready", project_id=project_id, min_duration=10, created_after=cutoff)
+    expected = [
+        media.hashed_id
+        for media in medias
+        if media.status == "ready"
+        and media.project.id == project_id
+        and (media.duration or math.nan) >= 10
+        and media.created >= cutoff
+    ]
+    assert [row.hashed_id for row in selected] == expected
+    assert len(table.where(status="no-such-status")) == 0
+
+
+def test_uses_less_memory_than_models():
+    store = DummyWistiaClient()
+    store.seed(media_count=2000, project_count=4)
+    records = [media.to_primitive() for media in store.list_medias(per_page=None)]
+
+    tracemalloc.start()
+    models = [Media(record, strict=False) for record in records]
+    model_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+
+    tracemalloc.start()
+    table = MediaTable(records, use_numpy=False)
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(table) == 2000
+    assert table_bytes * 5 < model_bytes
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from wistia.instrumentation import MetricsRegistry
+from wistia.waiter import MediaWaiter, WaitTimeout, wait_until_ready
+
+
+@pytest.fixture
+def processing(fake_wistia_server):
+    store = fake_wistia_server.store
+    hashed_ids = [media.hashed_id for media in store.list_medias(per_page=30)]
+    for hashed_id in hashed_ids:
+        media = store.medias[hashed_id]
+        media.status = "processing"
+        media.progress = 0.0
+    return hashed_ids
+
+
+def finish(store, hashed_id, status="ready"):
+    media = store.medias[hashed_id]
+    media.progress = 1.0
+    media.status = status
+
+
+def test_polls_in_batches_and_yields_as_medias_settle(fake_wistia_server, processing):
+    store = fake_wistia_server.store
+    metrics = MetricsRegistry()
+    client = fake_wistia_server.client()
+    client.instrumentation.append(metrics)
+
+    def processor():
+        for step, hashed_id in enumerate(processing):
+            time.sleep(0.005)
+            finish(store, hashed_id, "failed" if step == 3 else "ready")
+
+    threading.Thread(target=processor).start()
+    settled = list(wait_until_ready(client, processing, timeout=10, min_interval=0.05, max_interval=0.1))
+
+    assert sorted(media.hashed_id for media in settled) == sorted(processing)
+    assert sum(media.status == "failed" for media in settled) == 1
+    assert metrics.request_count("medias/{id}.json") == 0
+    # Far fewer requests than one per media per poll
+    assert metrics.request_count("medias.json") < len(processing)
+
+
+def test_backs_off_using_progress(fake_wistia_server, processing):
+    store = fake_wistia_server.store
+    waiter = MediaWaiter(fake_wistia_server.client(), processing[:1], min_interval=0.01, max_interval=100)
+    media = store.medias[processing[0]]
+    tracked = waiter._pending[processing[0]]
+
+    waiter._schedule(tracked, media, now=0.0)
+    assert tracked.interval == 0.01
+    waiter._schedule(tracked, media, now=1.0)  # no progress: exponential backoff
+    assert tracked.interval == pytest.approx(0.015)
+    media.progress = 0.5
+    waiter._schedule(tracked, media, now=10.0)
+    # Half done after 10s: about 10s to go, so check again in about 5s
+    assert tracked.interval == pytest.approx(5.0)
+
+
+def test_webhook_short_circuits_the_backoff(fake_wistia_server, processing):
+    store = fake_wistia_server.store
+    waiter = MediaWaiter(fake_wistia_server.client(), processing[:2], min_interval=30, max_interval=60)
+
+    def on_webhook():
+        time.sleep(0.2)
+        finish(store, processing[0])
+        waiter.notify(processing[0])
+
+    threading.Thread(target=on_webhook).start()
+    started = time.monotonic()
+    settled = waiter.wait(timeout=5)
+    assert next(settled).hashed_id == processing[0]
+    assert time.monotonic() - started < 2
+    assert waiter.pending == [processing[1]]
+
+
+def test_timeout_lists_pending_medias(fake_wistia_server, processing):
+    client = fake_wistia_server.client()
+    finish(fake_wistia_server.store, processing[0])
+    fake_wistia_server.store.delete_media(processing[1])
+
+    waiter = MediaWaiter(client, processing[:3], min_interval=0.05, max_interval=0.05)
+    settled = []
+    with pytest.raises(WaitTimeout) as error:
+        for media in waiter.wait(timeout=0.3):
+            settled.append(media.hashed_id)
+    assert settled == [processing[0]]
+    assert waiter.missing == [processing[1]]
+    assert error.value.pending == [processing[2]]
+
+
+def test_handle_event_delivery_notifies_settling_events():
+    from tests.test_webhooks import delivery_template, media_processing_event_data, media_ready_event_data
+    from wistia.webhooks import parse_webhook_event_delivery
+
+    waiter = MediaWaiter(client=None, hashed_ids=["vpe2p82q64", "other"])
+    waiter.handle_event_delivery(
+        parse_webhook_event_delivery({**delivery_template, "events": [media_processing_event_data]})
+    )
+    assert waiter._notified == set()
+    waiter.handle_event_delivery(
+        parse_webhook_event_delivery({**delivery_template, "events": [media_ready_event_data]})
+    )
+    assert waiter._notified == {"vpe2p82q64"}
+
+
+def test_ignores_medias_that_were_not_asked_for(fake_wistia_server, processing):
+    client = fake_wistia_server.client()
+    list_medias = client.list_medias
+
+    def list_medias_ignoring_filter(hashed_ids=None, **params):
+        return list_medias(**params)  # as if the API dropped the hashed_ids filter
+
+    client.list_medias = list_medias_ignoring_filter
+    finish(fake_wistia_server.store, processing[0])
+    waiter = MediaWaiter(client, processing[:1], min_interval=0.01)
+    assert [media.hashed_id for media in waiter.wait(timeout=5)] == processing[:1]
+
+
+def test_timeout_applies_while_polls_keep_coming_due(fake_wistia_server, processing):
+    waiter = MediaWaiter(fake_wistia_server.client(), processing, min_interval=0.0, max_interval=0.0)
+    started_at = time.monotonic()
+    with pytest.raises(WaitTimeout):
+        list(waiter.wait(timeout=0.3))
+    assert time.monotonic() - started_at < 1.0
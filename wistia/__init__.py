@@ -1,13 +1,37 @@
 from .__version__ import __version__
-from .client import WistiaClient
-from .dummy import DummyWistiaClient
-from .helpers import get_wistia_client
-from .schema import (
-    Asset,
-    CaptionTrack,
-    Media,
-    Project,
-    ProjectReference,
-    Thumbnail,
-)
-from . import webhooks
+
+# Exports are imported on first access (PEP 562), so that `import wistia` stays cheap
+# for processes that only need part of the package
+_LAZY_EXPORTS = {
+    "WistiaClient": "wistia.client",
+    "DummyWistiaClient": "wistia.dummy",
+    "get_wistia_client": "wistia.helpers",
+    "Asset": "wistia.schema",
+    "CaptionTrack": "wistia.schema",
+    "Media": "wistia.schema",
+    "MediaStats": "wistia.schema",
+    "Project": "wistia.schema",
+    "ProjectReference": "wistia.schema",
+    "Thumbnail": "wistia.schema",
+}
+
+_LAZY_SUBMODULES = {"webhooks"}
+
+__all__ = ["__version__", *_LAZY_EXPORTS, *_LAZY_SUBMODULES]
+
+
+def __getattr__(name):
+    from importlib import import_module
+
+    if name in _LAZY_EXPORTS:
+        value = getattr(import_module(_LAZY_EXPORTS[name]), name)
+    elif name in _LAZY_SUBMODULES:
+        value = import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,130 @@
+"""
+Pydantic models for Wistia webhook deliveries
+
+Kept apart from wistia.webhooks so that verifying signatures does not import
+pydantic; import the models from wistia.webhooks.
+"""
+
+from datetime import datetime
+from typing_extensions import Annotated, Literal
+from typing import (
+    List,
+    Optional,
+    Union,
+)
+
+import uuid as uuid
+
+# noinspection PyUnresolvedReferences
+from pydantic import (
+    BaseModel,
+    Field,
+    ValidationError,
+)
+
+media_event_type_names = Literal[
+    "media.created",
+    "media.processing",
+    "media.ready",
+    "media.failed",
+    "media.updated",
+    "media.deleted",
+]
+
+
+viewing_event_type_names = Literal[
+    "viewing_session.play",
+    "viewing_session.percent_watched",
+    "viewing_session.turnstile.converted",
+    "viewing_session.call_to_action.converted",
+    "viewing_session.annotation.converted",
+]
+
+
+class Thumbnail(BaseModel):
+    url: str
+
+
+class MediaInfo(BaseModel):
+    id: str
+    name: str
+    url: str
+    duration: Optional[float] = None
+    thumbnail: Thumbnail
+
+
+class MediaReference(BaseModel):
+    id: str
+
+
+class MediaPayload(BaseModel):
+    media: MediaInfo
+
+
+class MediaDeletedPayload(MediaPayload):
+    media: MediaReference
+
+
+class MediaUpdatedPayload(BaseModel):
+    media: MediaInfo
+    previous_attributes: dict = Field(default_factory=dict)
+
+
+class MediaEvent(BaseModel):
+    type: media_event_type_names
+    uuid: str
+    payload: Union[MediaPayload, MediaUpdatedPayload, MediaDeletedPayload]
+    metadata: dict
+    generated_at: datetime
+
+
+class MediaCreatedEvent(MediaEvent):
+    type: Literal["media.created"]
+    payload: MediaPayload
+
+
+class MediaProcessingEvent(MediaEvent):
+    type: Literal["media.processing"]
+    payload: MediaPayload
+
+
+class MediaReadyEvent(MediaEvent):
+    type: Literal["media.ready"]
+    payload: MediaPayload
+
+
+class MediaFailedEvent(MediaEvent):
+    type: Literal["media.failed"]
+    payload: MediaPayload
+
+
+class MediaUpdatedEvent(MediaEvent):
+    type: Literal["media.updated"]
+    payload: MediaUpdatedPayload
+
+
+class MediaDeletedEvent(MediaEvent):
+    type: Literal["media.deleted"]
+    payload: MediaDeletedPayload
+
+
+MediaEvent = Annotated[
+    Union[
+        MediaCreatedEvent,
+        MediaProcessingEvent,
+        MediaReadyEvent,
+        MediaFailedEvent,
+        MediaUpdatedEvent,
+        MediaDeletedEvent,
+    ],
+    Field(discriminator="type"),
+]
+
+
+class HookInfo(BaseModel):
+    uuid: uuid.UUID
+
+
+class EventDelivery(BaseModel):
+    hook: HookInfo
+    events: List[MediaEvent]
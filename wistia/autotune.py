@@ -0,0 +1,270 @@
+"""
+Self-tuning pagination
+
+PageTuner lists every project or media while adjusting the page size and the number
+of pages fetched concurrently to get the most records per second out of the account:
+
+    tuner = PageTuner("pagination.json")
+    for media in tuner.iter_records(client, "medias", sort_by="created"):
+        ...
+
+Pages are fetched in rounds of `workers` pages of `per_page` records. Each round's
+throughput is scored against its settings (an exponential moving average), and the
+next round either tries an untried neighbouring setting (one worker more or less,
+the next page size up or down) or moves to the best one scored so far. Page sizes
+only change where the records fetched so far line up with the new size, so records
+are neither skipped nor repeated.
+
+Page sizes stay within the API's maximum of 100. A 429 response halves the
+workers and the round is retried after the Retry-After delay. The best settings,
+with the measured latency and bytes per page, are saved to `state_path` after
+each listing, and the next listing starts from them.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+import requests
+
+from wistia.client import WistiaClient
+from wistia.instrumentation import Instrumentation, RequestEvent
+from wistia.resilience import retry_after
+
+log = logging.getLogger(__name__)
+
+MAX_PER_PAGE = 100
+PER_PAGE_STEPS = (10, 20, 50, 100)
+DEFAULT_SETTINGS = (100, 4)
+
+# resource -> the client method listing it
+LIST_METHODS = {"projects": "list_projects", "medias": "list_medias"}
+
+
+class PageSettings(NamedTuple):
+    per_page: int
+    workers: int
+
+
+class _PageResult(NamedTuple):
+    items: list
+    wire_bytes: int
+    latency: float
+    finished_at: float
+
+
+# Sizes of the responses to the page being fetched. Set by the fetch and carried to
+# whichever thread sends the request, including the hedger's pool.
+_page_wire_bytes: contextvars.ContextVar = contextvars.ContextVar("wistia_page_wire_bytes", default=None)
+
+
+class _WireBytesMeter(Instrumentation):
+    """Reports the size of each response to the page fetch that requested it"""
+
+    def on_request_end(self, request: RequestEvent) -> None:
+        sizes = _page_wire_bytes.get()
+        if sizes is not None and request.error is None:
+            sizes.append(request.wire_bytes_received)
+
+
+class PageTuner:
+    def __init__(
+        self,
+        state_path: str = None,
+        max_workers: int = 8,
+        per_page_steps: Tuple[int, ...] = PER_PAGE_STEPS,
+        smoothing: float = 0.5,
+        retry_delay: float = 1.0,
+    ):
+        """
+        :param state_path: JSON file the tuned settings are kept in between runs
+        :param max_workers: Most pages fetched at once; keep it within the client's
+            max_connections and the account's rate limit
+        :param per_page_steps: Page sizes to choose from, at most 100
+        :param smoothing: Weight of the latest round in each setting's score
+        :param retry_delay: Seconds to wait after a 429 without a Retry-After header
+        """
+        if max(per_page_steps) > MAX_PER_PAGE:
+            raise ValueError(f"The API returns at most {MAX_PER_PAGE} records per page")
+        self.state_path = state_path
+        self.max_workers = max_workers
+        self.per_page_steps = tuple(sorted(per_page_steps))
+        self.smoothing = smoothing
+        self.retry_delay = retry_delay
+        self.state: Dict[str, dict] = {}
+        if state_path and os.path.exists(state_path):
+            with open(state_path) as state_file:
+                self.state = json.load(state_file)
+
+    def settings(self, key: str) -> PageSettings:
+        """The settings the next listing of `key` starts with"""
+        saved = self.state.get(key, {})
+        per_page, workers = saved.get("per_page"), saved.get("workers")
+        if per_page not in self.per_page_steps:
+            per_page = min(DEFAULT_SETTINGS[0], self.per_page_steps[-1])
+        if not workers:
+            workers = DEFAULT_SETTINGS[1]
+        return PageSettings(per_page, min(max(workers, 1), self.max_workers))
+
+    def save(self) -> None:
+        if not self.state_path:
+            return
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w") as state_file:
+            json.dump(self.state, state_file, indent=2, sort_keys=True)
+        os.replace(temp_path, self.state_path)
+
+    # Listing
+
+    def iter_records(self, client: WistiaClient, resource: str = "medias", **params) -> Iterator:
+        """
+        Every project or media, in the order the API lists them. `params` are passed
+        to list_projects or list_medias; use a stable sort_by, such as "created".
+        """
+        list_page = getattr(client, LIST_METHODS[resource])
+        meter = _WireBytesMeter()
+
+        def fetch_page(page: int, per_page: int) -> Tuple[list, int]:
+            sizes = []
+            token = _page_wire_bytes.set(sizes)
+            try:
+                items = list_page(page=page, per_page=per_page, **params)
+            finally:
+                _page_wire_bytes.reset(token)
+            return items, sizes[0] if sizes else 0
+
+        client.instrumentation.append(meter)
+        try:
+            yield from self.paginate(resource, fetch_page)
+        finally:
+            client.instrumentation.remove(meter)
+
+    def paginate(self, key: str, fetch_page: Callable[[int, int], Tuple[list, int]]) -> Iterator:
+        """
+        Yield every item from fetch_page(page, per_page) -> (items, response bytes),
+        tuning the settings saved under `key`
+        """
+        settings = self.settings(key)
+        scores: Dict[PageSettings, float] = {}
+        measurements: Dict[PageSettings, Tuple[float, float]] = {}  # latency, bytes per page
+        offset = 0  # records yielded so far
+        round_number = 0
+
+        def timed_fetch(page: int, per_page: int) -> _PageResult:
+            started_at = time.perf_counter()
+            items, wire_bytes = fetch_page(page, per_page)
+            finished_at = time.perf_counter()
+            return _PageResult(items, wire_bytes, finished_at - started_at, finished_at)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="wistia-pages")
+        try:
+            while True:
+                per_page, workers = settings
+                first_page = offset // per_page + 1
+                started_at = time.perf_counter()
+                futures = [
+                    executor.submit(timed_fetch, page, per_page)
+                    for page in range(first_page, first_page + workers)
+                ]
+                results: List[_PageResult] = []
+                finished = False
+                try:
+                    for future in futures:
+                        result = future.result()
+                        results.append(result)
+                        offset += len(result.items)
+                        yield from result.items
+                        if len(result.items) < per_page:
+                            finished = True
+                            break
+                except requests.HTTPError as error:
+                    if getattr(error.response, "status_code", None) != 429:
+                        raise
+                    delay = retry_after(error, self.retry_delay)
+                    log.info(f"Rate limited listing {key} with {settings}, retrying in {delay}s")
+                    scores[settings] = 0.0
+                    settings = PageSettings(per_page, max(workers // 2, 1))
+                    time.sleep(delay)
+                    continue
+                finally:
+                    for future in futures:
+                        future.cancel()
+
+                if finished:
+                    break
+                # A full round: score it
+                elapsed = max(result.finished_at for result in results) - started_at
+                self._score(scores, settings, workers * per_page / elapsed)
+                measurements[settings] = (
+                    sum(result.latency for result in results) / len(results),
+                    sum(result.wire_bytes for result in results) / len(results),
+                )
+                round_number += 1
+                settings = self._next_settings(settings, scores, offset, round_number)
+        finally:
+            executor.shutdown(wait=False)
+
+        if scores:
+            self._remember(key, scores, measurements)
+
+    # Tuning
+
+    def _score(self, scores: Dict[PageSettings, float], settings: PageSettings, records_per_second: float) -> None:
+        previous = scores.get(settings)
+        if previous is None:
+            scores[settings] = records_per_second
+        else:
+            scores[settings] = self.smoothing * records_per_second + (1 - self.smoothing) * previous
+
+    def _neighbours(self, settings: PageSettings, offset: int) -> List[PageSettings]:
+        per_page, workers = settings
+        neighbours = [
+            PageSettings(per_page, count)
+            for count in (workers + 1, workers - 1)
+            if 1 <= count <= self.max_workers
+        ]
+        step = self.per_page_steps.index(per_page)
+        for other in (step + 1, step - 1):
+            if 0 <= other < len(self.per_page_steps):
+                size = self.per_page_steps[other]
+                # Only where page boundaries line up with the records already fetched
+                if offset % size == 0:
+                    neighbours.append(PageSettings(size, workers))
+        return neighbours
+
+    def _next_settings(
+        self, settings: PageSettings, scores: Dict[PageSettings, float], offset: int, round_number: int
+    ) -> PageSettings:
+        neighbours = self._neighbours(settings, offset)
+        untried = [neighbour for neighbour in neighbours if neighbour not in scores]
+        if untried and round_number % 2:
+            return untried[0]
+        candidates = [settings] + [neighbour for neighbour in neighbours if neighbour in scores]
+        return max(candidates, key=lambda candidate: scores[candidate])
+
+    def _remember(
+        self,
+        key: str,
+        scores: Dict[PageSettings, float],
+        measurements: Dict[PageSettings, Tuple[float, float]],
+    ) -> None:
+        best = max(scores, key=lambda candidate: scores[candidate])
+        latency, wire_bytes = measurements.get(best, (None, None))
+        self.state[key] = {
+            "per_page": best.per_page,
+            "workers": best.workers,
+            "records_per_second": round(scores[best], 1),
+            "seconds_per_page": latency,
+            "bytes_per_page": wire_bytes,
+        }
+        log.info(f"Tuned pagination for {key}: {self.state[key]}")
+        self.save()
+
+
+def iter_all(client: WistiaClient, resource: str = "medias", state_path: str = None, **params) -> Iterator:
+    """Every project or media, fetched with tuned pagination; see PageTuner"""
+    return PageTuner(state_path).iter_records(client, resource, **params)
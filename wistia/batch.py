@@ -0,0 +1,169 @@
+"""
+Apply one client operation to many medias (or projects) concurrently
+
+    executor = BatchExecutor(client, max_workers=8, requests_per_second=10)
+    result = executor.run("copy_media", hashed_ids, project_id="abc123", dry_run=True)
+    result = executor.run("delete_media", hashed_ids)
+    for hashed_id, error in result.failed.items():
+        ...
+
+Requests are spread out under the account's rate limit (600 requests a minute by
+default), and errors are collected per item instead of stopping the batch. A 429
+response retries just the request that got it, after its Retry-After delay, so an
+operation made of several requests (like move_media) never repeats the ones that
+already succeeded.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Union
+
+import requests
+
+from wistia.client import WistiaClient
+from wistia.resilience import retry_after, retry_rate_limited
+
+log = logging.getLogger(__name__)
+
+# https://wistia.com/support/developers/data-api#rate-limit
+DEFAULT_REQUESTS_PER_SECOND = 10
+
+
+class RateLimiter:
+    """Thread-safe token bucket"""
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(int(rate), 1)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated_at) * self.rate
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class BatchResult:
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.succeeded: Dict[str, object] = {}
+        self.failed: Dict[str, Exception] = {}
+        self.planned: List[str] = []
+        self.retries = 0
+        self.cache_hits = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __repr__(self):
+        return (
+            f"BatchResult(succeeded={len(self.succeeded)}, failed={len(self.failed)}, "
+            f"planned={len(self.planned)}, retries={self.retries})"
+        )
+
+
+class BatchExecutor:
+    def __init__(
+        self,
+        client: WistiaClient,
+        max_workers: int = 8,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        max_retries: int = 3,
+        rate_limiter: RateLimiter = None,
+    ):
+        self.client = client
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or (
+            RateLimiter(requests_per_second) if requests_per_second else None
+        )
+        self._lock = threading.Lock()
+
+    def _resolve(self, operation: Union[str, Callable]) -> Callable:
+        if callable(operation):
+            return operation
+        return getattr(self.client, operation)
+
+    def run(
+        self,
+        operation: Union[str, Callable],
+        hashed_ids: Iterable[str],
+        dry_run: bool = False,
+        requests_per_item: int = 1,
+        idempotent: bool = False,
+        **kwargs,
+    ) -> BatchResult:
+        """
+        Call `operation(hashed_id, **kwargs)` for each hashed_id.
+        :param operation: A WistiaClient method name, e.g. "delete_media", or a callable
+        :param dry_run: Only log and record what would be done
+        :param requests_per_item: API requests each call makes, for rate limiting
+            (e.g. 2 for move_media)
+        :param idempotent: Also retry the whole call when a 429 escapes it, e.g. from a
+            callable making requests without the client
+        """
+        result = BatchResult(dry_run=dry_run)
+        hashed_ids = list(dict.fromkeys(hashed_ids))
+        operation_name = getattr(operation, "__name__", operation)
+
+        if dry_run:
+            for hashed_id in hashed_ids:
+                log.info(f"DRY RUN: {operation_name}({hashed_id!r}, **{kwargs!r})")
+                result.planned.append(hashed_id)
+            return result
+
+        function = self._resolve(operation)
+
+        def on_retry(attempt, delay):
+            with self._lock:
+                result.retries += 1
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+
+        def apply(hashed_id):
+            for attempt in range(self.max_retries + 1):
+                if self.rate_limiter:
+                    for _ in range(requests_per_item):
+                        self.rate_limiter.acquire()
+                try:
+                    with retry_rate_limited(self.max_retries, on_retry):
+                        outcome = function(hashed_id, **kwargs)
+                except requests.HTTPError as error:
+                    status_code = getattr(error.response, "status_code", None)
+                    if idempotent and status_code == 429 and attempt < self.max_retries:
+                        delay = retry_after(error, default=2 ** attempt)
+                        on_retry(attempt + 1, delay)
+                        time.sleep(delay)
+                        continue
+                    with self._lock:
+                        result.failed[hashed_id] = error
+                    return
+                except Exception as error:
+                    with self._lock:
+                        result.failed[hashed_id] = error
+                    return
+                with self._lock:
+                    result.succeeded[hashed_id] = outcome
+                return
+
+        log.info(f"Applying {operation_name} to {len(hashed_ids)} items")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for _ in executor.map(apply, hashed_ids):
+                pass
+        if result.failed:
+            log.warning(f"{operation_name} failed for {len(result.failed)} of {len(hashed_ids)} items")
+        return result
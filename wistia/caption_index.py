@@ -0,0 +1,244 @@
+"""
+Full-text search over an account's captions
+
+CaptionIndex keeps every caption cue in an SQLite file with an FTS5 index, so
+spoken content can be searched across all videos:
+
+    index = CaptionIndex("captions.db")
+    index.build(client, hashed_ids)  # once
+    for hit in index.search("quarterly results"):
+        print(hit.hashed_id, hit.language, hit.start, hit.text)
+
+After the first build it is kept up to date incrementally, one media at a time:
+
+    index.watch(client)  # caption changes made through this client mark medias dirty
+    client.update_captions(...)
+    index.sync()  # re-fetches only the dirty medias
+
+    index.handle_event_delivery(delivery, client)  # from media.* webhooks
+
+Tracks whose text has not changed are not re-indexed.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, NamedTuple
+
+import requests
+
+from wistia.captions import Captions
+from wistia.client import WistiaClient
+from wistia.instrumentation import Instrumentation, RequestEvent
+from wistia.schema import CaptionTrack
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    hashed_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (hashed_id, language)
+);
+CREATE TABLE IF NOT EXISTS cues (
+    id INTEGER PRIMARY KEY,
+    hashed_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cues_track ON cues (hashed_id, language);
+CREATE VIRTUAL TABLE IF NOT EXISTS cue_text USING fts5(
+    text, content='cues', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS cues_insert AFTER INSERT ON cues BEGIN
+    INSERT INTO cue_text (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS cues_delete AFTER DELETE ON cues BEGIN
+    INSERT INTO cue_text (cue_text, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+class CaptionHit(NamedTuple):
+    hashed_id: str
+    language: str
+    start: float
+    end: float
+    text: str
+
+
+def _fts_query(query: str) -> str:
+    # Every word must appear; quoting keeps FTS5 operators in user input literal
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+class _CaptionChangeWatcher(Instrumentation):
+    """Marks medias dirty when captions are changed through a client"""
+
+    def __init__(self, index: "CaptionIndex"):
+        self.index = index
+
+    def on_request_end(self, request: RequestEvent) -> None:
+        if request.method == "GET" or request.error is not None:
+            return
+        segments = request.rel_path.split("?", 1)[0].split("/")
+        if len(segments) >= 3 and segments[0] == "medias" and segments[2].startswith("captions"):
+            if segments[-1] != "purchase.json":  # purchased captions arrive later, by webhook
+                self.index.mark_dirty(segments[1])
+        elif len(segments) == 2 and segments[0] == "medias" and request.method == "DELETE":
+            self.index.mark_dirty(segments[1][: -len(".json")])
+
+
+class CaptionIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._dirty = set()
+        self._client = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    # Writing
+
+    def _replace_track(self, hashed_id: str, track: CaptionTrack) -> bool:
+        text = track.text or ""
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        row = self._connection.execute(
+            "SELECT digest FROM tracks WHERE hashed_id = ? AND language = ?",
+            (hashed_id, track.language),
+        ).fetchone()
+        if row is not None and row[0] == digest:
+            return False
+        self._connection.execute(
+            "DELETE FROM cues WHERE hashed_id = ? AND language = ?", (hashed_id, track.language)
+        )
+        self._connection.executemany(
+            "INSERT INTO cues (hashed_id, language, start, end, text) VALUES (?, ?, ?, ?, ?)",
+            (
+                (hashed_id, track.language, cue.start, cue.end, cue.text)
+                for cue in Captions.from_text(text)
+            ),
+        )
+        self._connection.execute(
+            "INSERT OR REPLACE INTO tracks (hashed_id, language, digest) VALUES (?, ?, ?)",
+            (hashed_id, track.language, digest),
+        )
+        return True
+
+    def index_tracks(self, hashed_id: str, tracks: Iterable[CaptionTrack]) -> int:
+        """
+        Make the index hold exactly these tracks for the media, returning the
+        number of tracks (re)indexed
+        """
+        tracks = list(tracks)
+        with self._lock, self._connection:
+            changed = sum(self._replace_track(hashed_id, track) for track in tracks)
+            languages = [track.language for track in tracks]
+            placeholders = ",".join("?" * len(languages))
+            self._connection.execute(
+                f"DELETE FROM cues WHERE hashed_id = ? AND language NOT IN ({placeholders})",
+                (hashed_id, *languages),
+            )
+            self._connection.execute(
+                f"DELETE FROM tracks WHERE hashed_id = ? AND language NOT IN ({placeholders})",
+                (hashed_id, *languages),
+            )
+        return changed
+
+    def remove_media(self, hashed_id: str) -> None:
+        self.index_tracks(hashed_id, [])
+
+    def refresh_media(self, client: WistiaClient, hashed_id: str) -> int:
+        """Re-fetch a media's captions and update the index"""
+        try:
+            tracks = client.list_captions(hashed_id)
+        except requests.HTTPError as error:
+            if getattr(error.response, "status_code", None) != 404:
+                raise
+            tracks = []  # deleted
+        return self.index_tracks(hashed_id, tracks)
+
+    def build(self, client: WistiaClient, hashed_ids: Iterable[str], max_workers: int = 8) -> int:
+        """Index the captions of many medias, fetching them concurrently"""
+
+        def fetch(hashed_id):
+            try:
+                return hashed_id, client.list_captions(hashed_id)
+            except requests.HTTPError as error:
+                if getattr(error.response, "status_code", None) != 404:
+                    raise
+                return hashed_id, []
+
+        changed = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for hashed_id, tracks in executor.map(fetch, hashed_ids):
+                changed += self.index_tracks(hashed_id, tracks)
+        log.info(f"Caption index: {changed} tracks indexed")
+        return changed
+
+    # Incremental updates
+
+    def watch(self, client: WistiaClient) -> None:
+        """Track caption changes made through `client`; apply them with sync()"""
+        self._client = client
+        client.instrumentation.append(_CaptionChangeWatcher(self))
+
+    def mark_dirty(self, hashed_id: str) -> None:
+        with self._lock:
+            self._dirty.add(hashed_id)
+
+    def sync(self, client: WistiaClient = None) -> int:
+        """Refresh the medias marked dirty, returning how many were refreshed"""
+        client = client or self._client
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        for hashed_id in dirty:
+            self.refresh_media(client, hashed_id)
+        return len(dirty)
+
+    def handle_event_delivery(self, delivery, client: WistiaClient = None) -> None:
+        """Update the index from a webhook EventDelivery"""
+        client = client or self._client
+        for event in delivery.events:
+            hashed_id = event.payload.media.id
+            if event.type == "media.deleted":
+                self.remove_media(hashed_id)
+            elif event.type in ("media.updated", "media.ready"):
+                self.refresh_media(client, hashed_id)
+
+    # Reading
+
+    def search(self, query: str, limit: int = 50, raw: bool = False) -> List[CaptionHit]:
+        """
+        Cues containing all the words in `query`, best matches first.
+        :param raw: Pass `query` to FTS5 as is, for phrase, prefix and boolean queries
+        """
+        match = query if raw else _fts_query(query)
+        if not match.strip():
+            # FTS5 rejects an empty MATCH; no words match nothing
+            return []
+        with self._lock:
+            rows = self._connection.execute(
+                """
+                SELECT cues.hashed_id, cues.language, cues.start, cues.end, cues.text
+                FROM cue_text JOIN cues ON cues.id = cue_text.rowid
+                WHERE cue_text MATCH ?
+                ORDER BY cue_text.rank
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+        return [CaptionHit(*row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT count(*) FROM tracks").fetchone()[0]
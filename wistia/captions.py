@@ -0,0 +1,217 @@
+"""
+Parsed SRT and WebVTT captions
+
+CaptionTrack.text holds the raw SRT. Captions parses it (or any SRT/WebVTT file)
+once into compact arrays: cue start and end times in milliseconds, and offsets
+into one text buffer. Looking up the cue showing at a time is a binary search:
+
+    captions = Captions.from_text(track.text)
+    cue = captions.cue_at(62.5)
+    captions = Captions.from_file("lecture.vtt")  # parsed line by line
+    client.update_captions(hashed_id, "eng", caption_text=captions.to_srt())
+
+Cue identifiers and WebVTT cue settings, NOTE, STYLE and REGION blocks are not kept.
+"""
+
+import bisect
+from array import array
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+ARROW = "-->"
+
+
+class Cue(NamedTuple):
+    start: float  # seconds
+    end: float
+    text: str
+
+
+def _parse_timestamp(value: str) -> int:
+    """ "01:02:03,456" (SRT), "01:02:03.456" or "02:03.456" (WebVTT) -> milliseconds"""
+    clock, _, fraction = value.strip().replace(",", ".").partition(".")
+    parts = [int(part) for part in clock.split(":")]
+    if len(parts) == 2:
+        parts.insert(0, 0)
+    hours, minutes, seconds = parts
+    milliseconds = int((fraction + "000")[:3])
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + milliseconds
+
+
+def _format_timestamp(milliseconds: int, separator: str) -> str:
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+class Captions:
+    def __init__(self):
+        self.starts = array("q")  # milliseconds, ascending
+        self.ends = array("q")
+        self.text_offsets = array("q", [0])  # cue i is text[text_offsets[i]:text_offsets[i + 1]]
+        self.text = ""
+        self._max_ends = None  # built by index_at
+
+    # Parsing
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "Captions":
+        """Parse SRT or WebVTT from an iterable of lines, e.g. an open file"""
+        captions = cls()
+        text_parts: List[str] = []
+        text_length = 0
+        in_order = True
+        timing = None
+        cue_lines: List[str] = []
+
+        def end_block():
+            nonlocal text_length, in_order, timing
+            if timing is not None:
+                start, end = timing
+                if captions.starts and start < captions.starts[-1]:
+                    in_order = False
+                cue_text = "\n".join(cue_lines)
+                captions.starts.append(start)
+                captions.ends.append(end)
+                text_parts.append(cue_text)
+                text_length += len(cue_text)
+                captions.text_offsets.append(text_length)
+            timing = None
+            cue_lines.clear()
+
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                end_block()
+            elif timing is None:
+                if ARROW in line:
+                    start, _, end = line.partition(ARROW)
+                    # WebVTT cue settings follow the end time
+                    end = end.split(None, 1)[0] if end.strip() else ""
+                    timing = (_parse_timestamp(start), _parse_timestamp(end))
+                # Otherwise a cue number/identifier, header or NOTE/STYLE line
+            else:
+                cue_lines.append(line)
+        end_block()
+
+        captions.text = "".join(text_parts)
+        if not in_order:
+            captions._sort()
+        return captions
+
+    @classmethod
+    def from_text(cls, text: str) -> "Captions":
+        return cls.from_lines(text.splitlines())
+
+    @classmethod
+    def from_file(cls, path: str) -> "Captions":
+        # utf-8-sig drops the byte order mark some editors write
+        with open(path, encoding="utf-8-sig") as caption_file:
+            return cls.from_lines(caption_file)
+
+    def _sort(self) -> None:
+        cues = sorted(self, key=lambda cue: (cue.start, cue.end))
+        sorted_captions = Captions.from_cues(cues)
+        self.starts, self.ends = sorted_captions.starts, sorted_captions.ends
+        self.text_offsets, self.text = sorted_captions.text_offsets, sorted_captions.text
+        self._max_ends = None
+
+    @classmethod
+    def from_cues(cls, cues: Iterable[Cue]) -> "Captions":
+        captions = cls()
+        text_parts = []
+        text_length = 0
+        for start, end, text in cues:
+            captions.starts.append(round(start * 1000))
+            captions.ends.append(round(end * 1000))
+            text_parts.append(text)
+            text_length += len(text)
+            captions.text_offsets.append(text_length)
+        captions.text = "".join(text_parts)
+        return captions
+
+    # Access
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _cue(self, index: int) -> Cue:
+        return Cue(
+            self.starts[index] / 1000,
+            self.ends[index] / 1000,
+            self.text[self.text_offsets[index]:self.text_offsets[index + 1]],
+        )
+
+    def __getitem__(self, index: int) -> Cue:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Captions index out of range")
+        return self._cue(index)
+
+    def __iter__(self) -> Iterator[Cue]:
+        for index in range(len(self)):
+            yield self._cue(index)
+
+    def _max_end_table(self) -> List[array]:
+        # Sparse table: level j holds the latest end of cues i..i + 2**j - 1
+        if self._max_ends is None or len(self._max_ends[0]) != len(self.ends):
+            levels = [array("q", self.ends)]
+            width = 1
+            while width * 2 <= len(self.ends):
+                previous = levels[-1]
+                levels.append(array("q", map(max, previous[:len(previous) - width], previous[width:])))
+                width *= 2
+            self._max_ends = levels
+        return self._max_ends
+
+    def index_at(self, seconds: float) -> Optional[int]:
+        """Index of the latest-starting cue showing at `seconds`, if any"""
+        milliseconds = seconds * 1000
+        index = bisect.bisect_right(self.starts, round(milliseconds)) - 1
+        if index < 0:
+            return None
+        levels = self._max_end_table()
+        # With overlapping cues an earlier-starting one may still be showing. Skip
+        # back over runs of cues that have all ended, longest runs first: O(log n)
+        for level in range(len(levels) - 1, -1, -1):
+            width = 1 << level
+            if index - width + 1 >= 0 and levels[level][index - width + 1] <= milliseconds:
+                index -= width
+        if index >= 0 and milliseconds < self.ends[index]:
+            return index
+        return None
+
+    def cue_at(self, seconds: float) -> Optional[Cue]:
+        index = self.index_at(seconds)
+        return None if index is None else self._cue(index)
+
+    def cues_between(self, start: float, end: float) -> List[Cue]:
+        """Cues starting in [start, end)"""
+        first = bisect.bisect_left(self.starts, round(start * 1000))
+        last = bisect.bisect_left(self.starts, round(end * 1000))
+        return [self._cue(index) for index in range(first, last)]
+
+    # Serialisation
+
+    def to_srt(self) -> str:
+        return "".join(
+            f"{number}\n"
+            f"{_format_timestamp(start, ',')} --> {_format_timestamp(end, ',')}\n"
+            f"{self.text[text_start:text_end]}\n\n"
+            for number, start, end, text_start, text_end in zip(
+                range(1, len(self) + 1), self.starts, self.ends, self.text_offsets, self.text_offsets[1:]
+            )
+        )
+
+    def to_vtt(self) -> str:
+        return "WEBVTT\n\n" + "".join(
+            f"{_format_timestamp(start, '.')} --> {_format_timestamp(end, '.')}\n"
+            f"{self.text[text_start:text_end]}\n\n"
+            for start, end, text_start, text_end in zip(
+                self.starts, self.ends, self.text_offsets, self.text_offsets[1:]
+            )
+        )
+
+    def __repr__(self):
+        return f"Captions({len(self)} cues)"
@@ -0,0 +1,235 @@
+"""
+Record and replay API traffic
+
+A recording transport captures every request and response made by a WistiaClient
+into a cassette: a gzip-compressed JSON-lines file, with auth headers redacted.
+A replay transport serves a cassette back at full speed, without touching the API,
+so parsing and application hot paths can be profiled with real payloads.
+
+    client = get_wistia_client(record_to="traffic.jsonl.gz")
+    ...
+    client.close()
+
+    client = get_wistia_client(replay_from="traffic.jsonl.gz")
+
+The same can be switched on with the WISTIA_RECORD_CASSETTE and
+WISTIA_REPLAY_CASSETTE environment variables. Every client recording to the same
+cassette writes through one shared writer.
+"""
+
+import atexit
+import base64
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+log = logging.getLogger(__name__)
+
+REDACTED_HEADERS = {"authorization", "cookie", "set-cookie", "proxy-authorization"}
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Raised when replaying a request that is not in the cassette"""
+
+
+def _redact(headers) -> dict:
+    return {
+        name: "[REDACTED]" if name.lower() in REDACTED_HEADERS else value
+        for name, value in headers.items()
+    }
+
+
+def _encode_body(body) -> str:
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    elif not isinstance(body, bytes):
+        # Streamed uploads (e.g. open files) are not captured
+        return None
+    return base64.b64encode(body).decode("ascii")
+
+
+def _request_key(method: str, url: str, body: str) -> tuple:
+    # Match on path and query only, so cassettes replay against any base URL
+    parts = urlsplit(url)
+    return method.upper(), f"{parts.path}?{parts.query}", body
+
+
+class CassetteWriter:
+    """
+    Appends records to a cassette file. Clients recording to the same path share
+    one writer (see open_writer), which closes once every one of them has closed it.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._users = 1
+        # Appending adds a gzip member; read_cassette reads the members as one stream
+        self._file = gzip.open(path, "at" if append else "wt", encoding="utf-8")
+        atexit.register(self._close_file)
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+
+    def _retain(self) -> bool:
+        with self._lock:
+            if self._file is None:
+                return False
+            self._users += 1
+            return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._users -= 1
+            if self._users > 0:
+                return
+        self._close_file()
+
+    def _close_file(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_writers = {}  # absolute path -> the writer recording to it
+_writers_lock = threading.Lock()
+
+
+def open_writer(path: str) -> CassetteWriter:
+    """
+    The writer for a cassette, shared with any other client recording to it. A
+    cassette is started afresh the first time this process records to it, and
+    appended to if it is reopened after every writer was closed.
+    """
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is not None and writer._retain():
+            return writer
+        writer = CassetteWriter(path, append=key in _writers)
+        _writers[key] = writer
+        return writer
+
+
+def read_cassette(path: str):
+    """Yield the records in a cassette. A cassette whose writer was not closed is read up to the cut-off."""
+    with gzip.open(path, "rt", encoding="utf-8") as cassette_file:
+        try:
+            for line in cassette_file:
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, ValueError):
+            log.warning(f"Cassette {path} is truncated; replaying the complete records only")
+
+
+class RecordingAdapter(HTTPAdapter):
+    def __init__(self, writer: CassetteWriter, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = writer
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if self.writer is None:
+            return response
+        self.writer.write(
+            {
+                "method": request.method,
+                "url": request.url,
+                "request_headers": _redact(request.headers),
+                "request_body": _encode_body(request.body),
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": _redact(response.headers),
+                "body": _encode_body(response.content),
+            }
+        )
+        return response
+
+    def close(self):
+        super().close()
+        # Mounted for both http:// and https://, so Session.close() calls this twice;
+        # release the shared writer only once
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Serves responses from a cassette. Identical requests get their recorded
+    responses in order; once those run out the last one is served again.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+        self._responses = defaultdict(deque)
+        for record in read_cassette(path):
+            key = _request_key(record["method"], record["url"], record["request_body"])
+            self._responses[key].append(record)
+
+    def _next_record(self, request):
+        key = _request_key(request.method, request.url, _encode_body(request.body))
+        with self._lock:
+            recorded = self._responses.get(key)
+            if not recorded:
+                raise CassetteMiss(
+                    f"No recorded response for {request.method} {request.url} in {self.path}",
+                    request=request,
+                )
+            return recorded.popleft() if len(recorded) > 1 else recorded[0]
+
+    def send(self, request, **kwargs):
+        record = self._next_record(request)
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.reason = record.get("reason")
+        response.headers = CaseInsensitiveDict(record["headers"])
+        # The recorded body is already decoded
+        response.headers.pop("Content-Encoding", None)
+        response._content = base64.b64decode(record["body"]) if record["body"] else b""
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+def _adapter_settings(session: requests.Session) -> dict:
+    # Keep the connection pool the client was configured with (max_connections)
+    adapter = session.get_adapter("https://")
+    return {
+        "pool_connections": getattr(adapter, "_pool_connections", DEFAULT_POOLSIZE),
+        "pool_maxsize": getattr(adapter, "_pool_maxsize", DEFAULT_POOLSIZE),
+        "pool_block": getattr(adapter, "_pool_block", DEFAULT_POOLBLOCK),
+    }
+
+
+def record_to(session: requests.Session, path: str) -> CassetteWriter:
+    writer = open_writer(path)
+    adapter = RecordingAdapter(writer, **_adapter_settings(session))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return writer
+
+
+def replay_from(session: requests.Session, path: str) -> None:
+    adapter = ReplayAdapter(path, **_adapter_settings(session))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
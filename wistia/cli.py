@@ -1,60 +1,102 @@
 #!/usr/bin/env python
 # encoding: utf-8
+import argparse
 import logging
-import optparse
+import os
 import sys
 
 # simple CLI for wistia.
-import wistia.client
 
 log = logging.getLogger("wistiapy")
 
 
+def export(options):
+    from wistia.export import AccountExporter
+    from wistia.helpers import get_wistia_client
+
+    password = options.cred or os.environ.get("WISTIA_API_PASSWORD")
+    if not password:
+        raise SystemExit("Please supply your API password with -c KEY or WISTIA_API_PASSWORD")
+
+    client = get_wistia_client(password=password)
+    if options.base_url:
+        client.API_BASE_URL = options.base_url
+    exporter = AccountExporter(
+        client=client,
+        output_dir=options.output_dir,
+        format=options.format,
+        compress=options.gzip,
+        checkpoint_path=options.checkpoint,
+        max_workers=options.workers,
+    )
+    if options.restart and os.path.exists(exporter.checkpoint.path):
+        os.remove(exporter.checkpoint.path)
+        exporter.checkpoint.state = {}
+    exporter.run(options.resources.split(","))
+
+
+def fake_server(options):
+    from wistia.fakeserver import main as fake_server_main
+
+    fake_server_main(options.server_args)
+
+
 def main(args=None):
 
     DESC = "Wistia python-based command line client."
 
-    if len(sys.argv) < 2:
-        sys.argv.append("-h")
-
-    parser = optparse.OptionParser(usage="wistia.py [options]", description=DESC)
+    parser = argparse.ArgumentParser(prog="wistia", description=DESC)
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress")
+    subcommands = parser.add_subparsers(dest="command")
 
-    parser.add_option("-c", "--cred", dest="cred", help="your API key", action="store")
-    parser.add_option(
-        "-p",
-        "--projects",
-        dest="list_projects",
-        help="list all projects",
-        action="store_true",
+    export_parser = subcommands.add_parser(
+        "export",
+        help="export the whole account",
+        description=(
+            "Stream projects, medias, captions and customizations to JSONL or CSV files. "
+            "An interrupted export resumes from its checkpoint when re-run."
+        ),
     )
-    parser.add_option(
-        "-m",
-        "--medias",
-        dest="list_medias",
-        help="list all medias",
-        action="store_true",
+    export_parser.add_argument("-c", "--cred", dest="cred", help="your API password")
+    export_parser.add_argument(
+        "-r",
+        "--resources",
+        default="projects,medias,captions,customizations",
+        help="comma-separated resources to export (default: all)",
     )
+    export_parser.add_argument("-o", "--output-dir", default="wistia-export")
+    export_parser.add_argument("-f", "--format", choices=["jsonl", "csv"], default="jsonl")
+    export_parser.add_argument("-z", "--gzip", action="store_true", help="gzip-compress output files")
+    export_parser.add_argument("-w", "--workers", type=int, default=8, help="concurrent requests")
+    export_parser.add_argument("--base-url", help="API base URL, e.g. of a local fake server")
+    export_parser.add_argument("--checkpoint", help="checkpoint file (default: in the output directory)")
+    export_parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start over")
+    export_parser.set_defaults(handler=export)
 
-    (options, args) = parser.parse_args()
-
-    if not options.cred:
-        raise Exception("Please supply your credentials with -c KEY")
-
-    # list projects.
-    w = wistia.client.WistiaClient("api", options.cred)
-    if options.list_projects:
-        projects = w.list_projects()
-        for p in projects:
-            print(f"{p.id}, {p.name}, {p.mediaCount}")
+    server_parser = subcommands.add_parser(
+        "fake-server",
+        help="run a local fake Wistia API server",
+        add_help=False,
+    )
+    server_parser.set_defaults(handler=fake_server)
 
-    # list all medias for a project.
-    if options.list_medias:
-        medias = w.list_medias()
-        for m in medias:
-            print(f"{m.id}, {m.name}, {m.duration}")
+    options, extra_args = parser.parse_known_args(args)
+    if options.command == "fake-server":
+        # Everything after the subcommand is passed on to wistia.fakeserver
+        options.server_args = extra_args
+    elif extra_args:
+        parser.error(f"unrecognized arguments: {' '.join(extra_args)}")
+    if options.command is None:
+        parser.print_help()
+        return 2
 
-    # create an embed code for media.
+    logging.basicConfig(
+        level=logging.INFO if options.verbose else logging.WARNING,
+        stream=sys.stderr,
+    )
+    options.handler(options)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
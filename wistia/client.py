@@ -1,34 +1,348 @@
+import copy
 import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
 from itertools import count
-from typing import Iterable
+from typing import Iterable, Union
 
 import requests
-
-from wistia.schema import CaptionTrack, Media, Project
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from wistia.captions import Captions
+from wistia.codec import Codec, get_codec
+from wistia.hedging import Hedger
+from wistia.instrumentation import Instrumentation, RequestEvent, endpoint_template
+from wistia.resilience import (
+    DEFAULT_TIMEOUT,
+    CircuitBreaker,
+    DeadlineExceeded,
+    clamp_timeout,
+    deadline,
+    is_failure,
+    ran_out_of_time,
+    remaining,
+    retry_after,
+    retry_policy,
+)
+from wistia.schema import CaptionTrack, Media, MediaStats, Project
+from wistia.serialize import attach_raw
 
 log = logging.getLogger("wistiapy")
 
 
+def _form_data(**params) -> dict:
+    """Form parameters with unset (None) values left out"""
+    return {
+        name: str(value).lower() if isinstance(value, bool) else value
+        for name, value in params.items()
+        if value is not None
+    }
+
+
+def _wire_bytes(response: requests.Response) -> int:
+    """Response body bytes as transferred, i.e. before decompression"""
+    raw = response.raw
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            return raw.tell()
+        except (OSError, ValueError):
+            pass
+    return len(response.content)
+
+
+class ThreadLocalSession(requests.Session):
+    """
+    A Session that hands each thread its own underlying Session. All of them share
+    this session's adapters (and so their connection pools) and headers; cookies
+    and other per-request state stay per thread.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._local = threading.local()
+
+    def _thread_session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            # Shared by reference, so later mount() calls reach every thread
+            session.adapters = self.adapters
+            session.headers = self.headers
+            session.auth = self.auth
+            session.proxies = self.proxies
+            session.verify = self.verify
+            session.cert = self.cert
+            session.trust_env = self.trust_env
+            self._local.session = session
+        return session
+
+    def request(self, method, url, *args, **kwargs):
+        return self._thread_session().request(method, url, *args, **kwargs)
+
+
+class _Flight:
+    """A GET in progress, shared by every caller that asks for the same thing meanwhile"""
+
+    __slots__ = ("done", "result", "error", "shared_error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.shared_error = True  # False if the error was the leader's alone, e.g. its deadline
+        self.followers = 0
+
+
 class WistiaClient:
     API_BASE_URL = "https://api.wistia.com/v1/"
 
-    def __init__(self, api_password=""):
+    def __init__(
+        self,
+        api_password="",
+        instrumentation=None,
+        single_flight=True,
+        codec=None,
+        thread_safe=False,
+        max_connections=10,
+        timeout=DEFAULT_TIMEOUT,
+        circuit_breaker: CircuitBreaker = None,
+        stale_cache_size=0,
+        hedging: Hedger = None,
+        keep_raw=False,
+    ):
+        """
+        :param thread_safe: Give each thread its own session over a shared connection
+            pool, so one client can be used from many threads at once
+        :param max_connections: Connections kept open per host; set it to the number of
+            threads using the client, or extra connections are opened and thrown away
+        :param timeout: Per-request (connect, read) timeouts in seconds, or one for both
+        :param circuit_breaker: Fail fast while the API is failing, see wistia.resilience
+        :param stale_cache_size: Keep this many GET responses to answer with when the
+            same GET fails with a connection error, timeout or 5xx
+        :param hedging: Resend GETs that are slower than usual, see wistia.hedging
+        :param keep_raw: Keep the payload each model is parsed from, for
+            wistia.serialize to write out again as is
+        """
         # https://wistia.com/support/developers/data-api#authentication
-        self.session = requests.Session()
+        self.session = ThreadLocalSession() if thread_safe else requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers = {
             "Authorization": f"Bearer {api_password}",
-            **self.session.headers
+            **self.session.headers,
+            # Every compression urllib3 can decode here (brotli and zstd when installed)
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
+        # See wistia.codec; a codec name or a Codec
+        self.codec = codec if isinstance(codec, Codec) else get_codec(codec)
+        # See wistia.instrumentation; a single Instrumentation or a list of them
+        if isinstance(instrumentation, Instrumentation):
+            instrumentation = [instrumentation]
+        self.instrumentation = list(instrumentation or [])
+        # Concurrent identical GETs share one request, see get()
+        self.single_flight = single_flight
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        # See wistia.resilience
+        self.timeout = timeout
+        self.circuit_breaker = circuit_breaker
+        if circuit_breaker is not None and circuit_breaker.on_change is None:
+            circuit_breaker.on_change = lambda state: self._instrument("on_circuit_change", state)
+        self.stale_cache_size = stale_cache_size
+        self._stale = OrderedDict()
+        self._stale_lock = threading.Lock()
+        self.hedging = hedging
+        self.keep_raw = keep_raw
+
+    def record_to(self, cassette_path: str) -> None:
+        """Capture all traffic into a cassette file, see wistia.cassette"""
+        from wistia.cassette import record_to
+
+        record_to(self.session, cassette_path)
+
+    def replay_from(self, cassette_path: str) -> None:
+        """Serve all requests from a recorded cassette file, see wistia.cassette"""
+        from wistia.cassette import replay_from
+
+        replay_from(self.session, cassette_path)
+
+    def close(self) -> None:
+        if self.session is not None:
+            self.session.close()
+        if self.hedging is not None:
+            self.hedging.close()
+
+    def _instrument(self, hook_name, *args):
+        for instrument in self.instrumentation:
+            try:
+                getattr(instrument, hook_name)(*args)
+            except Exception:
+                log.exception(f"Instrumentation hook {hook_name} failed")
 
     def request(self, method, rel_path, **kwargs):
+        timeout = kwargs.pop("timeout", self.timeout)
+        policy = retry_policy()
+        attempt = 0
+        while True:
+            try:
+                return self._request_once(method, rel_path, timeout=clamp_timeout(timeout), **kwargs)
+            except requests.HTTPError as error:
+                if (
+                    policy is None
+                    or attempt >= policy.max_retries
+                    or getattr(error.response, "status_code", None) != 429
+                ):
+                    raise
+                attempt += 1
+                delay = retry_after(error, default=2 ** (attempt - 1))
+                left = remaining()
+                if left is not None and delay >= left:
+                    raise
+                self._instrument("on_retry", RequestEvent(method, rel_path), attempt, "rate limited", delay)
+                if policy.on_retry is not None:
+                    policy.on_retry(attempt, delay)
+                time.sleep(delay)
+
+    def _request_once(self, method, rel_path, **kwargs):
+        send = partial(self._send, method, rel_path, **kwargs)
+        if method == "GET" and self.hedging is not None:
+            send = partial(self.hedging.call, endpoint_template(rel_path), send, self._on_hedge)
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return send()
+        breaker.before_request()
+        try:
+            result = send()
+        except BaseException as error:
+            breaker.record_error(error)
+            raise
+        breaker.record_success()
+        return result
+
+    def _on_hedge(self, endpoint: str, won: bool) -> None:
+        self._instrument("on_hedge", endpoint, won)
+
+    def _send(self, method, rel_path, **kwargs):
         url = f"{self.API_BASE_URL}{rel_path}"
-        response = self.session.request(method=method, url=url, **kwargs)
-        response.raise_for_status()
-        response_data = response.json() if response.text else {}
-        return response_data
+        if not self.instrumentation:
+            response = self.session.request(method=method, url=url, **kwargs)
+            response.raise_for_status()
+            return self.codec.loads(response.content) if response.content else {}
+
+        event = RequestEvent(method, rel_path)
+        self._instrument("on_request_start", event)
+        try:
+            response = self.session.request(method=method, url=url, **kwargs)
+            event.status_code = response.status_code
+            event.bytes_sent = len(response.request.body or b"")
+            event.bytes_received = len(response.content)
+            event.wire_bytes_received = _wire_bytes(response)
+            response.raise_for_status()
+            return self.codec.loads(response.content) if response.content else {}
+        except Exception as error:
+            event.error = error
+            raise
+        finally:
+            event.latency = time.perf_counter() - event.started_at
+            self._instrument("on_request_end", event)
+
+    def _parse(self, model_cls, data, rel_path: str, many: bool = False):
+        """Build schema models from response data, timing it for instrumentation"""
+        started_at = time.perf_counter()
+        if many:
+            parsed = [model_cls(item, strict=False) for item in data]
+        else:
+            parsed = model_cls(data, strict=False)
+        if self.keep_raw:
+            for model, raw in zip(parsed, data) if many else [(parsed, data)]:
+                attach_raw(model, raw)
+        if self.instrumentation:
+            self._instrument(
+                "on_parse",
+                endpoint_template(rel_path),
+                time.perf_counter() - started_at,
+                len(parsed) if many else 1,
+            )
+        return parsed
 
     def get(self, rel_path: str, params: dict = None):
-        return self.request("GET", rel_path, params=params)
+        if not self.stale_cache_size:
+            return self._get(rel_path, params)
+        key = self._get_key(rel_path, params)
+        try:
+            result = self._get(rel_path, params)
+        except Exception as error:
+            if not is_failure(error):
+                raise
+            with self._stale_lock:
+                stale = self._stale.get(key)
+            if stale is None:
+                raise
+            log.warning(f"Serving a stale response for {rel_path} after: {error}")
+            self._instrument("on_cache_hit", endpoint_template(rel_path))
+            return copy.deepcopy(stale)
+        with self._stale_lock:
+            self._stale[key] = copy.deepcopy(result)
+            self._stale.move_to_end(key)
+            if len(self._stale) > self.stale_cache_size:
+                self._stale.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _get_key(rel_path: str, params: dict = None):
+        return (
+            rel_path,
+            tuple(
+                sorted(
+                    (name, tuple(value) if isinstance(value, list) else value)
+                    for name, value in (params or {}).items()
+                )
+            ),
+        )
+
+    def _get(self, rel_path: str, params: dict = None):
+        if not self.single_flight:
+            return self.request("GET", rel_path, params=params)
+
+        key = self._get_key(rel_path, params)
+        while True:
+            with self._flights_lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                else:
+                    flight.followers += 1
+            if leader:
+                break
+
+            if not flight.done.wait(remaining()):
+                raise DeadlineExceeded("Deadline exceeded waiting for an identical request")
+            if flight.error is None:
+                self._instrument("on_coalesced", endpoint_template(rel_path))
+                return copy.deepcopy(flight.result)
+            if flight.shared_error:
+                self._instrument("on_coalesced", endpoint_template(rel_path))
+                raise flight.error
+            # The leader ran out of its own time or was interrupted: try again
+
+        try:
+            flight.result = self.request("GET", rel_path, params=params)
+        except BaseException as error:
+            flight.error = error
+            flight.shared_error = isinstance(error, Exception) and not ran_out_of_time(error)
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+                followers = flight.followers
+            flight.done.set()
+        # Each caller gets its own copy to mutate
+        return copy.deepcopy(flight.result) if followers else flight.result
 
     def post(self, rel_path: str, **kwargs):
         return self.request("POST", rel_path, **kwargs)
@@ -55,15 +369,20 @@ class WistiaClient:
             params["sort_direction"] = sort_direction
 
         project_list = self.get("projects.json", params=params)
-        return [
-            Project(project_data, strict=False)
-            for project_data in project_list
-        ]
+        return self._parse(Project, project_list, "projects.json", many=True)
 
-    def list_all_projects(self) -> Iterable[Project]:
+    def list_all_projects(self, timeout: float = None) -> Iterable[Project]:
+        """:param timeout: Seconds for listing every page, see wistia.resilience.deadline"""
         log.info("Listing all projects")
         for page in count(start=1):
-            next_page_of_projects = self.list_projects(page=page)
+            if timeout is None:
+                next_page_of_projects = self.list_projects(page=page)
+            else:
+                if page == 1:
+                    # Set when iteration starts, as generator bodies run lazily
+                    expires_at = time.monotonic() + timeout
+                with deadline(expires_at - time.monotonic()):
+                    next_page_of_projects = self.list_projects(page=page)
             if next_page_of_projects:
                 yield from next_page_of_projects
             else:
@@ -73,12 +392,60 @@ class WistiaClient:
         # https://wistia.com/support/developers/data-api#projects_show
         rel_path = f"projects/{project_hashed_id}.json"
         project_data = self.get(rel_path)
-        return Project(project_data, strict=False)
+        return self._parse(Project, project_data, rel_path)
+
+    def create_project(
+        self,
+        name: str,
+        admin_email: str = None,
+        anonymous_can_upload: bool = None,
+        anonymous_can_download: bool = None,
+        public: bool = None,
+    ) -> Project:
+        # https://wistia.com/support/developers/data-api#projects_create
+        project_data = self.post(
+            "projects.json",
+            data=_form_data(
+                name=name,
+                adminEmail=admin_email,
+                anonymousCanUpload=anonymous_can_upload,
+                anonymousCanDownload=anonymous_can_download,
+                public=public,
+            ),
+        )
+        return self._parse(Project, project_data, "projects.json")
+
+    def update_project(
+        self,
+        project_hashed_id: str,
+        name: str = None,
+        anonymous_can_upload: bool = None,
+        anonymous_can_download: bool = None,
+        public: bool = None,
+    ) -> Project:
+        # https://wistia.com/support/developers/data-api#projects_update
+        rel_path = f"projects/{project_hashed_id}.json"
+        project_data = self.put(
+            rel_path,
+            data=_form_data(
+                name=name,
+                anonymousCanUpload=anonymous_can_upload,
+                anonymousCanDownload=anonymous_can_download,
+                public=public,
+            ),
+        )
+        return self._parse(Project, project_data, rel_path)
+
+    def delete_project(self, project_hashed_id: str) -> Project:
+        # https://wistia.com/support/developers/data-api#projects_delete
+        rel_path = f"projects/{project_hashed_id}.json"
+        return self._parse(Project, self.delete(rel_path), rel_path)
 
-    # https://wistia.com/support/developers/data-api#projects_create
-    # https://wistia.com/support/developers/data-api#projects_update
-    # https://wistia.com/support/developers/data-api#projects_delete
-    # https://wistia.com/support/developers/data-api#projects_copy
+    def copy_project(self, project_hashed_id: str, admin_email: str = None) -> Project:
+        # https://wistia.com/support/developers/data-api#projects_copy
+        rel_path = f"projects/{project_hashed_id}/copy.json"
+        project_data = self.post(rel_path, data=_form_data(adminEmail=admin_email))
+        return self._parse(Project, project_data, rel_path)
 
     # Project Sharings
     # https://wistia.com/support/developers/data-api#project_sharings_list
@@ -98,6 +465,7 @@ class WistiaClient:
         project_id=None,
         name=None,
         media_type=None,
+        hashed_ids=None,
     ) -> Iterable[Media]:
         # https://wistia.com/support/developers/data-api#medias_list
         params = {
@@ -112,23 +480,63 @@ class WistiaClient:
             params["name"] = name
         if media_type is not None:
             params["type"] = media_type
+        if hashed_ids is not None:
+            params["hashed_ids[]"] = list(hashed_ids)
 
         medias_list = self.get("medias.json", params=params)
-
-        return [
-            Media(media_data, strict=False) for media_data in medias_list
-        ]
+        return self._parse(Media, medias_list, "medias.json", many=True)
 
     def show_media(self, wistia_hashed_id: str) -> Media:
         # https://wistia.com/support/developers/data-api#medias_show
         rel_path = f"medias/{wistia_hashed_id}.json"
         media_data = self.get(rel_path)
-        return Media(media_data, strict=False)
+        return self._parse(Media, media_data, rel_path)
 
-    # https://wistia.com/support/developers/data-api#medias_update
-    # https://wistia.com/support/developers/data-api#medias_delete
-    # https://wistia.com/support/developers/data-api#medias_copy
-    # https://wistia.com/support/developers/data-api#medias_stats
+    def update_media(
+        self,
+        wistia_hashed_id: str,
+        name: str = None,
+        description: str = None,
+        new_still_media_id: str = None,
+    ) -> Media:
+        # https://wistia.com/support/developers/data-api#medias_update
+        rel_path = f"medias/{wistia_hashed_id}.json"
+        media_data = self.put(
+            rel_path,
+            data=_form_data(
+                name=name, description=description, new_still_media_id=new_still_media_id
+            ),
+        )
+        return self._parse(Media, media_data, rel_path)
+
+    def delete_media(self, wistia_hashed_id: str) -> Media:
+        # https://wistia.com/support/developers/data-api#medias_delete
+        rel_path = f"medias/{wistia_hashed_id}.json"
+        return self._parse(Media, self.delete(rel_path), rel_path)
+
+    def copy_media(
+        self, wistia_hashed_id: str, project_id: str = None, owner: str = None
+    ) -> Media:
+        # https://wistia.com/support/developers/data-api#medias_copy
+        # Without a valid project_id the copy goes in the source media's project
+        rel_path = f"medias/{wistia_hashed_id}/copy.json"
+        media_data = self.post(rel_path, data=_form_data(project_id=project_id, owner=owner))
+        return self._parse(Media, media_data, rel_path)
+
+    def move_media(self, wistia_hashed_id: str, project_id: str) -> Media:
+        """
+        Move a media to another project. The Data API has no move endpoint, so this
+        copies the media into the project and deletes the original: the returned
+        media has a new hashed_id, and stats of the original are not carried over.
+        """
+        new_media = self.copy_media(wistia_hashed_id, project_id=project_id)
+        self.delete_media(wistia_hashed_id)
+        return new_media
+
+    def show_media_stats(self, wistia_hashed_id: str) -> MediaStats:
+        # https://wistia.com/support/developers/data-api#medias_stats
+        rel_path = f"medias/{wistia_hashed_id}/stats.json"
+        return self._parse(MediaStats, self.get(rel_path), rel_path)
 
     # Account
     # https://wistia.com/support/developers/data-api#account
@@ -141,7 +549,14 @@ class WistiaClient:
         return self.get(rel_path)
 
     # https://wistia.com/support/developers/data-api#customizations_create
-    # https://wistia.com/support/developers/data-api#customizations_update
+
+    def update_media_customizations(self, wistia_hashed_id: str, customizations: dict) -> dict:
+        # https://wistia.com/support/developers/data-api#customizations_update
+        # Merged into the saved customizations; null values delete their key.
+        # See wistia.customizations.apply_customizations for bulk updates.
+        rel_path = f"medias/{wistia_hashed_id}/customizations.json"
+        return self.put(rel_path, json=customizations)
+
     # https://wistia.com/support/developers/data-api#customizations_delete
 
     # Captions
@@ -149,21 +564,20 @@ class WistiaClient:
     def list_captions(self, wistia_hashed_id: str) -> Iterable[CaptionTrack]:
         rel_path = f"medias/{wistia_hashed_id}/captions.json"
         caption_list = self.get(rel_path)
-        return [
-            CaptionTrack(caption_data, strict=False)
-            for caption_data in caption_list
-        ]
+        return self._parse(CaptionTrack, caption_list, rel_path, many=True)
 
     def create_captions(
         self,
         wistia_hashed_id: str,
         language_code: str = "eng",
         caption_filename: str = "",
-        caption_text: str = "",
+        caption_text: Union[str, Captions] = "",
     ) -> None:
         # https://wistia.com/support/developers/data-api#captions_create
         # Empty 200: OK; 400: already exist; 404: video DNE
         rel_path = f"medias/{wistia_hashed_id}/captions.json"
+        if isinstance(caption_text, Captions):
+            caption_text = caption_text.to_srt()
         if caption_text:
             self.post(
                 rel_path, data={"language": language_code, "caption_file": caption_text}
@@ -192,6 +606,8 @@ class WistiaClient:
     ) -> None:
         # https://wistia.com/support/developers/data-api#captions_update
         rel_path = f"medias/{wistia_hashed_id}/captions/{language_code}.json"
+        if isinstance(caption_text, Captions):
+            caption_text = caption_text.to_srt()
         if caption_text:
             self.put(rel_path, data={"caption_file": caption_text})
         elif caption_filename:
@@ -220,13 +636,12 @@ class WistiaClient:
         # https://wistia.com/support/developers/data-api#customizations_update
         # > If a value is null, then that key will be deleted from the saved customizations.
         # > If it is not null, that value will be set.
-        rel_path = f"medias/{wistia_hashed_id}/customizations.json"
         if enabled:
             payload = {"plugin": {"captions-v1": {"onByDefault": False}}}
         else:
             payload = {"plugin": {"captions-v1": None}}
 
-        return self.put(rel_path, json=payload)
+        return self.update_media_customizations(wistia_hashed_id, payload)
 
     def upload_subtitle_file_to_wistia_video(
         self,
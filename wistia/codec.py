@@ -0,0 +1,71 @@
+"""
+JSON codecs
+
+The client decodes responses with the fastest JSON library installed: orjson, then
+msgspec, then the standard library. Install one with `pip install wistiapy[fast]`,
+or choose explicitly:
+
+    client = WistiaClient(api_password=..., codec="json")
+
+The WISTIA_JSON_CODEC environment variable sets the default.
+"""
+
+import json
+import os
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+
+class Codec(NamedTuple):
+    name: str
+    loads: Callable[[Union[bytes, str]], Any]
+    dumps: Callable[[Any], bytes]
+
+
+def _orjson() -> Codec:
+    import orjson
+
+    return Codec("orjson", orjson.loads, orjson.dumps)
+
+
+def _msgspec() -> Codec:
+    import msgspec
+
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+    return Codec("msgspec", decoder.decode, encoder.encode)
+
+
+def _stdlib() -> Codec:
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    return Codec("json", json.loads, dumps)
+
+
+CODECS = {"orjson": _orjson, "msgspec": _msgspec, "json": _stdlib}
+
+_default: Optional[Codec] = None
+
+
+def get_codec(name: str = None) -> Codec:
+    """
+    The named codec, or the default: WISTIA_JSON_CODEC if set, otherwise the first
+    of orjson, msgspec and json that can be imported
+    """
+    global _default
+    if name is not None:
+        if name not in CODECS:
+            raise ValueError(f"Unknown JSON codec {name!r}, expected one of {', '.join(CODECS)}")
+        return CODECS[name]()
+    if _default is None:
+        preferred = os.environ.get("WISTIA_JSON_CODEC")
+        if preferred:
+            _default = get_codec(preferred)
+        else:
+            for factory in CODECS.values():
+                try:
+                    _default = factory()
+                    break
+                except ImportError:
+                    continue
+    return _default
@@ -0,0 +1,111 @@
+"""
+Multi-process account crawl
+
+Parsing media lists into schema models is CPU-bound, so a single process crawling
+a large account is held back by the GIL. crawl_account spreads the crawl across a
+process pool, sharded by project and split into pages:
+
+    for page in crawl_account(api_password, processes=8):
+        print(page.project["name"], len(page.medias))
+
+Each worker lists and parses one page of a project's medias, then sends the parsed
+medias back to the parent as one compact JSON blob in the API's format (see
+wistia.serialize.to_wire). Pages are yielded as they finish, so results stream
+back while the crawl is running; the largest projects are queued first. Pages are
+planned from each project's mediaCount, and a project whose last planned page
+comes back full is probed one page further, in case the count is stale.
+"""
+
+import logging
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, List, NamedTuple
+
+from wistia.client import WistiaClient
+from wistia.codec import get_codec
+from wistia.schema import Media
+from wistia.serialize import to_wire
+
+log = logging.getLogger(__name__)
+
+
+class CrawlPage(NamedTuple):
+    project: dict
+    page: int
+    medias: List[dict]  # parsed medias, as to_wire() records
+
+    def media_models(self) -> List[Media]:
+        return [Media(record, strict=False) for record in self.medias]
+
+
+# Per worker process, set up by _init_worker
+_worker_client = None
+
+
+def _init_worker(api_password: str, base_url: str) -> None:
+    global _worker_client
+    _worker_client = WistiaClient(api_password=api_password)
+    _worker_client.API_BASE_URL = base_url
+
+
+def _crawl_page(project_id: int, page: int, per_page: int) -> bytes:
+    medias = _worker_client.list_medias(
+        project_id=project_id, sort_by="created", page=page, per_page=per_page
+    )
+    return _worker_client.codec.dumps([to_wire(media) for media in medias])
+
+
+def crawl_account(
+    api_password: str,
+    processes: int = None,
+    per_page: int = 100,
+    base_url: str = WistiaClient.API_BASE_URL,
+) -> Iterator[CrawlPage]:
+    """
+    Yield a CrawlPage per non-empty page of each project's medias, in order of completion.
+    :param processes: Worker processes, default one per CPU
+    """
+    client = WistiaClient(api_password=api_password)
+    client.API_BASE_URL = base_url
+    projects = sorted(
+        (project.to_primitive() for project in client.list_all_projects()),
+        key=lambda project: project.get("mediaCount") or 0,
+        reverse=True,
+    )
+    client.close()
+    if not projects:
+        return
+    processes = processes or os.cpu_count() or 1
+    log.info(f"Crawling {len(projects)} projects with {processes} processes")
+
+    codec = get_codec()
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(api_password, base_url)
+    ) as executor:
+        futures = {}
+        last_pages = {}  # project id -> last page requested
+
+        def submit(project: dict, page: int) -> None:
+            future = executor.submit(_crawl_page, project["id"], page, per_page)
+            futures[future] = (project, page)
+            last_pages[project["id"]] = max(page, last_pages.get(project["id"], 0))
+
+        for project in projects:
+            for page in range(1, max(math.ceil((project.get("mediaCount") or 0) / per_page), 1) + 1):
+                submit(project, page)
+        try:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    project, page = futures.pop(future)
+                    medias = codec.loads(future.result())
+                    if len(medias) == per_page and page == last_pages[project["id"]]:
+                        # mediaCount was stale: there may be more
+                        submit(project, page + 1)
+                    if medias:
+                        yield CrawlPage(project, page, medias)
+        finally:
+            # Stopped early: don't crawl the remaining pages
+            for future in futures:
+                future.cancel()
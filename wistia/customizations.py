@@ -0,0 +1,97 @@
+"""
+Bring many medias' player customizations to a desired state
+
+    result = apply_customizations(
+        client, dict.fromkeys(hashed_ids, {"plugin": {"captions-v1": {"onByDefault": False}}})
+    )
+
+Current customizations are read concurrently and only medias whose customizations
+would change get a PUT, containing just the keys that differ. Re-running a job that
+has already been applied costs reads only.
+"""
+
+import logging
+from typing import Dict
+
+from wistia.batch import BatchExecutor, BatchResult
+from wistia.client import WistiaClient
+
+log = logging.getLogger(__name__)
+
+
+def merge_customizations(current: dict, changes: dict) -> dict:
+    """
+    The customizations saved after PUTting `changes` over `current`
+    """
+    # https://wistia.com/support/developers/data-api#customizations_update
+    # null values delete the key, everything else is merged in
+    merged = dict(current)
+    for key, value in changes.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict):
+            # Merged into what is there, if anything; null deletes are never stored
+            existing = merged.get(key)
+            nested = merge_customizations(existing if isinstance(existing, dict) else {}, value)
+            if nested or key in merged:
+                merged[key] = nested
+        else:
+            merged[key] = value
+    return merged
+
+
+def customizations_diff(current: dict, desired: dict) -> dict:
+    """
+    The smallest update payload that has the same effect as PUTting `desired`
+    over `current`; empty when nothing would change.
+    """
+    diff = {}
+    for key, value in desired.items():
+        if value is None:
+            if key in current:
+                diff[key] = None
+        elif isinstance(value, dict):
+            existing = current.get(key)
+            replaced = key in current and not isinstance(existing, dict)
+            nested = customizations_diff({} if replaced or existing is None else existing, value)
+            if nested or replaced:
+                diff[key] = nested
+        elif key not in current or current[key] != value:
+            diff[key] = value
+    return diff
+
+
+def apply_customizations(
+    client: WistiaClient,
+    desired: Dict[str, dict],
+    executor: BatchExecutor = None,
+    dry_run: bool = False,
+) -> BatchResult:
+    """
+    :param desired: Customization changes per hashed_id, with the same null-deletes
+        semantics as update_media_customizations
+    :return: BatchResult with the payload sent per hashed_id in `succeeded` ({} when
+        the media was already up to date), or the hashed_ids that would be updated in
+        `planned` for a dry run
+    """
+    executor = executor or BatchExecutor(client)
+    current = executor.run("show_media_customizations", list(desired))
+
+    diffs = {
+        hashed_id: customizations_diff(customizations or {}, desired[hashed_id])
+        for hashed_id, customizations in current.succeeded.items()
+    }
+    changed = {hashed_id: diff for hashed_id, diff in diffs.items() if diff}
+    log.info(f"Customizations: {len(changed)} of {len(diffs)} medias differ")
+
+    def update(hashed_id):
+        client.update_media_customizations(hashed_id, changed[hashed_id])
+        return changed[hashed_id]
+
+    result = executor.run(update, list(changed), dry_run=dry_run)
+    result.failed.update(current.failed)
+    result.retries += current.retries
+    if not dry_run:
+        for hashed_id, diff in diffs.items():
+            result.succeeded.setdefault(hashed_id, {})
+    return result
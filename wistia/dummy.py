@@ -1,11 +1,17 @@
+import random
 from collections import defaultdict
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta, timezone
 from typing import NamedTuple, Iterable
 
 import requests
+from schematics.types import DateTimeType
 
-from wistia.schema import Media, CaptionTrack, Project
+from wistia.schema import Media, MediaStats, CaptionTrack, Project, ProjectReference
 
 from wistia.client import WistiaClient
+from wistia.captions import Captions
+from wistia.customizations import merge_customizations
 
 import logging
 
@@ -16,6 +22,195 @@ class FakeResponse(NamedTuple):
     status_code: int
 
 
+MAX_PER_PAGE = 100
+
+
+def _field(record, name):
+    if isinstance(record, dict):
+        return record.get(name)
+    return getattr(record, name, None)
+
+
+def _timestamp(value) -> float:
+    if value is None:
+        return 0.0
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            value = DateTimeType().to_native(value)
+    return value.timestamp()
+
+
+def _media_project_ids(record):
+    project = _field(record, "project")
+    if not project:
+        return ()
+    return (str(_field(project, "id")), _field(project, "hashed_id"))
+
+
+class IndexedStore(MutableMapping):
+    """
+    A hashed_id -> model mapping with secondary indexes, answering list queries
+    (filtering, sorting and pagination) the same way the Wistia API does.
+
+    Values may be model instances or raw API dicts; raw dicts are only turned into
+    models when accessed, so large stores can be seeded cheaply.
+    """
+
+    SORT_FIELDS = ("id", "name", "created", "updated")
+
+    def __init__(self, model_cls, filter_fields: dict = None):
+        # filter_fields maps a query parameter name to a function returning the
+        # index values of a record for that parameter
+        self.model_cls = model_cls
+        self.filter_fields = filter_fields or {}
+        self._records = {}
+        self._sort_keys = {field: {} for field in self.SORT_FIELDS}
+        self._filter_index = {name: defaultdict(set) for name in self.filter_fields}
+        # hashed_id -> [(filter name, value)] as indexed, since records may be
+        # changed in place before they are re-indexed
+        self._indexed = {}
+        self._orders = {}
+        self._query_cache = {}
+
+    def __getitem__(self, hashed_id):
+        record = self._records[hashed_id]
+        if isinstance(record, dict):
+            record = self.model_cls(record, strict=False)
+            self._records[hashed_id] = record
+        return record
+
+    def __setitem__(self, hashed_id, record):
+        self._insert(
+            hashed_id,
+            record,
+            created=_timestamp(_field(record, "created")),
+            updated=_timestamp(_field(record, "updated")),
+        )
+
+    def _insert(self, hashed_id, record, created: float, updated: float):
+        if hashed_id in self._records:
+            self._unindex(hashed_id)
+        self._records[hashed_id] = record
+
+        sort_keys = self._sort_keys
+        sort_keys["id"][hashed_id] = _field(record, "id") or 0
+        sort_keys["name"][hashed_id] = _field(record, "name") or ""
+        sort_keys["created"][hashed_id] = created
+        sort_keys["updated"][hashed_id] = updated
+        indexed = []
+        for name, index_values in self.filter_fields.items():
+            for value in index_values(record):
+                if value is not None:
+                    self._filter_index[name][value].add(hashed_id)
+                    indexed.append((name, value))
+        self._indexed[hashed_id] = indexed
+        self._invalidate()
+
+    def __delitem__(self, hashed_id):
+        self._unindex(hashed_id)
+        del self._records[hashed_id]
+        self._invalidate()
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, hashed_id):
+        return hashed_id in self._records
+
+    def max_id(self) -> int:
+        return max(self._sort_keys["id"].values(), default=0)
+
+    def _unindex(self, hashed_id):
+        for keys in self._sort_keys.values():
+            keys.pop(hashed_id, None)
+        for name, value in self._indexed.pop(hashed_id, ()):
+            members = self._filter_index[name].get(value)
+            if members is not None:
+                members.discard(hashed_id)
+
+    def _invalidate(self):
+        if self._orders or self._query_cache:
+            self._orders = {}
+            self._query_cache = {}
+
+    def _sorted(self, hashed_ids, sort_by) -> list:
+        """`hashed_ids` in ascending order of `sort_by`, ties broken by id"""
+        sort_by = sort_by or "id"
+        if sort_by not in self._sort_keys:
+            raise requests.HTTPError(response=FakeResponse(status_code=400))
+        # Two stable sorts with C-level key lookups beat one sort on tuple keys
+        ordered = sorted(hashed_ids, key=self._sort_keys["id"].__getitem__)
+        if sort_by != "id":
+            ordered.sort(key=self._sort_keys[sort_by].__getitem__)
+        return ordered
+
+    def _order(self, sort_by) -> list:
+        order = self._orders.get(sort_by)
+        if order is None:
+            order = self._sorted(self._records, sort_by)
+            self._orders[sort_by] = order
+        return order
+
+    def query(
+        self, sort_by=None, sort_direction=1, page=1, per_page=MAX_PER_PAGE, hashed_ids=None, **filters
+    ):
+        filters = {
+            name: str(value) for name, value in filters.items() if value is not None
+        }
+        if hashed_ids is not None:
+            candidates = {hashed_id for hashed_id in hashed_ids if hashed_id in self._records}
+            for name, value in filters.items():
+                candidates &= self._filter_index[name].get(value, set())
+            matching = self._sorted(candidates, sort_by)
+        elif filters:
+            cache_key = (sort_by, tuple(sorted(filters.items())))
+            matching = self._query_cache.get(cache_key)
+            if matching is None:
+                candidate_sets = sorted(
+                    (self._filter_index[name].get(value, set()) for name, value in filters.items()),
+                    key=len,
+                )
+                candidates = candidate_sets[0].intersection(*candidate_sets[1:])
+                matching = self._sorted(candidates, sort_by)
+                self._query_cache[cache_key] = matching
+        else:
+            matching = self._order(sort_by)
+
+        if per_page is None:
+            # Everything, for the dummy's own use; the API caps pages at MAX_PER_PAGE
+            return [self[hashed_id] for hashed_id in matching]
+        page = max(int(page), 1)
+        per_page = min(max(int(per_page), 1), MAX_PER_PAGE)
+        start = (page - 1) * per_page
+        if int(sort_direction):
+            page_ids = matching[start:start + per_page]
+        else:
+            end = len(matching) - start
+            page_ids = matching[max(end - per_page, 0):max(end, 0)][::-1]
+        return [self[hashed_id] for hashed_id in page_ids]
+
+
+def _caption_srt(caption_filename: str, caption_text) -> str:
+    """The caption text as the API would store it: WebVTT (or Captions) becomes SRT"""
+    if isinstance(caption_text, Captions):
+        return caption_text.to_srt()
+    if caption_filename and not caption_text:
+        with open(caption_filename, encoding="utf-8-sig") as caption_file:
+            caption_text = caption_file.read()
+    if caption_text.lstrip().startswith("WEBVTT"):
+        return Captions.from_text(caption_text).to_srt()
+    return caption_text
+
+
+def _random_name(rng):
+    return f"{rng.getrandbits(48):012x}"
+
+
 class DummyWistiaClient(WistiaClient):
     def __init__(self, api_password=""):
         super().__init__(api_password)
@@ -23,13 +218,92 @@ class DummyWistiaClient(WistiaClient):
             None
         )  # Make sure we don't hit the API in methods not yet overridden
 
-        self.medias = {}
+        self.medias = IndexedStore(
+            Media,
+            filter_fields={
+                "project_id": _media_project_ids,
+                "name": lambda record: (_field(record, "name"),),
+                "type": lambda record: (_field(record, "type"),),
+            },
+        )
         self.captions = defaultdict(list)
-        self.projects = {}
+        self.customizations = defaultdict(dict)
+        self.stats = {}  # hashed_id -> stats dict, see show_media_stats
+        self.projects = IndexedStore(Project)
 
     def add_dummy_video(self, **kwargs):
         new_media = Media.get_mock_object(overrides=dict(type="Video", **kwargs))
         self.medias[new_media.hashed_id] = new_media
+        self._count_media(new_media.project, 1)
+        return new_media
+
+    def add_dummy_project(self, **kwargs):
+        new_project = Project.get_mock_object(overrides=dict(medias=None, **kwargs))
+        self.projects[new_project.hashed_id] = new_project
+        return new_project
+
+    def seed(self, media_count: int, project_count: int = 10, random_seed: int = 0) -> None:
+        """
+        Fill the store with generated projects and medias. Medias are stored as raw
+        API payloads and only parsed when returned, so a million of them is cheap.
+        """
+        rng = random.Random(random_seed)
+        epoch = datetime(2015, 1, 1, tzinfo=timezone.utc)
+        epoch_ts = int(epoch.timestamp())
+        next_project_id = self.projects.max_id() + 1
+        next_media_id = self.medias.max_id() + 1
+
+        projects = []
+        for project_id in range(next_project_id, next_project_id + project_count):
+            created = (epoch + timedelta(seconds=rng.randrange(10 ** 8))).isoformat()
+            project_data = {
+                "id": project_id,
+                "name": _random_name(rng),
+                "hashed_id": f"p{project_id:09d}",
+                "mediaCount": 0,
+                "created": created,
+                "updated": created,
+                "anonymousCanUpload": False,
+                "anonymousCanDownload": False,
+                "public": False,
+                "publicId": f"p{project_id:09d}",
+            }
+            projects.append(project_data)
+
+        media_types = ["Video", "Video", "Video", "Audio", "Image", "PdfDocument"]
+        for media_id in range(next_media_id, next_media_id + media_count):
+            project_data = projects[rng.randrange(project_count)] if projects else None
+            created = epoch_ts + int(rng.random() * 10 ** 8)
+            updated = created + int(rng.random() * 10 ** 6)
+            hashed_id = f"m{media_id:09d}"
+            media_data = {
+                "id": media_id,
+                "name": _random_name(rng),
+                "hashed_id": hashed_id,
+                "description": "",
+                "project": project_data and {
+                    "id": project_data["id"],
+                    "name": project_data["name"],
+                    "hashed_id": project_data["hashed_id"],
+                },
+                "type": rng.choice(media_types),
+                "status": "ready",
+                "progress": 1.0,
+                "thumbnail": {
+                    "url": f"https://embed-ssl.wistia.com/deliveries/{hashed_id}.jpg",
+                    "width": 200,
+                    "height": 120,
+                },
+                "duration": round(rng.uniform(5, 3600), 3),
+                "created": datetime.fromtimestamp(created, timezone.utc).isoformat(),
+                "updated": datetime.fromtimestamp(updated, timezone.utc).isoformat(),
+            }
+            self.medias._insert(hashed_id, media_data, created=created, updated=updated)
+            if project_data:
+                project_data["mediaCount"] += 1
+
+        for project_data in projects:
+            self.projects[project_data["hashed_id"]] = project_data
 
     def list_projects(
         self,
@@ -43,37 +317,52 @@ class DummyWistiaClient(WistiaClient):
             f"sort_by={sort_by!r}, sort_direction={sort_direction!r}, "
             f"page={page!r}, per_page={per_page!r})"
         )
-        return self.projects.values()
-
-    def list_all_projects(self) -> Iterable[Project]:
-        log.info('WISTIA API CALL: list_all_projects()')
-        yield from self.projects.values()
+        return self.projects.query(
+            sort_by=sort_by, sort_direction=sort_direction, page=page, per_page=per_page
+        )
 
-    def show_project(self, project_hashed_id: str) -> Project:
-        log.info(f"WISTIA API CALL: show_project({project_hashed_id})")
+    def _get_project(self, project_hashed_id: str) -> Project:
         project = self.projects.get(project_hashed_id, None)
         if not project:
             raise requests.HTTPError(response=FakeResponse(status_code=404))
         return project
 
+    def show_project(self, project_hashed_id: str) -> Project:
+        log.info(f"WISTIA API CALL: show_project({project_hashed_id})")
+        # Like the API, embed the project's medias; the stored project stays without them
+        project = Project(self._get_project(project_hashed_id).to_primitive(), strict=False)
+        project.medias = list(self.medias.query(project_id=project.id, per_page=None))
+        return project
+
     def list_medias(
         self,
-        sort_by=None,  # None:ProjectID,  name, created, or updated
+        sort_by="name",
         sort_direction=1,
         page=1,
         per_page=100,
         project_id=None,
         name=None,
         media_type=None,
+        hashed_ids=None,
     ) -> Iterable[Media]:
         log.info(
             f"WISTIA API CALL: list_medias("
             f"sort_by={sort_by!r}, sort_direction={sort_direction!r}, "
             f"page={page!r}, per_page={per_page!r}, "
-            f"project_id={project_id!r}, name={name!r}, media_type={media_type!r}"
+            f"project_id={project_id!r}, name={name!r}, media_type={media_type!r}, "
+            f"hashed_ids={hashed_ids!r}"
             f")"
         )
-        return self.medias.values()
+        return self.medias.query(
+            sort_by=sort_by,
+            sort_direction=sort_direction,
+            page=page,
+            per_page=per_page,
+            hashed_ids=hashed_ids,
+            project_id=project_id,
+            name=name,
+            type=media_type,
+        )
 
     def show_media(self, wistia_hashed_id: str) -> Media:
         log.info(f"WISTIA API CALL: show_media({wistia_hashed_id})")
@@ -82,9 +371,176 @@ class DummyWistiaClient(WistiaClient):
             raise requests.HTTPError(response=FakeResponse(status_code=404))
         return media
 
+    def _get_media(self, wistia_hashed_id: str) -> Media:
+        media = self.medias.get(wistia_hashed_id, None)
+        if not media:
+            raise requests.HTTPError(response=FakeResponse(status_code=404))
+        return media
+
+    def _count_media(self, project_reference, change: int) -> None:
+        """Keep a project's mediaCount in step as medias are added and removed"""
+        if project_reference is None:
+            return
+        project = self.projects.get(project_reference.hashed_id, None)
+        if project is not None:
+            project.media_count = max((project.media_count or 0) + change, 0)
+
+    def _find_project(self, project_id) -> Project:
+        project_id = str(project_id)
+        if project_id in self.projects:
+            return self.projects[project_id]
+        for project in self.projects.values():
+            if str(project.id) == project_id:
+                return project
+        return None
+
+    def update_media(
+        self,
+        wistia_hashed_id: str,
+        name: str = None,
+        description: str = None,
+        new_still_media_id: str = None,
+    ) -> Media:
+        log.info(
+            f"WISTIA API CALL: update_media({wistia_hashed_id!r}, name={name!r}, "
+            f"description={description!r}, new_still_media_id={new_still_media_id!r})"
+        )
+        media = self._get_media(wistia_hashed_id)
+        if name is not None:
+            media.name = name
+        if description is not None:
+            media.description = description
+        self.medias[wistia_hashed_id] = media  # re-index
+        return media
+
+    def delete_media(self, wistia_hashed_id: str) -> Media:
+        log.info(f"WISTIA API CALL: delete_media({wistia_hashed_id!r})")
+        media = self._get_media(wistia_hashed_id)
+        del self.medias[wistia_hashed_id]
+        self._count_media(media.project, -1)
+        self.captions.pop(wistia_hashed_id, None)
+        self.customizations.pop(wistia_hashed_id, None)
+        return media
+
+    def copy_media(
+        self, wistia_hashed_id: str, project_id: str = None, owner: str = None
+    ) -> Media:
+        log.info(
+            f"WISTIA API CALL: copy_media({wistia_hashed_id!r}, project_id={project_id!r}, "
+            f"owner={owner!r})"
+        )
+        media = self._get_media(wistia_hashed_id)
+        new_media = Media(media.to_primitive(), strict=False)
+        new_media.id = self.medias.max_id() + 1
+        new_media.hashed_id = f"m{new_media.id:09d}"
+        project = self._find_project(project_id) if project_id is not None else None
+        if project:
+            new_media.project = ProjectReference(
+                {"id": project.id, "name": project.name, "hashed_id": project.hashed_id}
+            )
+        self.medias[new_media.hashed_id] = new_media
+        self._count_media(new_media.project, 1)
+        return new_media
+
+    def create_project(
+        self,
+        name: str,
+        admin_email: str = None,
+        anonymous_can_upload: bool = None,
+        anonymous_can_download: bool = None,
+        public: bool = None,
+    ) -> Project:
+        log.info(f"WISTIA API CALL: create_project({name!r})")
+        now = datetime.now(timezone.utc)
+        project_id = self.projects.max_id() + 1
+        project = Project(
+            {
+                "id": project_id,
+                "name": name,
+                "hashed_id": f"p{project_id:09d}",
+                "mediaCount": 0,
+                "created": now,
+                "updated": now,
+                "anonymousCanUpload": bool(anonymous_can_upload),
+                "anonymousCanDownload": bool(anonymous_can_download),
+                "public": bool(public),
+            },
+            strict=False,
+        )
+        self.projects[project.hashed_id] = project
+        return project
+
+    def update_project(
+        self,
+        project_hashed_id: str,
+        name: str = None,
+        anonymous_can_upload: bool = None,
+        anonymous_can_download: bool = None,
+        public: bool = None,
+    ) -> Project:
+        log.info(f"WISTIA API CALL: update_project({project_hashed_id!r}, name={name!r})")
+        project = self._get_project(project_hashed_id)
+        for field_name, value in [
+            ("name", name),
+            ("anonymous_can_upload", anonymous_can_upload),
+            ("anonymous_can_download", anonymous_can_download),
+            ("public", public),
+        ]:
+            if value is not None:
+                setattr(project, field_name, value)
+        self.projects[project_hashed_id] = project  # re-index
+        return project
+
+    def delete_project(self, project_hashed_id: str) -> Project:
+        log.info(f"WISTIA API CALL: delete_project({project_hashed_id!r})")
+        project = self._get_project(project_hashed_id)
+        del self.projects[project_hashed_id]
+        for media in self.medias.query(project_id=project.id, per_page=None):
+            self.delete_media(media.hashed_id)
+        return project
+
+    def copy_project(self, project_hashed_id: str, admin_email: str = None) -> Project:
+        log.info(f"WISTIA API CALL: copy_project({project_hashed_id!r})")
+        project = self._get_project(project_hashed_id)
+        new_project = self.create_project(
+            name=project.name,
+            anonymous_can_upload=project.anonymous_can_upload,
+            anonymous_can_download=project.anonymous_can_download,
+            public=project.public,
+        )
+        for media in self.medias.query(project_id=project.id, per_page=None):
+            self.copy_media(media.hashed_id, project_id=new_project.hashed_id)
+        return new_project
+
+    def show_media_stats(self, wistia_hashed_id: str) -> MediaStats:
+        log.info(f"WISTIA API CALL: show_media_stats({wistia_hashed_id!r})")
+        media = self._get_media(wistia_hashed_id)
+        stats = {
+            "pageLoads": 0,
+            "visitors": 0,
+            "percentOfVisitorsClickingPlay": 0,
+            "plays": 0,
+            "averagePercentWatched": 0,
+            **self.stats.get(wistia_hashed_id, {}),
+        }
+        return MediaStats(
+            {"id": media.id, "hashed_id": media.hashed_id, "name": media.name, "stats": stats},
+            strict=False,
+        )
+
     def show_media_customizations(self, wistia_hashed_id: str) -> dict:
         log.info(f"WISTIA API CALL: show_media_customizations({wistia_hashed_id!r})")
-        return {}
+        return self.customizations[wistia_hashed_id]
+
+    def update_media_customizations(self, wistia_hashed_id: str, customizations: dict) -> dict:
+        log.info(
+            f"WISTIA API CALL: update_media_customizations({wistia_hashed_id!r}, {customizations!r})"
+        )
+        self._get_media(wistia_hashed_id)
+        self.customizations[wistia_hashed_id] = merge_customizations(
+            self.customizations[wistia_hashed_id], customizations
+        )
+        return self.customizations[wistia_hashed_id]
 
     def list_captions(self, wistia_hashed_id: str) -> Iterable[CaptionTrack]:
         log.info(f"WISTIA API CALL: list_captions({wistia_hashed_id!r})")
@@ -112,7 +568,7 @@ class DummyWistiaClient(WistiaClient):
             CaptionTrack(
                 {
                     "language": language_code,
-                    "text": caption_text,
+                    "text": _caption_srt(caption_filename, caption_text),
                     "english_name": "English"
                     if language_code == "eng"
                     else f'"{language_code}"',
@@ -154,7 +610,7 @@ class DummyWistiaClient(WistiaClient):
         )
         if not matching_captions:
             raise requests.HTTPError(response=FakeResponse(status_code=404))
-        matching_captions[0].text = caption_text
+        matching_captions[0].text = _caption_srt(caption_filename, caption_text)
 
     def delete_captions(
         self, wistia_hashed_id: str, language_code: str = "eng"
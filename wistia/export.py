@@ -0,0 +1,338 @@
+"""
+Streaming full-account export
+
+Writes projects, medias, captions and customizations to one JSONL or CSV file per
+resource, optionally gzip-compressed. Records are written as they arrive and
+progress is checkpointed, so an interrupted export resumes where it stopped:
+
+    exporter = AccountExporter(client, "export/", format="jsonl", compress=True)
+    exporter.run(["projects", "medias", "captions"])
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+import requests
+
+from wistia.client import WistiaClient
+from wistia.codec import get_codec
+from wistia.pagination import iter_pages
+from wistia.serialize import to_wire
+
+log = logging.getLogger(__name__)
+
+RESOURCES = ("projects", "medias", "captions", "customizations")
+
+CSV_FIELDS = {
+    "projects": [
+        "id", "name", "hashed_id", "mediaCount", "created", "updated",
+        "anonymousCanUpload", "anonymousCanDownload", "public", "publicId",
+    ],
+    "medias": [
+        "id", "name", "hashed_id", "description", "project", "type", "status",
+        "progress", "section", "thumbnail", "duration", "created", "updated",
+        "assets", "embedCode",
+    ],
+    "captions": ["hashed_id", "language", "english_name", "native_name", "is_draft", "text"],
+    "customizations": ["hashed_id", "customizations"],
+}
+
+
+class RecordWriter:
+    """
+    Appends records to a JSONL or CSV file, optionally gzip-compressed.
+
+    Records are buffered until flush(), which writes them out (as one complete gzip
+    member when compressing) and returns the file offset. Reopening with that offset
+    discards anything written after it, so a resumed export never duplicates records.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        format: str,
+        fieldnames: List[str],
+        compress: bool = False,
+        offset: int = None,
+    ):
+        if format not in ("jsonl", "csv"):
+            raise ValueError(f"Unsupported export format {format!r}")
+        self.path = path
+        self.format = format
+        self.compress = compress
+        self._file = open(path, "r+b" if os.path.exists(path) else "wb")
+        if offset is not None:
+            self._file.truncate(offset)
+        self._file.seek(0, os.SEEK_END)
+        self._csv = None
+        if format == "jsonl":
+            self._buffer = io.BytesIO()
+            self._dumps = get_codec().dumps
+        else:
+            self._buffer = io.StringIO()
+            self._csv = csv.DictWriter(self._buffer, fieldnames=fieldnames, extrasaction="ignore")
+            if self._file.tell() == 0:
+                self._csv.writeheader()
+
+    def write(self, record: dict) -> None:
+        if self._csv is not None:
+            self._csv.writerow(
+                {
+                    name: json.dumps(value) if isinstance(value, (dict, list)) else value
+                    for name, value in record.items()
+                }
+            )
+        else:
+            self._buffer.write(self._dumps(record) + b"\n")
+
+    def flush(self) -> int:
+        data = self._buffer.getvalue()
+        if self._csv is not None:
+            data = data.encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        if data:
+            # Concatenated gzip members are read back as one stream
+            self._file.write(gzip.compress(data) if self.compress else data)
+            self._file.flush()
+        return self._file.tell()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_records(path: str, format: str) -> Iterable[dict]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as records_file:
+        if format == "csv":
+            yield from csv.DictReader(records_file)
+        else:
+            for line in records_file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class Checkpoint:
+    """Export progress, saved atomically as JSON after each unit of work"""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.state = {}
+        if path and os.path.exists(path):
+            with open(path) as checkpoint_file:
+                self.state = json.load(checkpoint_file)
+
+    def resource(self, name: str) -> dict:
+        return self.state.setdefault(
+            name, {"next_page": 1, "next_index": 0, "offset": 0, "complete": False}
+        )
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump(self.state, checkpoint_file)
+        os.replace(temp_path, self.path)
+
+    # The media list a per-media export works through, kept beside the checkpoint
+    # (rather than in it, which is saved after every batch) so a resumed export
+    # continues through the same list
+
+    def _ids_path(self, name: str) -> str:
+        return f"{self.path}.{name}-ids.json"
+
+    def load_ids(self, name: str) -> Optional[List[str]]:
+        if not self.path or not os.path.exists(self._ids_path(name)):
+            return None
+        with open(self._ids_path(name)) as ids_file:
+            return json.load(ids_file)
+
+    def save_ids(self, name: str, ids: List[str]) -> None:
+        if not self.path:
+            return
+        temp_path = f"{self._ids_path(name)}.tmp"
+        with open(temp_path, "w") as ids_file:
+            json.dump(ids, ids_file)
+        os.replace(temp_path, self._ids_path(name))
+
+    def discard_ids(self, name: str) -> None:
+        if self.path and os.path.exists(self._ids_path(name)):
+            os.remove(self._ids_path(name))
+
+
+class AccountExporter:
+    def __init__(
+        self,
+        client: WistiaClient,
+        output_dir: str,
+        format: str = "jsonl",
+        compress: bool = False,
+        checkpoint_path: str = None,
+        max_workers: int = 8,
+        per_page: int = 100,
+    ):
+        self.client = client
+        self.output_dir = output_dir
+        self.format = format
+        self.compress = compress
+        self.max_workers = max_workers
+        self.per_page = per_page
+        self.checkpoint = Checkpoint(
+            checkpoint_path or os.path.join(output_dir, ".export-checkpoint.json")
+        )
+        os.makedirs(output_dir, exist_ok=True)
+
+    def output_path(self, resource: str) -> str:
+        path = os.path.join(self.output_dir, f"{resource}.{self.format}")
+        return f"{path}.gz" if self.compress else path
+
+    def _writer(self, resource: str, offset: int) -> RecordWriter:
+        return RecordWriter(
+            self.output_path(resource),
+            self.format,
+            CSV_FIELDS[resource],
+            compress=self.compress,
+            offset=offset,
+        )
+
+    def run(self, resources: Iterable[str] = RESOURCES) -> None:
+        resources = list(resources)
+        unknown = set(resources) - set(RESOURCES)
+        if unknown:
+            raise ValueError(f"Unknown resources: {', '.join(sorted(unknown))}")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            self._executor = executor
+            if "projects" in resources:
+                self._export_pages("projects", self._fetch_projects_page)
+            if "medias" in resources:
+                self._export_pages("medias", self._fetch_medias_page)
+            media_ids = None
+
+            def list_media_ids() -> List[str]:
+                nonlocal media_ids
+                if media_ids is None:
+                    media_ids = self._media_hashed_ids("medias" in resources)
+                return media_ids
+
+            for resource in ("captions", "customizations"):
+                if resource in resources:
+                    self._export_per_media(resource, list_media_ids)
+
+    # Paged resources
+
+    def _fetch_projects_page(self, page: int) -> list:
+        return [
+            to_wire(project)
+            for project in self.client.list_projects(page=page, per_page=self.per_page)
+        ]
+
+    def _fetch_medias_page(self, page: int) -> list:
+        return [
+            to_wire(media)
+            for media in self.client.list_medias(
+                sort_by="created", page=page, per_page=self.per_page
+            )
+        ]
+
+    def _export_pages(self, resource: str, fetch_page) -> None:
+        progress = self.checkpoint.resource(resource)
+        if progress["complete"]:
+            log.info(f"Export of {resource} already complete, skipping")
+            return
+        log.info(f"Exporting {resource} from page {progress['next_page']}")
+        with self._writer(resource, progress["offset"]) as writer:
+            for page, records in iter_pages(
+                fetch_page,
+                max_workers=self.max_workers,
+                start_page=progress["next_page"],
+                executor=self._executor,
+            ):
+                for record in records:
+                    writer.write(record)
+                progress["offset"] = writer.flush()
+                progress["next_page"] = page + 1
+                self.checkpoint.save()
+        progress["complete"] = True
+        self.checkpoint.save()
+
+    # Per-media resources
+
+    def _media_hashed_ids(self, medias_exported: bool) -> List[str]:
+        if medias_exported:
+            return [
+                record["hashed_id"]
+                for record in read_records(self.output_path("medias"), self.format)
+            ]
+        return [
+            media["hashed_id"]
+            for _, page in iter_pages(
+                self._fetch_medias_page, max_workers=self.max_workers, executor=self._executor
+            )
+            for media in page
+        ]
+
+    def _fetch_captions(self, hashed_id: str) -> list:
+        return [
+            {"hashed_id": hashed_id, **to_wire(track)}
+            for track in self.client.list_captions(hashed_id)
+        ]
+
+    def _fetch_customizations(self, hashed_id: str) -> list:
+        return [
+            {
+                "hashed_id": hashed_id,
+                "customizations": self.client.show_media_customizations(hashed_id),
+            }
+        ]
+
+    def _export_per_media(self, resource: str, list_media_ids: Callable[[], List[str]]) -> None:
+        progress = self.checkpoint.resource(resource)
+        if progress["complete"]:
+            log.info(f"Export of {resource} already complete, skipping")
+            return
+        # Resume through the list the export started with: next_index into a fresh
+        # listing would skip or repeat medias once any were added or deleted
+        media_ids = self.checkpoint.load_ids(resource) if progress["next_index"] else None
+        if media_ids is None:
+            media_ids = list_media_ids()
+            self.checkpoint.save_ids(resource, media_ids)
+        log.info(f"Exporting {resource} for {len(media_ids) - progress['next_index']} medias")
+        fetch = self._fetch_captions if resource == "captions" else self._fetch_customizations
+
+        def fetch_one(hashed_id):
+            try:
+                return fetch(hashed_id)
+            except requests.HTTPError as error:
+                if getattr(error.response, "status_code", None) == 404:
+                    # Deleted since it was listed
+                    return []
+                raise
+
+        batch_size = self.max_workers * 4
+        with self._writer(resource, progress["offset"]) as writer:
+            for start in range(progress["next_index"], len(media_ids), batch_size):
+                batch = media_ids[start:start + batch_size]
+                for records in self._executor.map(fetch_one, batch):
+                    for record in records:
+                        writer.write(record)
+                progress["offset"] = writer.flush()
+                progress["next_index"] = start + len(batch)
+                self.checkpoint.save()
+        progress["complete"] = True
+        self.checkpoint.save()
+        self.checkpoint.discard_ids(resource)
@@ -0,0 +1,464 @@
+"""
+Local fake Wistia API server
+
+Serves the Data API endpoints used by WistiaClient over real sockets, backed by a
+DummyWistiaClient store, with optional latency, fault injection (429 and 5xx) and a
+bandwidth cap. Useful for benchmarking retries, connection pooling and concurrency
+end-to-end without network access.
+
+Usage:
+
+    with FakeWistiaServer(latency=lognormal_latency(0.05, 0.5), server_error_rate=0.01) as server:
+        server.store.seed(media_count=10000)
+        client = server.client()
+        projects = list(client.list_all_projects())
+
+In tests, the fake_wistia_server fixture (see wistia.pytest_plugin) provides a
+seeded server.
+
+From the command line:
+
+    python -m wistia.fakeserver --port 8000 --seed-medias 100000 --latency lognormal:0.05,0.5
+"""
+
+import argparse
+import email.parser
+import gzip
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from wistia.client import WistiaClient
+from wistia.dummy import DummyWistiaClient, FakeResponse
+
+log = logging.getLogger(__name__)
+
+LatencyDistribution = Callable[[], float]
+
+
+def fixed_latency(seconds: float) -> LatencyDistribution:
+    return lambda: seconds
+
+
+def uniform_latency(low: float, high: float, rng: random.Random = None) -> LatencyDistribution:
+    rng = rng or random.Random()
+    return lambda: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float, rng: random.Random = None) -> LatencyDistribution:
+    """Long-tailed latency, as seen from real APIs. `median` is in seconds."""
+    rng = rng or random.Random()
+    mu = math.log(median)
+    return lambda: rng.lognormvariate(mu, sigma)
+
+
+def parse_latency(spec: str) -> Optional[LatencyDistribution]:
+    """Parse a latency spec such as "fixed:0.05", "uniform:0.01,0.1" or "lognormal:0.05,0.5"."""
+    if not spec:
+        return None
+    kind, _, arguments = spec.partition(":")
+    values = [float(value) for value in arguments.split(",") if value]
+    factories = {
+        "fixed": fixed_latency,
+        "uniform": uniform_latency,
+        "lognormal": lognormal_latency,
+    }
+    if kind not in factories:
+        raise ValueError(f"Unknown latency distribution {kind!r}")
+    return factories[kind](*values)
+
+
+def _http_status(error: requests.HTTPError) -> int:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", 500)
+
+
+def _parse_form(content_type: str, body: bytes) -> dict:
+    if content_type.startswith("multipart/form-data"):
+        message = email.parser.BytesParser().parsebytes(
+            b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body
+        )
+        form = {}
+        for part in message.get_payload():
+            name = part.get_param("name", header="content-disposition")
+            form[name] = part.get_payload(decode=True).decode("utf-8")
+        return form
+    return {
+        name: values[0] for name, values in parse_qs(body.decode("utf-8")).items()
+    }
+
+
+def _form_bool(value):
+    return None if value is None else value.lower() in ("true", "1")
+
+
+class FakeWistiaServer:
+    ROUTES = [
+        ("GET", r"projects\.json", "list_projects"),
+        ("POST", r"projects\.json", "create_project"),
+        ("GET", r"projects/(?P<hashed_id>[^/]+)\.json", "show_project"),
+        ("PUT", r"projects/(?P<hashed_id>[^/]+)\.json", "update_project"),
+        ("DELETE", r"projects/(?P<hashed_id>[^/]+)\.json", "delete_project"),
+        ("POST", r"projects/(?P<hashed_id>[^/]+)/copy\.json", "copy_project"),
+        ("GET", r"medias\.json", "list_medias"),
+        ("GET", r"medias/(?P<hashed_id>[^/]+)\.json", "show_media"),
+        ("PUT", r"medias/(?P<hashed_id>[^/]+)\.json", "update_media"),
+        ("DELETE", r"medias/(?P<hashed_id>[^/]+)\.json", "delete_media"),
+        ("POST", r"medias/(?P<hashed_id>[^/]+)/copy\.json", "copy_media"),
+        ("GET", r"medias/(?P<hashed_id>[^/]+)/stats\.json", "show_media_stats"),
+        ("GET", r"medias/(?P<hashed_id>[^/]+)/customizations\.json", "show_customizations"),
+        ("PUT", r"medias/(?P<hashed_id>[^/]+)/customizations\.json", "update_customizations"),
+        ("GET", r"medias/(?P<hashed_id>[^/]+)/captions\.json", "list_captions"),
+        ("POST", r"medias/(?P<hashed_id>[^/]+)/captions\.json", "create_captions"),
+        ("POST", r"medias/(?P<hashed_id>[^/]+)/captions/purchase\.json", "purchase_captions"),
+        ("GET", r"medias/(?P<hashed_id>[^/]+)/captions/(?P<language>[^/]+)\.json", "show_captions"),
+        ("PUT", r"medias/(?P<hashed_id>[^/]+)/captions/(?P<language>[^/]+)\.json", "update_captions"),
+        ("DELETE", r"medias/(?P<hashed_id>[^/]+)/captions/(?P<language>[^/]+)\.json", "delete_captions"),
+    ]
+
+    def __init__(
+        self,
+        store: DummyWistiaClient = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: LatencyDistribution = None,
+        rate_limit_rate: float = 0.0,
+        server_error_rate: float = 0.0,
+        bandwidth: int = None,
+        retry_after: int = 1,
+        random_seed: int = None,
+        gzip_min_size: Optional[int] = 1024,
+    ):
+        """
+        :param store: The DummyWistiaClient holding the data to serve
+        :param latency: Called per request for the delay (in seconds) before responding
+        :param rate_limit_rate: Fraction of requests answered with 429 Too Many Requests
+        :param server_error_rate: Fraction of requests answered with a 500, 502 or 503
+        :param bandwidth: Cap on response bytes per second, per connection
+        :param gzip_min_size: Gzip responses of at least this many bytes when the
+            client accepts it, as the API does; None to never compress
+        """
+        self.store = store if store is not None else DummyWistiaClient()
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.server_error_rate = server_error_rate
+        self.bandwidth = bandwidth
+        self.retry_after = retry_after
+        self.gzip_min_size = gzip_min_size
+        self.rng = random.Random(random_seed)
+        self.request_count = 0
+        self.fault_count = 0
+        self.connection_count = 0
+
+        self._lock = threading.Lock()
+        self._routes = [
+            (method, re.compile(f"/v1/{pattern}$"), handler_name)
+            for method, pattern, handler_name in self.ROUTES
+        ]
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def client(self, api_password: str = "fake", client_cls=WistiaClient, **client_kwargs) -> WistiaClient:
+        """A client whose requests go to this server"""
+        client = client_cls(api_password=api_password, **client_kwargs)
+        client.API_BASE_URL = self.url
+        return client
+
+    def start(self) -> "FakeWistiaServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-wistia-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Request handling
+
+    def _injected_fault(self):
+        with self._lock:
+            self.request_count += 1
+            roll = self.rng.random()
+            if roll < self.rate_limit_rate:
+                self.fault_count += 1
+                return 429, [("Retry-After", str(self.retry_after))]
+            if roll < self.rate_limit_rate + self.server_error_rate:
+                self.fault_count += 1
+                return self.rng.choice([500, 502, 503]), []
+        return None
+
+    def dispatch(self, method: str, path: str, query: dict, form: dict, body: bytes):
+        """:return: (status code, extra headers, JSON-able payload or None)"""
+        for route_method, pattern, handler_name in self._routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                break
+        else:
+            return 404, [], {"error": "Not found"}
+
+        handler = getattr(self, f"_handle_{handler_name}")
+        try:
+            with self._lock:
+                return 200, [], handler(query=query, form=form, body=body, **match.groupdict())
+        except requests.HTTPError as error:
+            return _http_status(error), [], {"error": "Request failed"}
+        except Exception:
+            # Answer like the API would, rather than dropping the connection
+            log.exception(f"Fake server failed handling {method} {path}")
+            return 500, [], {"error": "Internal server error"}
+
+    def _handle_list_projects(self, query, **kwargs):
+        projects = self.store.list_projects(
+            sort_by=query.get("sort_by"),
+            sort_direction=int(query.get("sort_direction", 1)),
+            page=int(query.get("page", 1)),
+            per_page=int(query.get("per_page", 100)),
+        )
+        return [project.to_primitive() for project in projects]
+
+    def _handle_show_project(self, hashed_id, **kwargs):
+        return self.store.show_project(hashed_id).to_primitive()
+
+    def _handle_create_project(self, form, **kwargs):
+        return self.store.create_project(
+            name=form.get("name"),
+            anonymous_can_upload=_form_bool(form.get("anonymousCanUpload")),
+            anonymous_can_download=_form_bool(form.get("anonymousCanDownload")),
+            public=_form_bool(form.get("public")),
+        ).to_primitive()
+
+    def _handle_update_project(self, hashed_id, form, **kwargs):
+        return self.store.update_project(
+            hashed_id,
+            name=form.get("name"),
+            anonymous_can_upload=_form_bool(form.get("anonymousCanUpload")),
+            anonymous_can_download=_form_bool(form.get("anonymousCanDownload")),
+            public=_form_bool(form.get("public")),
+        ).to_primitive()
+
+    def _handle_delete_project(self, hashed_id, **kwargs):
+        return self.store.delete_project(hashed_id).to_primitive()
+
+    def _handle_copy_project(self, hashed_id, form, **kwargs):
+        return self.store.copy_project(hashed_id, admin_email=form.get("adminEmail")).to_primitive()
+
+    def _handle_list_medias(self, query, **kwargs):
+        medias = self.store.list_medias(
+            sort_by=query.get("sort_by"),
+            sort_direction=int(query.get("sort_direction", 1)),
+            page=int(query.get("page", 1)),
+            per_page=int(query.get("per_page", 100)),
+            project_id=query.get("project_id"),
+            name=query.get("name"),
+            media_type=query.get("type"),
+            hashed_ids=query.get("hashed_ids[]"),
+        )
+        return [media.to_primitive() for media in medias]
+
+    def _handle_show_media(self, hashed_id, **kwargs):
+        return self.store.show_media(hashed_id).to_primitive()
+
+    def _handle_update_media(self, hashed_id, form, **kwargs):
+        return self.store.update_media(
+            hashed_id,
+            name=form.get("name"),
+            description=form.get("description"),
+            new_still_media_id=form.get("new_still_media_id"),
+        ).to_primitive()
+
+    def _handle_delete_media(self, hashed_id, **kwargs):
+        return self.store.delete_media(hashed_id).to_primitive()
+
+    def _handle_copy_media(self, hashed_id, form, **kwargs):
+        return self.store.copy_media(
+            hashed_id, project_id=form.get("project_id"), owner=form.get("owner")
+        ).to_primitive()
+
+    def _handle_show_media_stats(self, hashed_id, **kwargs):
+        return self.store.show_media_stats(hashed_id).to_primitive()
+
+    def _handle_show_customizations(self, hashed_id, **kwargs):
+        self.store.show_media(hashed_id)
+        return self.store.show_media_customizations(hashed_id)
+
+    def _handle_update_customizations(self, hashed_id, body, **kwargs):
+        self.store.show_media(hashed_id)
+        return self.store.update_media_customizations(hashed_id, json.loads(body or b"{}"))
+
+    def _handle_list_captions(self, hashed_id, **kwargs):
+        return [track.to_primitive() for track in self.store.list_captions(hashed_id)]
+
+    def _handle_create_captions(self, hashed_id, form, **kwargs):
+        language = form.get("language", "eng")
+        if self.store._captions_for_media_by_language(hashed_id, language):
+            raise requests.HTTPError(response=FakeResponse(status_code=400))
+        self.store.create_captions(
+            hashed_id, language, caption_text=form.get("caption_file", "")
+        )
+        return None
+
+    def _handle_purchase_captions(self, hashed_id, **kwargs):
+        self.store.show_media(hashed_id)
+        self.store.purchase_captions(hashed_id)
+        return None
+
+    def _handle_show_captions(self, hashed_id, language, **kwargs):
+        return self.store.show_captions(hashed_id, language).to_primitive()
+
+    def _handle_update_captions(self, hashed_id, language, form, **kwargs):
+        self.store.update_captions(
+            hashed_id, language, caption_text=form.get("caption_file", "")
+        )
+        return None
+
+    def _handle_delete_captions(self, hashed_id, language, **kwargs):
+        self.store.delete_captions(hashed_id, language)
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; don't let Nagle delay the body
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                log.debug(format, *args)
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connection_count += 1
+
+            def _handle(self):
+                content_length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(content_length) if content_length else b""
+
+                if server.latency:
+                    time.sleep(max(server.latency(), 0.0))
+
+                if not self.headers.get("Authorization", "").startswith("Bearer "):
+                    return self._respond(401, [], {"error": "Unauthorized"})
+
+                fault = server._injected_fault()
+                if fault:
+                    status, headers = fault
+                    return self._respond(status, headers, {"error": "Injected fault"})
+
+                url = urlsplit(self.path)
+                query = {
+                    # Array parameters such as hashed_ids[] keep all their values
+                    name: values if name.endswith("[]") else values[0]
+                    for name, values in parse_qs(url.query).items()
+                }
+                form = {}
+                content_type = self.headers.get("Content-Type", "")
+                if body and not content_type.startswith("application/json"):
+                    try:
+                        form = _parse_form(content_type, body)
+                    except ValueError:  # including undecodable text
+                        return self._respond(400, [], {"error": "Malformed request body"})
+                status, headers, payload = server.dispatch(
+                    self.command, url.path, query, form, body
+                )
+                self._respond(status, headers, payload)
+
+            def _respond(self, status, headers, payload):
+                response_body = b"" if payload is None else json.dumps(payload).encode()
+                if (
+                    server.gzip_min_size is not None
+                    and len(response_body) >= server.gzip_min_size
+                    and "gzip" in self.headers.get("Accept-Encoding", "")
+                ):
+                    response_body = gzip.compress(response_body, compresslevel=6)
+                    headers = [("Content-Encoding", "gzip"), *headers]
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response_body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self._write(response_body)
+
+            def _write(self, data: bytes):
+                if not server.bandwidth:
+                    self.wfile.write(data)
+                    return
+                chunk_size = max(server.bandwidth // 20, 1)
+                for start in range(0, len(data), chunk_size):
+                    chunk = data[start:start + chunk_size]
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+                    time.sleep(len(chunk) / server.bandwidth)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+        return Handler
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Run a local fake Wistia API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--seed-medias", type=int, default=1000, help="number of medias to generate")
+    parser.add_argument("--seed-projects", type=int, default=10, help="number of projects to generate")
+    parser.add_argument(
+        "--latency",
+        help='latency distribution, e.g. "fixed:0.05", "uniform:0.01,0.1" or "lognormal:0.05,0.5"',
+    )
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="fraction of 5xx responses")
+    parser.add_argument("--bandwidth", type=int, help="response bandwidth cap in bytes per second")
+    parser.add_argument("--no-gzip", action="store_true", help="never compress responses")
+    options = parser.parse_args(args)
+
+    store = DummyWistiaClient()
+    store.seed(media_count=options.seed_medias, project_count=options.seed_projects)
+    server = FakeWistiaServer(
+        store=store,
+        host=options.host,
+        port=options.port,
+        latency=parse_latency(options.latency),
+        rate_limit_rate=options.rate_limit_rate,
+        server_error_rate=options.server_error_rate,
+        bandwidth=options.bandwidth,
+        gzip_min_size=None if options.no_gzip else 1024,
+    )
+    print(f"Serving fake Wistia API at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
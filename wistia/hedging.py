@@ -0,0 +1,133 @@
+"""
+Hedged GET requests
+
+A few slow responses dominate tail latency. With hedging, a GET that has not been
+answered after the usual response time for its endpoint (a percentile of recent
+latencies) is sent again on another pooled connection, and whichever response
+arrives first is used:
+
+    client = WistiaClient(api_password, hedging=Hedger(percentile=95, max_extra=0.05))
+
+`max_extra` caps the extra load: hedges are paid for from a budget that grows by
+`max_extra` per GET, so at most that fraction of GETs is sent twice. Only GETs are
+hedged, since they are idempotent. A GET that cannot be hedged (too few latency
+samples yet, or no budget left) is sent on the calling thread; one that can is
+sent from a thread pool, so the caller can take whichever response comes first.
+The losing request is not interrupted; its response is read and discarded.
+Hedges and the hedges that won are reported to instrumentation through on_hedge.
+"""
+
+import contextvars
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+
+class Hedger:
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        max_extra: float = 0.05,
+        min_delay: float = 0.01,
+        min_samples: int = 20,
+        window: int = 500,
+        max_workers: int = 20,
+    ):
+        """
+        :param percentile: Hedge after this percentile of the endpoint's recent latencies
+        :param max_extra: Fraction of GETs that may be hedged
+        :param min_delay: Never hedge sooner than this, in seconds
+        :param min_samples: Latencies needed for an endpoint before it is hedged
+        :param window: Recent latencies kept per endpoint
+        :param max_workers: Threads making hedged calls; two per concurrent GET
+        """
+        self.percentile = percentile
+        self.max_extra = max_extra
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.max_workers = max_workers
+        self._latencies = defaultdict(lambda: deque(maxlen=window))  # endpoint -> seconds
+        self._budget = 1.0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """Seconds to wait before hedging a call, or None while there are too few samples"""
+        with self._lock:
+            latencies = sorted(self._latencies[endpoint])
+        if len(latencies) < self.min_samples:
+            return None
+        index = min(int(len(latencies) * self.percentile / 100), len(latencies) - 1)
+        return max(latencies[index], self.min_delay)
+
+    def observe(self, endpoint: str, latency: float) -> None:
+        with self._lock:
+            self._latencies[endpoint].append(latency)
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._budget < 1.0:
+                return False
+            self._budget -= 1.0
+            return True
+
+    def _can_hedge(self) -> bool:
+        with self._lock:
+            return self._budget >= 1.0
+
+    def _timed(self, endpoint: str, send: Callable):
+        # Timed from the start of the request itself, so waiting for a pool thread isn't counted
+        started_at = time.perf_counter()
+        result = send()
+        self.observe(endpoint, time.perf_counter() - started_at)
+        return result
+
+    def _submit(self, endpoint: str, send: Callable) -> Future:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="wistia-hedge"
+                    )
+        # Carry the caller's context across, so deadlines still apply
+        return self._executor.submit(contextvars.copy_context().run, self._timed, endpoint, send)
+
+    def call(self, endpoint: str, send: Callable, on_hedge: Callable = None):
+        """
+        Return send(), calling it a second time concurrently if the first call is slow.
+        on_hedge(endpoint, won) is called when a hedge was sent.
+        """
+        with self._lock:
+            self._budget = min(self._budget + self.max_extra, 10.0)
+        delay = self.delay(endpoint)
+        if delay is None or not self._can_hedge():
+            # Nothing to race it against: send on the calling thread
+            return self._timed(endpoint, send)
+        primary = self._submit(endpoint, send)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_budget():
+            return primary.result()
+
+        hedge = self._submit(endpoint, send)
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if on_hedge is not None:
+                        on_hedge(endpoint, future is hedge)
+                    return future.result()
+                if first_error is None or future is primary:
+                    first_error = future.exception()
+        if on_hedge is not None:
+            on_hedge(endpoint, False)
+        raise first_error
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
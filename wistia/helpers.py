@@ -1,35 +1,73 @@
+from functools import lru_cache
 from os import environ
-
-from wistia.client import WistiaClient
-from wistia.dummy import DummyWistiaClient
+from typing import TYPE_CHECKING
 
 import logging
 
+if TYPE_CHECKING:
+    from wistia.client import WistiaClient
+
 log = logging.getLogger(__name__)
 
 
-def get_wistia_client(password: str = None, client_cls=None) -> WistiaClient:
-    # Calling with password='' will get you a DummyWistiaClient
+@lru_cache(maxsize=None)
+def _django_settings():
+    """Django's settings if we're running Django, else None. Looked up once per process."""
     try:
-        # If we're running Django, pull WISTIA_CLIENT_CLASS from settings
         from django.conf import settings
+    except ImportError:
+        return None
+    return settings
+
+
+def _client_class(client_class_name: str):
+    if client_class_name == "DummyWistiaClient":
+        from wistia.dummy import DummyWistiaClient
 
+        return DummyWistiaClient
+    if client_class_name == "WistiaClient":
+        from wistia.client import WistiaClient
+
+        return WistiaClient
+    raise KeyError(client_class_name)
+
+
+def get_wistia_client(
+    password: str = None, client_cls=None, record_to: str = None, replay_from: str = None
+) -> "WistiaClient":
+    # Calling with password='' will get you a DummyWistiaClient
+    # record_to / replay_from (or the WISTIA_RECORD_CASSETTE / WISTIA_REPLAY_CASSETTE
+    # environment variables) capture or replay traffic, see wistia.cassette
+    record_to = record_to or environ.get("WISTIA_RECORD_CASSETTE")
+    replay_from = replay_from or environ.get("WISTIA_REPLAY_CASSETTE")
+
+    # If we're running Django, pull WISTIA_CLIENT_CLASS from settings
+    settings = _django_settings()
+    if settings is not None:
         if client_cls is None:
             client_class_name = getattr(settings, "WISTIA_CLIENT_CLASS", "WistiaClient")
-            client_cls = globals()[client_class_name]
+            client_cls = _client_class(client_class_name)
 
         password = password or getattr(settings, "WISTIA_API_PASSWORD", None)
-    except ImportError:
-        pass
 
     if password is None:
         password = environ.get("WISTIA_API_PASSWORD")
 
     if client_cls is None:
-        if password is None or password == "":
+        if replay_from:
+            client_cls = _client_class("WistiaClient")
+        elif password is None or password == "":
             log.info("No api password found for wistia client - using dummy client")
-            client_cls = DummyWistiaClient
+            client_cls = _client_class("DummyWistiaClient")
         else:
-            client_cls = WistiaClient
+            client_cls = _client_class("WistiaClient")
 
-    return client_cls(api_password=password)
+    client = client_cls(api_password=password)
+    if client.session is None:
+        # Dummy clients make no requests to record or replay
+        return client
+    if replay_from:
+        client.replay_from(replay_from)
+    elif record_to:
+        client.record_to(record_to)
+    return client
@@ -0,0 +1,311 @@
+"""
+Instrumentation hooks for WistiaClient
+
+Every API call goes through WistiaClient.request, which reports to the
+instrumentation objects passed to the client:
+
+    metrics = MetricsRegistry()
+    client = WistiaClient(api_password=..., instrumentation=[metrics, MyTracer()])
+    ...
+    print(metrics.to_prometheus())
+
+Subclass Instrumentation and override the hooks you need; all of them are no-ops by
+default. Hooks are called from the thread making the request and must be thread-safe.
+"""
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+_ID_COLLECTIONS = {"projects", "medias", "sharings"}
+
+
+def endpoint_template(rel_path: str) -> str:
+    """
+    Replace the ids in an API path with placeholders, so metrics can be grouped
+    per endpoint, e.g. "medias/abc123/captions/eng.json" -> "medias/{id}/captions/{language}.json"
+    """
+    segments = rel_path.split("?", 1)[0].split("/")
+    for position in range(1, len(segments)):
+        previous, segment = segments[position - 1], segments[position]
+        suffix = ".json" if segment.endswith(".json") else ""
+        if previous in _ID_COLLECTIONS:
+            segments[position] = "{id}" + suffix
+        elif previous == "captions" and segment != "purchase.json":
+            segments[position] = "{language}" + suffix
+    return "/".join(segments)
+
+
+class RequestEvent:
+    """The details of one API request, filled in as the request progresses"""
+
+    __slots__ = (
+        "method",
+        "rel_path",
+        "endpoint",
+        "started_at",
+        "latency",
+        "status_code",
+        "bytes_sent",
+        "bytes_received",
+        "wire_bytes_received",
+        "error",
+    )
+
+    def __init__(self, method: str, rel_path: str):
+        self.method = method
+        self.rel_path = rel_path
+        self.endpoint = endpoint_template(rel_path)
+        self.started_at = time.perf_counter()
+        self.latency: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.bytes_sent = 0
+        self.bytes_received = 0  # decoded
+        self.wire_bytes_received = 0  # as transferred, compressed if the API compressed it
+        self.error: Optional[BaseException] = None
+
+    def __repr__(self):
+        return (
+            f"RequestEvent({self.method} {self.endpoint}, status={self.status_code}, "
+            f"latency={self.latency})"
+        )
+
+
+class Instrumentation:
+    """Base class for client instrumentation"""
+
+    def on_request_start(self, request: RequestEvent) -> None:
+        pass
+
+    def on_request_end(self, request: RequestEvent) -> None:
+        """Called once per request, whether it succeeded or not (see request.error)"""
+
+    def on_retry(self, request: RequestEvent, attempt: int, reason: str, delay: float = None) -> None:
+        """Called before retrying a request, `delay` seconds from now"""
+
+    def on_cache_hit(self, endpoint: str) -> None:
+        pass
+
+    def on_coalesced(self, endpoint: str) -> None:
+        """Called when a GET was served by an identical request already in flight"""
+
+    def on_circuit_change(self, state: str) -> None:
+        """Called when the client's circuit breaker opens, goes half-open or closes"""
+
+    def on_hedge(self, endpoint: str, won: bool) -> None:
+        """Called when a slow GET was sent again; `won` if the second response was used"""
+
+    def on_parse(self, endpoint: str, seconds: float, count: int) -> None:
+        """Called after response data has been parsed into `count` schema models"""
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        """(upper bound, cumulative count) pairs, ending with +Inf"""
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), self.counts):
+            running += bucket_count
+            yield bound, running
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+class MetricsRegistry(Instrumentation):
+    """
+    In-memory counters and latency histograms per endpoint template, exportable in
+    the Prometheus text exposition format
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix: str = "wistia"):
+        self.buckets = buckets
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)  # (method, endpoint, status) -> count
+        self.latency = defaultdict(self._histogram)  # (method, endpoint) -> Histogram
+        self.bytes_sent = defaultdict(int)  # (method, endpoint) -> bytes
+        self.bytes_received = defaultdict(int)
+        self.wire_bytes_received = defaultdict(int)
+        self.retries = defaultdict(int)  # (method, endpoint) -> count
+        self.retry_delay = defaultdict(float)  # (method, endpoint) -> seconds
+        self.cache_hits = defaultdict(int)  # endpoint -> count
+        self.coalesced = defaultdict(int)  # endpoint -> count
+        self.circuit_changes = defaultdict(int)  # state -> count
+        self.hedges = defaultdict(int)  # endpoint -> count
+        self.hedge_wins = defaultdict(int)  # endpoint -> count
+        self.parse_time = defaultdict(self._histogram)  # endpoint -> Histogram
+        self.parsed_objects = defaultdict(int)  # endpoint -> count
+
+    def _histogram(self):
+        return Histogram(self.buckets)
+
+    def on_request_end(self, request: RequestEvent) -> None:
+        key = (request.method, request.endpoint)
+        status = request.status_code if request.status_code is not None else "error"
+        with self._lock:
+            self.requests[key + (status,)] += 1
+            self.latency[key].observe(request.latency)
+            self.bytes_sent[key] += request.bytes_sent
+            self.bytes_received[key] += request.bytes_received
+            self.wire_bytes_received[key] += request.wire_bytes_received
+
+    def on_retry(self, request: RequestEvent, attempt: int, reason: str, delay: float = None) -> None:
+        with self._lock:
+            self.retries[(request.method, request.endpoint)] += 1
+            self.retry_delay[(request.method, request.endpoint)] += delay or 0.0
+
+    def on_cache_hit(self, endpoint: str) -> None:
+        with self._lock:
+            self.cache_hits[endpoint] += 1
+
+    def on_coalesced(self, endpoint: str) -> None:
+        with self._lock:
+            self.coalesced[endpoint] += 1
+
+    def on_circuit_change(self, state: str) -> None:
+        with self._lock:
+            self.circuit_changes[state] += 1
+
+    def on_hedge(self, endpoint: str, won: bool) -> None:
+        with self._lock:
+            self.hedges[endpoint] += 1
+            if won:
+                self.hedge_wins[endpoint] += 1
+
+    def on_parse(self, endpoint: str, seconds: float, count: int) -> None:
+        with self._lock:
+            self.parse_time[endpoint].observe(seconds)
+            self.parsed_objects[endpoint] += count
+
+    def request_count(self, endpoint: str = None) -> int:
+        with self._lock:
+            return sum(
+                count
+                for (_, request_endpoint, _), count in self.requests.items()
+                if endpoint is None or request_endpoint == endpoint
+            )
+
+    def to_prometheus(self) -> str:
+        prefix = self.prefix
+        lines = []
+
+        def counter(name, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for labels, value in samples:
+                lines.append(f"{prefix}_{name}{{{labels}}} {value}")
+
+        def histogram(name, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for labels, hist in samples:
+                for bound, cumulative in hist.cumulative_counts():
+                    lines.append(
+                        f'{prefix}_{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}'
+                    )
+                lines.append(f"{prefix}_{name}_sum{{{labels}}} {hist.sum}")
+                lines.append(f"{prefix}_{name}_count{{{labels}}} {hist.count}")
+
+        with self._lock:
+            counter(
+                "requests_total",
+                "API requests by endpoint and response status.",
+                [
+                    (_labels(method=m, endpoint=e, status=s), v)
+                    for (m, e, s), v in sorted(self.requests.items(), key=str)
+                ],
+            )
+            histogram(
+                "request_duration_seconds",
+                "API request latency.",
+                [(_labels(method=m, endpoint=e), h) for (m, e), h in sorted(self.latency.items())],
+            )
+            counter(
+                "request_bytes_total",
+                "Request body bytes sent.",
+                [(_labels(method=m, endpoint=e), v) for (m, e), v in sorted(self.bytes_sent.items())],
+            )
+            counter(
+                "response_bytes_total",
+                "Response body bytes received, after decompression.",
+                [(_labels(method=m, endpoint=e), v) for (m, e), v in sorted(self.bytes_received.items())],
+            )
+            counter(
+                "response_wire_bytes_total",
+                "Response body bytes transferred, before decompression.",
+                [
+                    (_labels(method=m, endpoint=e), v)
+                    for (m, e), v in sorted(self.wire_bytes_received.items())
+                ],
+            )
+            counter(
+                "retries_total",
+                "Retried API requests.",
+                [(_labels(method=m, endpoint=e), v) for (m, e), v in sorted(self.retries.items())],
+            )
+            counter(
+                "retry_delay_seconds_total",
+                "Time spent waiting before retries.",
+                [(_labels(method=m, endpoint=e), v) for (m, e), v in sorted(self.retry_delay.items())],
+            )
+            counter(
+                "cache_hits_total",
+                "Calls answered from a cache without an API request.",
+                [(_labels(endpoint=e), v) for e, v in sorted(self.cache_hits.items())],
+            )
+            counter(
+                "coalesced_requests_total",
+                "GETs served by an identical request already in flight.",
+                [(_labels(endpoint=e), v) for e, v in sorted(self.coalesced.items())],
+            )
+            counter(
+                "circuit_changes_total",
+                "Circuit breaker state changes, by the state entered.",
+                [(_labels(state=state), v) for state, v in sorted(self.circuit_changes.items())],
+            )
+            counter(
+                "hedged_requests_total",
+                "Slow GETs sent a second time.",
+                [(_labels(endpoint=e), v) for e, v in sorted(self.hedges.items())],
+            )
+            counter(
+                "hedge_wins_total",
+                "Hedged GETs answered by the second request.",
+                [(_labels(endpoint=e), v) for e, v in sorted(self.hedge_wins.items())],
+            )
+            histogram(
+                "parse_duration_seconds",
+                "Time spent parsing responses into schema models.",
+                [(_labels(endpoint=e), h) for e, h in sorted(self.parse_time.items())],
+            )
+            counter(
+                "parsed_objects_total",
+                "Schema models parsed from responses.",
+                [(_labels(endpoint=e), v) for e, v in sorted(self.parsed_objects.items())],
+            )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,47 @@
+"""
+Concurrent pagination over the Data API's page-numbered list endpoints
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Callable, Iterator, List, Tuple
+
+
+def iter_pages(
+    fetch_page: Callable[[int], List],
+    max_workers: int = 4,
+    start_page: int = 1,
+    executor: ThreadPoolExecutor = None,
+) -> Iterator[Tuple[int, List]]:
+    """
+    Yield (page number, items) in page order, fetching up to `max_workers` pages
+    ahead concurrently, until an empty page is returned.
+    """
+    if max_workers <= 1:
+        for page in count(start_page):
+            items = fetch_page(page)
+            if not items:
+                return
+            yield page, items
+        return
+
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = []
+    try:
+        next_page = start_page
+        while True:
+            while len(pending) < max_workers:
+                pending.append((next_page, executor.submit(fetch_page, next_page)))
+                next_page += 1
+            page, future = pending.pop(0)
+            items = future.result()
+            if not items:
+                return
+            yield page, items
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown(wait=False)
@@ -0,0 +1,104 @@
+"""
+Fetch a project together with all of its medias
+
+The medias can come from show_project, which embeds them all in one response, or
+from paging list_medias(project_id=...), which takes more requests but can fetch
+pages in parallel. fetch_project_tree estimates the time of each from the
+project's media_count and uses the cheaper one:
+
+    for project in client.list_all_projects():
+        tree = fetch_project_tree(client, project)
+        print(tree.name, len(tree.medias))
+"""
+
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+from wistia.client import WistiaClient
+from wistia.schema import Project
+
+log = logging.getLogger(__name__)
+
+SHOW_PROJECT = "show_project"
+LIST_MEDIAS = "list_medias"
+
+# Rough defaults for the cost model; override them with measured values
+ROUND_TRIP_SECONDS = 0.15
+BYTES_PER_MEDIA = 2000
+BYTES_PER_SECOND = 2_000_000  # per connection
+
+
+def page_count(media_count: int, per_page: int) -> int:
+    return max(math.ceil(media_count / per_page), 1)
+
+
+def choose_strategy(
+    media_count: int,
+    per_page: int = 100,
+    max_workers: int = 8,
+    round_trip_seconds: float = ROUND_TRIP_SECONDS,
+    bytes_per_media: int = BYTES_PER_MEDIA,
+    bytes_per_second: float = BYTES_PER_SECOND,
+) -> str:
+    """
+    SHOW_PROJECT or LIST_MEDIAS, whichever is expected to finish first. Both transfer
+    about the same bytes, but show_project sends them down one connection, while
+    list_medias spreads them over up to `max_workers` connections at the cost of
+    a round trip per wave of pages.
+    """
+    transfer_seconds = media_count * bytes_per_media / bytes_per_second
+    show_cost = round_trip_seconds + transfer_seconds
+
+    pages = page_count(media_count, per_page)
+    connections = min(pages, max_workers)
+    list_cost = math.ceil(pages / connections) * round_trip_seconds + transfer_seconds / connections
+    return SHOW_PROJECT if show_cost <= list_cost else LIST_MEDIAS
+
+
+def _list_project_medias(client, project: Project, per_page: int, max_workers: int) -> list:
+    def fetch_page(page):
+        return client.list_medias(project_id=project.id, page=page, per_page=per_page)
+
+    pages = page_count(project.media_count or 0, per_page)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # The page count is known, so fetch every page at once instead of probing
+        medias = [media for page in executor.map(fetch_page, range(1, pages + 1)) for media in page]
+    # Every page full: media_count may be stale, with medias added since the project
+    # was listed (or it's an exact multiple of per_page). Probe one page at a time.
+    while len(medias) == pages * per_page:
+        pages += 1
+        medias.extend(fetch_page(pages))
+    return medias
+
+
+def fetch_project_tree(
+    client: WistiaClient,
+    project: Union[Project, str],
+    per_page: int = 100,
+    max_workers: int = 8,
+) -> Project:
+    """
+    :param project: A Project from list_projects, whose media_count picks the
+        strategy, or a hashed_id (show_project is then always cheapest, as the
+        project itself has to be fetched anyway)
+    :return: The project with `medias` filled in
+    """
+    if isinstance(project, str):
+        strategy = SHOW_PROJECT
+    else:
+        strategy = choose_strategy(project.media_count or 0, per_page, max_workers)
+    log.info(f"Fetching project tree for {getattr(project, 'hashed_id', project)} with {strategy}")
+
+    if strategy == SHOW_PROJECT:
+        tree = client.show_project(project if isinstance(project, str) else project.hashed_id)
+        tree.medias = tree.medias or []
+        if len(tree.medias) >= (tree.media_count or 0):
+            return tree
+        # Fewer medias embedded than the project has; page through the rest
+        project = tree
+
+    tree = Project(project.to_primitive(), strict=False)
+    tree.medias = _list_project_medias(client, project, per_page, max_workers)
+    return tree
@@ -0,0 +1,27 @@
+"""
+pytest fixtures for code that uses WistiaClient
+
+Registered automatically when wistiapy is installed, through the pytest11 entry
+point, so it loads into every pytest session: it imports nothing of wistiapy's until
+the fixture is used. Without installing, add to conftest.py:
+
+    pytest_plugins = ["wistia.pytest_plugin"]
+
+Then:
+
+    def test_listing(fake_wistia_server):
+        client = fake_wistia_server.client()
+        assert len(client.list_medias(per_page=100)) == 100
+"""
+
+import pytest
+
+
+@pytest.fixture
+def fake_wistia_server():
+    """A running FakeWistiaServer seeded with 250 medias in 3 projects"""
+    from wistia.fakeserver import FakeWistiaServer
+
+    with FakeWistiaServer(random_seed=0) as server:
+        server.store.seed(media_count=250, project_count=3)
+        yield server
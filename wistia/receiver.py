@@ -0,0 +1,259 @@
+"""
+Framework-neutral webhook receiver
+
+Verifies the ``X-Wistia-Signature`` header, enqueues the raw delivery on a bounded
+queue and answers 200 straight away, so deliveries are processed outside of the
+request. When consumers fall behind and the queue reaches its high-water mark,
+the receiver sheds load with a 503 and a ``Retry-After`` header; Wistia retries
+failed deliveries.
+
+Usage (WSGI, e.g. gunicorn):
+
+    receiver = WebhookReceiver(secret_key=settings.WISTIA_WEBHOOK_SECRET_KEY)
+    application = receiver.wsgi_app
+
+Usage (ASGI, e.g. uvicorn):
+
+    application = receiver.asgi_app
+
+Consumer (e.g. a worker thread):
+
+    for delivery in receiver.iter_event_deliveries():
+        for event in delivery.events:
+            ...
+        receiver.task_done()
+
+A GET to ``metrics_path`` returns the queue depth and counters as JSON.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Iterator, NamedTuple, Optional
+
+from wistia.webhooks import parse_webhook_event_delivery, validate_webhook_signature
+
+log = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Wistia-Signature"
+
+
+class WebhookDelivery(NamedTuple):
+    body: bytes
+    signature: str
+    received_at: float
+
+
+class ReceiverStats(NamedTuple):
+    queue_depth: int
+    queue_maxsize: int
+    high_water_mark: int
+    accepted: int
+    shed: int
+    rejected_signature: int
+    rejected_other: int
+    malformed: int  # signed, but dropped by iter_event_deliveries as unparseable
+
+
+class WebhookReceiver:
+    def __init__(
+        self,
+        secret_key: str,
+        maxsize: int = 1000,
+        high_water_mark: Optional[int] = None,
+        retry_after: int = 30,
+        max_body_size: int = 1024 * 1024,
+        metrics_path: str = "/metrics",
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.secret_key = secret_key
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.high_water_mark = min(high_water_mark or maxsize, maxsize)
+        self.retry_after = retry_after
+        self.max_body_size = max_body_size
+        self.metrics_path = metrics_path
+
+        self._lock = threading.Lock()
+        self._accepted = 0
+        self._shed = 0
+        self._rejected_signature = 0
+        self._rejected_other = 0
+        self._malformed = 0
+
+    # Consumer side
+
+    def get(self, block: bool = True, timeout: float = None) -> WebhookDelivery:
+        return self.queue.get(block=block, timeout=timeout)
+
+    def task_done(self) -> None:
+        self.queue.task_done()
+
+    def iter_event_deliveries(self, timeout: float = None) -> Iterator:
+        """
+        Yield parsed EventDelivery objects as they arrive. Stops when no delivery
+        arrives within `timeout` seconds (never, if timeout is None).
+        Call task_done() once each delivery has been handled. Deliveries that
+        cannot be parsed are logged and skipped.
+        """
+        while True:
+            try:
+                delivery = self.get(timeout=timeout)
+            except queue.Empty:
+                return
+            try:
+                event_delivery = parse_webhook_event_delivery(delivery.body)
+            except ValueError:  # including pydantic's ValidationError
+                log.exception("Skipping malformed webhook delivery")
+                self._count("_malformed")
+                self.task_done()
+                continue
+            yield event_delivery
+
+    @property
+    def stats(self) -> ReceiverStats:
+        with self._lock:
+            return ReceiverStats(
+                queue_depth=self.queue.qsize(),
+                queue_maxsize=self.queue.maxsize,
+                high_water_mark=self.high_water_mark,
+                accepted=self._accepted,
+                shed=self._shed,
+                rejected_signature=self._rejected_signature,
+                rejected_other=self._rejected_other,
+                malformed=self._malformed,
+            )
+
+    # Producer side
+
+    def _count(self, counter_name: str) -> None:
+        with self._lock:
+            setattr(self, counter_name, getattr(self, counter_name) + 1)
+
+    def handle(self, method: str, path: str, body: bytes, signature: Optional[str]):
+        """
+        Core request handling shared by the WSGI and ASGI apps.
+        :return: (status code, list of header tuples, response body)
+        """
+        if method == "GET" and path == self.metrics_path:
+            payload = json.dumps(self.stats._asdict()).encode()
+            return 200, [("Content-Type", "application/json")], payload
+
+        if method != "POST":
+            self._count("_rejected_other")
+            return 405, [("Allow", "POST")], b""
+
+        if not signature or not validate_webhook_signature(
+            body, signature, self.secret_key
+        ):
+            self._count("_rejected_signature")
+            return 401, [], b""
+
+        if self.queue.qsize() >= self.high_water_mark:
+            self._count("_shed")
+            log.warning("Webhook queue at high-water mark - shedding delivery")
+            return 503, [("Retry-After", str(self.retry_after))], b""
+
+        try:
+            self.queue.put_nowait(WebhookDelivery(body, signature, time.time()))
+        except queue.Full:
+            self._count("_shed")
+            return 503, [("Retry-After", str(self.retry_after))], b""
+
+        self._count("_accepted")
+        return 200, [], b""
+
+    def _too_large(self):
+        self._count("_rejected_other")
+        return 413, [], b""
+
+    # WSGI
+
+    def wsgi_app(self, environ, start_response):
+        try:
+            content_length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            content_length = 0
+
+        if content_length > self.max_body_size:
+            status, headers, body = self._too_large()
+        else:
+            request_body = environ["wsgi.input"].read(content_length) if content_length else b""
+            status, headers, body = self.handle(
+                environ.get("REQUEST_METHOD", "GET"),
+                environ.get("PATH_INFO", "/"),
+                request_body,
+                environ.get("HTTP_X_WISTIA_SIGNATURE"),
+            )
+
+        headers = headers + [("Content-Length", str(len(body)))]
+        start_response(_status_line(status), headers)
+        return [body]
+
+    # ASGI
+
+    async def asgi_app(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        if scope["type"] != "http":
+            return
+
+        signature = None
+        for name, value in scope.get("headers", []):
+            if name.lower() == b"x-wistia-signature":
+                signature = value.decode("latin-1")
+
+        chunks = []
+        size = 0
+        too_large = False
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                too_large = True
+            elif chunk:
+                chunks.append(chunk)
+            more_body = message.get("more_body", False)
+
+        if too_large:
+            status, headers, body = self._too_large()
+        else:
+            status, headers, body = self.handle(
+                scope.get("method", "GET"), scope.get("path", "/"), b"".join(chunks), signature
+            )
+
+        headers = headers + [("Content-Length", str(len(body)))]
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+_REASONS = {
+    200: "OK",
+    401: "Unauthorized",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+def _status_line(status: int) -> str:
+    return f"{status} {_REASONS.get(status, '')}".rstrip()
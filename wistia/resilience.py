@@ -0,0 +1,231 @@
+"""
+Timeouts, deadlines, a circuit breaker and rate-limit retries for WistiaClient
+
+Every request has connect and read timeouts (WistiaClient(timeout=...)). A deadline
+bounds a whole operation made of several requests; each request's timeouts are
+clamped to the time left, and no request starts once it has passed:
+
+    with deadline(10):
+        projects = list(client.list_all_projects())  # DeadlineExceeded after 10s
+
+Deadlines nest (the earliest wins) and follow the calling context, so they reach
+requests made by generators consumed inside the block, but not requests made on
+other threads.
+
+A CircuitBreaker stops a client from queueing threads behind a degraded API. After
+`failure_threshold` consecutive failures (connection errors, timeouts and 5xx
+responses) it opens, and requests fail at once with CircuitOpenError. After
+`reset_timeout` seconds one trial request is let through: if it succeeds the
+circuit closes, otherwise it opens again. Requests cut short by the caller's own
+deadline, or interrupted (KeyboardInterrupt), are not counted either way.
+
+    client = WistiaClient(api_password, circuit_breaker=CircuitBreaker(), stale_cache_size=1000)
+
+With `stale_cache_size`, GETs that fail this way (including while the circuit is
+open) are answered with the last successful response for the same request, if any.
+
+Requests rejected with 429 Too Many Requests are retried, one request at a time,
+inside a retry_rate_limited block:
+
+    with retry_rate_limited(max_retries=3):
+        client.move_media(hashed_id, project_id)  # a 429 on the delete retries just the delete
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple, Optional, Tuple, Union
+
+import requests
+
+log = logging.getLogger(__name__)
+
+Timeout = Union[float, Tuple[float, float]]
+
+# Connect timeout slightly over a multiple of 3s, the TCP retransmission window
+DEFAULT_TIMEOUT = (3.05, 30.0)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class DeadlineExceeded(requests.Timeout):
+    """The deadline for an operation passed before it finished"""
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without making a request while the circuit breaker is open"""
+
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("wistia_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """Bound every request made in this block to finish within `seconds` in total"""
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(at, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None if there is none"""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def clamp_timeout(timeout: Optional[Timeout]) -> Optional[Timeout]:
+    """
+    `timeout` limited to the time left before the current deadline. Raises
+    DeadlineExceeded if it has already passed.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+    if timeout is None:
+        return left
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return (left if connect is None else min(connect, left), left if read is None else min(read, left))
+    return min(timeout, left)
+
+
+class RetryPolicy(NamedTuple):
+    max_retries: int
+    on_retry: Optional[Callable[[int, float], None]]  # called with (attempt, delay)
+
+
+_retry_policy: contextvars.ContextVar = contextvars.ContextVar("wistia_retry_policy", default=None)
+
+
+@contextmanager
+def retry_rate_limited(max_retries: int = 3, on_retry: Callable[[int, float], None] = None) -> Iterator[None]:
+    """Retry each request made in this block that is answered with a 429"""
+    token = _retry_policy.set(RetryPolicy(max_retries, on_retry))
+    try:
+        yield
+    finally:
+        _retry_policy.reset(token)
+
+
+def retry_policy() -> Optional[RetryPolicy]:
+    return _retry_policy.get()
+
+
+def retry_after(error: requests.HTTPError, default: float) -> float:
+    """Seconds to wait before retrying, from the response's Retry-After header"""
+    headers = getattr(error.response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", default))
+    except ValueError:
+        return default
+
+
+def is_failure(error: BaseException) -> bool:
+    """Whether an error means the API is unhealthy, as opposed to a bad request"""
+    if isinstance(error, requests.HTTPError):
+        status = getattr(error.response, "status_code", None)
+        return status is not None and status >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def ran_out_of_time(error: BaseException) -> bool:
+    """Whether a request failed because the caller's deadline passed"""
+    if isinstance(error, DeadlineExceeded):
+        return True
+    # A timeout clamped to the deadline fires as a plain requests Timeout
+    left = remaining()
+    return isinstance(error, requests.Timeout) and left is not None and left <= 0
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, on_change=None):
+        """
+        :param failure_threshold: Consecutive failures that open the circuit
+        :param reset_timeout: Seconds the circuit stays open before a trial request
+        :param on_change: Called with the new state whenever it changes
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_change = on_change
+        self.failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def _set_state(self, state: str) -> Optional[str]:
+        # Called with the lock held; returns the state to report, if it changed
+        if state == self._state:
+            return None
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        return state
+
+    def _report(self, state: Optional[str]) -> None:
+        if state is None:
+            return
+        log.log(logging.WARNING if state == OPEN else logging.INFO, f"Circuit breaker {state}")
+        if self.on_change is not None:
+            self.on_change(state)
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError unless a request may be made now"""
+        with self._lock:
+            changed = None
+            if self._state == OPEN:
+                retry_in = self.reset_timeout - (time.monotonic() - self._opened_at)
+                if retry_in > 0:
+                    raise CircuitOpenError(f"Circuit breaker open, retrying in {retry_in:.1f}s")
+                changed = self._set_state(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._trial_in_flight:
+                    raise CircuitOpenError("Circuit breaker half-open, trial request in flight")
+                self._trial_in_flight = True
+        self._report(changed)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            changed = self._set_state(CLOSED)
+        self._report(changed)
+
+    def record_error(self, error: BaseException) -> None:
+        if not isinstance(error, Exception) or ran_out_of_time(error):
+            # Interrupted, or out of the caller's own time: nothing learned about the API
+            with self._lock:
+                self._trial_in_flight = False
+            return
+        if not is_failure(error):
+            # The API answered; it's the request that was wrong
+            self.record_success()
+            return
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            changed = None
+            if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+                changed = self._set_state(OPEN)
+                self._opened_at = time.monotonic()
+        self._report(changed)
+
+    def __repr__(self):
+        return f"CircuitBreaker({self.state}, failures={self.failures})"
@@ -303,3 +303,71 @@ class CaptionTrack(models.Model):
     is_draft = types.BooleanType(
         required=False, metadata=dict(description="Presumably for internal use only")
     )
+
+
+class Stats(models.Model):
+    page_loads = types.IntType(
+        serialized_name="pageLoads",
+        required=True,
+        metadata=dict(
+            description=(
+                "The total number of times that the page containing the embedded video"
+                " has been loaded"
+            )
+        ),
+    )
+    visitors = types.IntType(
+        required=True,
+        metadata=dict(
+            description="The number of unique visitors to the page containing the embedded video"
+        ),
+    )
+    percent_of_visitors_clicking_play = types.FloatType(
+        serialized_name="percentOfVisitorsClickingPlay",
+        required=True,
+        metadata=dict(
+            description=(
+                "An integer between 0 and 100 that shows what percentage of the time"
+                " someone who saw the page containing the embedded video played the video"
+            )
+        ),
+    )
+    plays = types.IntType(
+        required=True,
+        metadata=dict(description="The total number of times that the video has been played"),
+    )
+    average_percent_watched = types.FloatType(
+        serialized_name="averagePercentWatched",
+        required=True,
+        metadata=dict(
+            description=(
+                "An integer between 0 and 100. It shows the average percentage of the"
+                " video that was watched over every time the video was played"
+            )
+        ),
+    )
+
+
+class MediaStats(models.Model):
+    """Wrapper for aggregated tracking statistics of a media"""
+
+    id = types.IntType(
+        required=True,
+        metadata=dict(
+            description="A unique numeric identifier for the media within the system."
+        ),
+    )
+    hashed_id = types.StringType(
+        required=True,
+        metadata=dict(description="A unique alphanumeric identifier for this media."),
+    )
+    name = types.StringType(
+        required=True, metadata=dict(description="The display name of the media.")
+    )
+    stats = types.ModelType(
+        Stats,
+        required=True,
+        metadata=dict(
+            description="An object representing the aggregated tracking statistics for the media"
+        ),
+    )
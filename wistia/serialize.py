@@ -0,0 +1,175 @@
+"""
+Fast serialisation of schema models to the API's wire format
+
+to_wire(model) gives the same dict as model.to_primitive() (serialized names such as
+fileSize, embedCode and mediaCount, dates in DATETIME_FORMAT), but from a conversion
+plan compiled once per model class instead of schematics' generic export loop.
+write_jsonl and write_json encode straight to a binary stream with the fastest
+installed codec:
+
+    with open("medias.jsonl", "wb") as output:
+        write_jsonl(output, client.list_medias(per_page=100))
+
+Clients created with keep_raw=True remember the payload each model was parsed from.
+While a model still holds the values it was parsed with, to_wire returns that
+payload itself, as the API sent it, without converting anything. Raw payloads keep
+the API's own formatting (e.g. "+00:00" offsets) and any fields the models don't
+define. Once a model is changed, it is serialised from its fields.
+"""
+
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from schematics.common import DEFAULT, DROP, NONEMPTY, NOT_NONE
+from schematics.models import Model
+from schematics.types import DateTimeType, ListType, ModelType
+from schematics.undefined import Undefined
+
+from wistia.codec import Codec, get_codec
+
+RAW_ATTRIBUTE = "_wire_raw"
+FINGERPRINT_ATTRIBUTE = "_wire_fingerprint"
+
+# (field name, serialized name, converter or None, export level, compound)
+_Step = Tuple[str, str, Optional[Callable[[Any], Any]], int, bool]
+_plans: Dict[Type[Model], List[_Step]] = {}
+
+
+def _converter(field) -> Optional[Callable[[Any], Any]]:
+    if isinstance(field, DateTimeType):
+        serialized_format = field.serialized_format
+        if callable(serialized_format):
+            return serialized_format
+        return lambda value: value.strftime(serialized_format)
+    if isinstance(field, ModelType):
+        return lambda value: _convert(value, _plan(type(value)))
+    if isinstance(field, ListType):
+        convert_item = _converter(field.field)
+        if convert_item is None:
+            return list
+        return lambda values: [None if item is None else convert_item(item) for item in values]
+    # Every other field type in wistia.schema stores its primitive value
+    return None
+
+
+def _plan(model_cls: Type[Model]) -> List[_Step]:
+    plan = _plans.get(model_cls)
+    if plan is None:
+        default_level = model_cls._options.export_level
+        plan = _plans[model_cls] = [
+            (
+                name,
+                field.serialized_name or name,
+                _converter(field),
+                field.export_level if field.export_level is not None else default_level,
+                field.is_compound,
+            )
+            for name, field in model_cls._schema.fields.items()
+        ]
+    return plan
+
+
+def _values(model: Model) -> dict:
+    # model._data is a ChainMap, slow to read key by key; flatten it once
+    values = {}
+    for mapping in reversed(model._data.maps):
+        values.update(mapping)
+    return values
+
+
+def _convert(model: Model, plan: List[_Step]) -> dict:
+    # The same rules as schematics.transforms.export_loop
+    data = _values(model)
+    wire = {}
+    for name, serialized_name, convert, level, compound in plan:
+        if level == DROP:
+            continue
+        value = data.get(name, Undefined)
+        if value is Undefined:
+            if level <= DEFAULT:
+                continue
+            value = None
+        elif value is None:
+            if level <= NOT_NONE:
+                continue
+        else:
+            if convert is not None:
+                value = convert(value)
+            if compound and len(value) == 0 and level <= NONEMPTY:
+                continue
+        wire[serialized_name] = value
+    return wire
+
+
+def _fingerprint(model: Model) -> list:
+    """The values a model holds, nested models and lists included, for comparison"""
+    values = _values(model)
+    parts = [tuple(values.values())]
+    for name, _, _, _, compound in _plan(type(model)):
+        if compound:
+            value = values.get(name)
+            if isinstance(value, Model):
+                parts.append(_fingerprint(value))
+            elif isinstance(value, list):
+                parts.append(
+                    tuple(_fingerprint(item) if isinstance(item, Model) else item for item in value)
+                )
+    return parts
+
+
+def attach_raw(model: Model, raw: dict) -> Model:
+    """Remember the payload `model` was parsed from, for to_wire to reuse"""
+    setattr(model, RAW_ATTRIBUTE, raw)
+    setattr(model, FINGERPRINT_ATTRIBUTE, _fingerprint(model))
+    return model
+
+
+def raw_payload(model: Model) -> Optional[dict]:
+    """The payload the model was parsed from, if it is known and still current"""
+    raw = getattr(model, RAW_ATTRIBUTE, None)
+    if raw is not None and _fingerprint(model) == getattr(model, FINGERPRINT_ATTRIBUTE):
+        return raw
+    return None
+
+
+def to_wire(model: Model, reuse_raw: bool = True) -> dict:
+    """
+    The model as a dict in the API's format. Don't modify the result: it may be the
+    model's raw payload.
+    """
+    if reuse_raw:
+        raw = raw_payload(model)
+        if raw is not None:
+            return raw
+    return _convert(model, _plan(type(model)))
+
+
+def _codec(codec: Union[Codec, str, None]) -> Codec:
+    return codec if isinstance(codec, Codec) else get_codec(codec)
+
+
+def write_jsonl(
+    stream: BinaryIO, models: Iterable[Model], codec: Union[Codec, str] = None, reuse_raw: bool = True
+) -> int:
+    """Write one JSON object per line to a binary stream, returning the number written"""
+    dumps = _codec(codec).dumps
+    written = 0
+    for model in models:
+        stream.write(dumps(to_wire(model, reuse_raw)) + b"\n")
+        written += 1
+    return written
+
+
+def write_json(
+    stream: BinaryIO, models: Iterable[Model], codec: Union[Codec, str] = None, reuse_raw: bool = True
+) -> int:
+    """Write a JSON array to a binary stream without building it in memory"""
+    dumps = _codec(codec).dumps
+    written = 0
+    stream.write(b"[")
+    for model in models:
+        if written:
+            stream.write(b",")
+        stream.write(dumps(to_wire(model, reuse_raw)))
+        written += 1
+    stream.write(b"]")
+    return written
@@ -0,0 +1,232 @@
+"""
+Catalog snapshots and diffs
+
+A snapshot records a content hash for each media in a compact binary file, sorted
+by hashed_id. Diffing two snapshots is a single streaming merge over both files,
+so it runs in linear time and constant memory whatever the catalog size:
+
+    take_snapshot(client, "monday.snap")
+    ...
+    take_snapshot(client, "tuesday.snap")
+    for change, hashed_id in iter_diff("monday.snap", "tuesday.snap"):
+        reindex(hashed_id)  # change is CREATED, UPDATED or DELETED
+
+Writing sorts in bounded memory too: records are sorted in chunks, spilled to
+temporary runs and merged.
+
+File format: the magic bytes b"WSNAP1\\n", then per media a one-byte key length,
+the UTF-8 hashed_id and a 16-byte BLAKE2b digest.
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import os
+import tempfile
+from itertools import count
+from typing import Iterable, Iterator, List, NamedTuple, Tuple, Union
+
+from wistia.client import WistiaClient
+from wistia.pagination import iter_pages
+from wistia.schema import Media
+from wistia.serialize import to_wire
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"WSNAP1\n"
+DIGEST_SIZE = 16
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+def media_digest(media: Union[Media, dict]) -> bytes:
+    """
+    A hash over all of a media's fields. Dicts are parsed into a Media first, so a raw
+    API payload, a to_primitive() dict and the model itself all hash the same: the
+    API's own date formatting and fields the model doesn't define don't count.
+    """
+    if isinstance(media, dict):
+        media = Media(media, strict=False)
+    record = to_wire(media, reuse_raw=False)
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+def _write_records(snapshot_file, records: Iterable[Tuple[str, bytes]]) -> int:
+    snapshot_file.write(MAGIC)
+    written = 0
+    for hashed_id, digest in records:
+        key = hashed_id.encode("utf-8")
+        if len(key) > 255:
+            raise ValueError(f"hashed_id too long for a snapshot: {hashed_id!r}")
+        snapshot_file.write(bytes((len(key),)) + key + digest)
+        written += 1
+    return written
+
+
+def read_snapshot(path: str) -> Iterator[Tuple[str, bytes]]:
+    """Yield (hashed_id, digest) in hashed_id order"""
+    with open(path, "rb") as snapshot_file:
+        if snapshot_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a media snapshot")
+        read = snapshot_file.read
+        while True:
+            length = read(1)
+            if not length:
+                return
+            record = read(length[0] + DIGEST_SIZE)
+            if len(record) != length[0] + DIGEST_SIZE:
+                raise ValueError(f"Snapshot {path} is truncated")
+            yield record[:-DIGEST_SIZE].decode("utf-8"), record[-DIGEST_SIZE:]
+
+
+class SnapshotWriter:
+    """
+    Collects (hashed_id, digest) records and writes them sorted when closed, holding
+    at most `chunk_size` records in memory. If a hashed_id is added more than once,
+    the last one wins.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 200_000):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._chunk: List[Tuple[str, int, bytes]] = []
+        self._runs: List[str] = []
+        self._sequence = count()
+        self._temp_dir = os.path.dirname(os.path.abspath(path))
+        self.written = None  # set once closed
+
+    def add(self, media: Union[Media, dict]) -> None:
+        hashed_id = media["hashed_id"] if isinstance(media, dict) else media.hashed_id
+        self.add_digest(hashed_id, media_digest(media))
+
+    def add_digest(self, hashed_id: str, digest: bytes) -> None:
+        self._chunk.append((hashed_id, next(self._sequence), digest))
+        if len(self._chunk) >= self.chunk_size:
+            self._spill()
+
+    def _spill(self) -> None:
+        self._chunk.sort()
+        run_file = tempfile.NamedTemporaryFile(
+            "wb", dir=self._temp_dir, prefix=".snapshot-run-", delete=False
+        )
+        with run_file:
+            # The sequence number is kept in the run, so duplicates merge in add order
+            _write_records(
+                run_file,
+                ((f"{hashed_id}\0{sequence:020d}", digest) for hashed_id, sequence, digest in self._chunk),
+            )
+        self._runs.append(run_file.name)
+        self._chunk = []
+
+    def _sorted_records(self) -> Iterator[Tuple[str, bytes]]:
+        if self._runs:
+            if self._chunk:
+                self._spill()
+            merged = (
+                (key.split("\0", 1)[0], digest)
+                for key, digest in heapq.merge(*(read_snapshot(run) for run in self._runs))
+            )
+        else:
+            self._chunk.sort()
+            merged = ((hashed_id, digest) for hashed_id, _, digest in self._chunk)
+        # Keep the last record for each hashed_id
+        previous = None
+        for hashed_id, digest in merged:
+            if previous is not None and previous[0] != hashed_id:
+                yield previous
+            previous = (hashed_id, digest)
+        if previous is not None:
+            yield previous
+
+    def _discard_runs(self) -> None:
+        for run in self._runs:
+            os.remove(run)
+        self._runs = []
+        self._chunk = []
+
+    def close(self) -> int:
+        """Write the snapshot, returning the number of medias in it"""
+        if self.written is not None:
+            return self.written
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "wb") as snapshot_file:
+                self.written = _write_records(snapshot_file, self._sorted_records())
+            os.replace(temp_path, self.path)
+        finally:
+            self._discard_runs()
+        return self.written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard_runs()
+
+
+def write_snapshot(path: str, medias: Iterable[Union[Media, dict]], chunk_size: int = 200_000) -> int:
+    with SnapshotWriter(path, chunk_size=chunk_size) as writer:
+        for media in medias:
+            writer.add(media)
+    return writer.written
+
+
+def take_snapshot(client: WistiaClient, path: str, per_page: int = 100, max_workers: int = 4) -> int:
+    """Snapshot every media in the account"""
+
+    def fetch_page(page):
+        return client.list_medias(sort_by="created", page=page, per_page=per_page)
+
+    medias = (
+        media
+        for _, page in iter_pages(fetch_page, max_workers=max_workers)
+        for media in page
+    )
+    written = write_snapshot(path, medias)
+    log.info(f"Snapshot of {written} medias written to {path}")
+    return written
+
+
+def iter_diff(old_path: str, new_path: str) -> Iterator[Tuple[str, str]]:
+    """Yield (CREATED/UPDATED/DELETED, hashed_id) in hashed_id order"""
+    old_records = read_snapshot(old_path)
+    new_records = read_snapshot(new_path)
+    old = next(old_records, None)
+    new = next(new_records, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            yield DELETED, old[0]
+            old = next(old_records, None)
+        elif old is None or new[0] < old[0]:
+            yield CREATED, new[0]
+            new = next(new_records, None)
+        else:
+            if old[1] != new[1]:
+                yield UPDATED, new[0]
+            old = next(old_records, None)
+            new = next(new_records, None)
+
+
+class SnapshotDiff(NamedTuple):
+    created: List[str]
+    updated: List[str]
+    deleted: List[str]
+
+
+def diff_snapshots(old_path: str, new_path: str) -> SnapshotDiff:
+    """
+    The changes between two snapshots as lists. Use iter_diff instead to handle
+    changes as they are found, without collecting them.
+    """
+    diff = SnapshotDiff([], [], [])
+    lists = {CREATED: diff.created, UPDATED: diff.updated, DELETED: diff.deleted}
+    for change, hashed_id in iter_diff(old_path, new_path):
+        lists[change].append(hashed_id)
+    return diff
@@ -0,0 +1,105 @@
+"""
+Bulk media stats with a freshness-window cache
+
+    cache = StatsCache(max_age=6 * 3600, path="media-stats.json")
+    result = fetch_media_stats(client, hashed_ids, cache=cache)
+    plays = {hashed_id: stats.stats.plays for hashed_id, stats in result.succeeded.items()}
+
+Stats fetched within `max_age` seconds are served from the cache without an API
+call; with a `path`, the cache is kept on disk so separate processes (e.g. each
+morning's dashboard refreshes) share it.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Iterable, Optional
+
+from wistia.batch import BatchExecutor, BatchResult
+from wistia.client import WistiaClient
+from wistia.schema import MediaStats
+
+log = logging.getLogger(__name__)
+
+STATS_ENDPOINT = "medias/{id}/stats.json"
+
+
+class StatsCache:
+    def __init__(self, max_age: float = 3600, path: str = None):
+        self.max_age = max_age
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}  # hashed_id -> (fetched_at, stats primitive)
+        if path and os.path.exists(path):
+            with open(path) as cache_file:
+                self._entries = {
+                    hashed_id: tuple(entry) for hashed_id, entry in json.load(cache_file).items()
+                }
+
+    def get(self, hashed_id: str) -> Optional[MediaStats]:
+        with self._lock:
+            entry = self._entries.get(hashed_id)
+        if entry is None or time.time() - entry[0] > self.max_age:
+            return None
+        return MediaStats(entry[1], strict=False)
+
+    def put(self, hashed_id: str, stats: MediaStats, fetched_at: float = None) -> None:
+        if fetched_at is None:
+            fetched_at = time.time()
+        with self._lock:
+            self._entries[hashed_id] = (fetched_at, stats.to_primitive())
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            fresh = {
+                hashed_id: entry
+                for hashed_id, entry in self._entries.items()
+                if now - entry[0] <= self.max_age
+            }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as cache_file:
+            json.dump(fresh, cache_file)
+        os.replace(temp_path, self.path)
+
+
+def fetch_media_stats(
+    client: WistiaClient,
+    hashed_ids: Iterable[str],
+    cache: StatsCache = None,
+    executor: BatchExecutor = None,
+) -> BatchResult:
+    """
+    Stats for many medias, fetched concurrently under the rate limit.
+    :return: BatchResult with MediaStats per hashed_id in `succeeded` and per-item
+        errors in `failed`
+    """
+    hashed_ids = list(dict.fromkeys(hashed_ids))
+    cached = {}
+    if cache is not None:
+        for hashed_id in hashed_ids:
+            stats = cache.get(hashed_id)
+            if stats is not None:
+                cached[hashed_id] = stats
+                client._instrument("on_cache_hit", STATS_ENDPOINT)
+
+    missing = [hashed_id for hashed_id in hashed_ids if hashed_id not in cached]
+    log.info(f"Media stats: {len(cached)} cached, {len(missing)} to fetch")
+    if missing:
+        executor = executor or BatchExecutor(client)
+        result = executor.run("show_media_stats", missing)
+    else:
+        result = BatchResult()
+
+    if cache is not None:
+        for hashed_id, stats in result.succeeded.items():
+            cache.put(hashed_id, stats)
+        cache.save()
+
+    result.succeeded.update(cached)
+    result.cache_hits = len(cached)
+    return result
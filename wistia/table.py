@@ -0,0 +1,446 @@
+"""
+Columnar storage for large numbers of medias
+
+A Media model with its nested Asset, Thumbnail and ProjectReference models costs a
+few kilobytes; a million of them do not fit comfortably in a reporting job.
+MediaTable keeps the same data in typed `array` columns (with a flattened asset
+table alongside), at a small fraction of the memory:
+
+    table = MediaTable()
+    for page in pages_of_medias:  # e.g. client.list_medias(page=...) results
+        table.extend(page)
+    ready = table.filter(status="ready", min_duration=60)
+    print(ready.duration_by_project(), table.count_by_status())
+    for row in ready:  # MediaRow views, nothing is copied
+        print(row.hashed_id, row.duration)
+
+Filters and aggregates use NumPy when it is installed, viewing the columns
+in place, and plain Python loops otherwise.
+"""
+
+import math
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from wistia.schema import Media
+
+MISSING_INT = -1
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class _Categories:
+    """Small-integer codes for a column of repeated strings"""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self._codes = {None: 0}
+
+    def code(self, value: Optional[str]) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _get(record, field_name: str, serialized_name: str = None):
+    if isinstance(record, dict):
+        return record.get(serialized_name or field_name)
+    return getattr(record, field_name, None)
+
+
+def _epoch(value) -> float:
+    if value is None:
+        return math.nan
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _datetime(epoch: float) -> Optional[datetime]:
+    return None if math.isnan(epoch) else datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+def _int_or_missing(value) -> int:
+    return MISSING_INT if value is None else int(value)
+
+
+class AssetRow:
+    """A view of one row of a MediaTable's asset table"""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "MediaTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def url(self) -> str:
+        return self._table.asset_url[self._index]
+
+    @property
+    def type(self) -> str:
+        return self._table._asset_types.values[self._table.asset_type[self._index]]
+
+    @property
+    def content_type(self) -> str:
+        return self._table._content_types.values[self._table.asset_content_type[self._index]]
+
+    @property
+    def file_size(self) -> Optional[int]:
+        value = self._table.asset_file_size[self._index]
+        return None if value == MISSING_INT else value
+
+    @property
+    def width(self) -> Optional[int]:
+        value = self._table.asset_width[self._index]
+        return None if value == MISSING_INT else value
+
+    @property
+    def height(self) -> Optional[int]:
+        value = self._table.asset_height[self._index]
+        return None if value == MISSING_INT else value
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "width": self.width,
+            "height": self.height,
+            "fileSize": self.file_size,
+            "contentType": self.content_type,
+            "type": self.type,
+        }
+
+
+class MediaRow:
+    """A view of one row of a MediaTable, read straight from its columns"""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "MediaTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def id(self) -> int:
+        return self._table.id[self._index]
+
+    @property
+    def hashed_id(self) -> str:
+        return self._table.hashed_id[self._index]
+
+    @property
+    def name(self) -> str:
+        return self._table.name[self._index]
+
+    @property
+    def type(self) -> str:
+        return self._table._types.values[self._table.type[self._index]]
+
+    @property
+    def status(self) -> str:
+        return self._table._statuses.values[self._table.status[self._index]]
+
+    @property
+    def project_id(self) -> Optional[int]:
+        value = self._table.project_id[self._index]
+        return None if value == MISSING_INT else value
+
+    @property
+    def duration(self) -> Optional[float]:
+        value = self._table.duration[self._index]
+        return None if math.isnan(value) else value
+
+    @property
+    def created(self) -> Optional[datetime]:
+        return _datetime(self._table.created[self._index])
+
+    @property
+    def updated(self) -> Optional[datetime]:
+        return _datetime(self._table.updated[self._index])
+
+    @property
+    def assets(self) -> List[AssetRow]:
+        offsets = self._table.asset_offsets
+        return [
+            AssetRow(self._table, index)
+            for index in range(offsets[self._index], offsets[self._index + 1])
+        ]
+
+    def to_dict(self) -> dict:
+        """The media in the API's (serialized) field names"""
+        project = None
+        if self.project_id is not None:
+            project_name, project_hashed_id = self._table.projects[self.project_id]
+            project = {"id": self.project_id, "name": project_name, "hashed_id": project_hashed_id}
+        return {
+            "id": self.id,
+            "name": self.name,
+            "hashed_id": self.hashed_id,
+            "project": project,
+            "type": self.type,
+            "status": self.status,
+            "duration": self.duration,
+            "created": self.created,
+            "updated": self.updated,
+            "assets": [asset.to_dict() for asset in self.assets],
+        }
+
+    def to_media(self) -> Media:
+        """A Media model with the fields the table keeps"""
+        return Media(self.to_dict(), strict=False)
+
+    def __repr__(self):
+        return f"MediaRow({self.hashed_id!r}, {self.name!r})"
+
+
+class MediaTable:
+    """
+    Media fields in typed columns: `id`, `project_id` (-1 when unset), `duration`
+    (NaN when unset), `created` and `updated` (POSIX timestamps, NaN when unset),
+    and `type` and `status` as codes into their categories. `hashed_id` and `name`
+    are plain lists. Assets are stored flattened, with media row i owning asset rows
+    asset_offsets[i] to asset_offsets[i + 1].
+    """
+
+    def __init__(self, medias: Iterable[Union[Media, dict]] = (), use_numpy: bool = None):
+        """
+        :param medias: Media models (e.g. from list_medias) or their primitive dicts
+        :param use_numpy: Use NumPy for filters and aggregates; default: if installed
+        """
+        self._np = _numpy() if use_numpy is not False else None
+        if use_numpy and self._np is None:
+            raise ImportError("use_numpy=True requires NumPy to be installed")
+        self.id = array("q")
+        self.hashed_id: List[str] = []
+        self.name: List[str] = []
+        self.project_id = array("q")
+        self.type = array("B")
+        self.status = array("B")
+        self.duration = array("d")
+        self.created = array("d")
+        self.updated = array("d")
+        self.projects: Dict[int, tuple] = {}  # id -> (name, hashed_id)
+        self._types = _Categories()
+        self._statuses = _Categories()
+
+        self.asset_offsets = array("q", [0])
+        self.asset_url: List[str] = []
+        self.asset_type = array("B")
+        self.asset_content_type = array("B")
+        self.asset_file_size = array("q")
+        self.asset_width = array("l")
+        self.asset_height = array("l")
+        self._asset_types = _Categories()
+        self._content_types = _Categories()
+
+        self.extend(medias)
+
+    # Building
+
+    def append(self, media: Union[Media, dict]) -> None:
+        self.id.append(_get(media, "id"))
+        self.hashed_id.append(_get(media, "hashed_id"))
+        self.name.append(_get(media, "name"))
+        self.type.append(self._types.code(_get(media, "type")))
+        self.status.append(self._statuses.code(_get(media, "status")))
+        duration = _get(media, "duration")
+        self.duration.append(math.nan if duration is None else duration)
+        self.created.append(_epoch(_get(media, "created")))
+        self.updated.append(_epoch(_get(media, "updated")))
+
+        project = _get(media, "project")
+        if project is None:
+            self.project_id.append(MISSING_INT)
+        else:
+            project_id = _get(project, "id")
+            self.project_id.append(project_id)
+            if project_id not in self.projects:
+                self.projects[project_id] = (_get(project, "name"), _get(project, "hashed_id"))
+
+        for asset in _get(media, "assets") or ():
+            self.asset_url.append(_get(asset, "url"))
+            self.asset_type.append(self._asset_types.code(_get(asset, "type")))
+            self.asset_content_type.append(
+                self._content_types.code(_get(asset, "content_type", "contentType"))
+            )
+            self.asset_file_size.append(_int_or_missing(_get(asset, "file_size", "fileSize")))
+            self.asset_width.append(_int_or_missing(_get(asset, "width")))
+            self.asset_height.append(_int_or_missing(_get(asset, "height")))
+        self.asset_offsets.append(len(self.asset_url))
+
+    def extend(self, medias: Iterable[Union[Media, dict]]) -> None:
+        for media in medias:
+            self.append(media)
+
+    # Rows
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __getitem__(self, index: int) -> MediaRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("MediaTable index out of range")
+        return MediaRow(self, index)
+
+    def __iter__(self) -> Iterator[MediaRow]:
+        for index in range(len(self)):
+            yield MediaRow(self, index)
+
+    def rows(self, indices: Sequence[int]) -> List[MediaRow]:
+        return [MediaRow(self, int(index)) for index in indices]
+
+    def take(self, indices: Sequence[int]) -> "MediaTable":
+        """A new table with the given rows, in the given order"""
+        table = MediaTable(use_numpy=self._np is not None)
+        table.projects = dict(self.projects)
+        table._types = self._types
+        table._statuses = self._statuses
+        table._asset_types = self._asset_types
+        table._content_types = self._content_types
+        for index in indices:
+            index = int(index)
+            table.id.append(self.id[index])
+            table.hashed_id.append(self.hashed_id[index])
+            table.name.append(self.name[index])
+            table.project_id.append(self.project_id[index])
+            table.type.append(self.type[index])
+            table.status.append(self.status[index])
+            table.duration.append(self.duration[index])
+            table.created.append(self.created[index])
+            table.updated.append(self.updated[index])
+            start, end = self.asset_offsets[index], self.asset_offsets[index + 1]
+            table.asset_url.extend(self.asset_url[start:end])
+            table.asset_type.extend(self.asset_type[start:end])
+            table.asset_content_type.extend(self.asset_content_type[start:end])
+            table.asset_file_size.extend(self.asset_file_size[start:end])
+            table.asset_width.extend(self.asset_width[start:end])
+            table.asset_height.extend(self.asset_height[start:end])
+            table.asset_offsets.append(len(table.asset_url))
+        return table
+
+    # Columns
+
+    def column(self, name: str):
+        """
+        A column as a NumPy array sharing the table's memory (don't append to the
+        table while holding it), or the underlying array/list without NumPy
+        """
+        values = getattr(self, name)
+        if self._np is None or isinstance(values, list):
+            return values
+        return self._np.frombuffer(values, dtype=values.typecode)
+
+    def status_code(self, status: str) -> Optional[int]:
+        return self._statuses._codes.get(status)
+
+    def type_code(self, media_type: str) -> Optional[int]:
+        return self._types._codes.get(media_type)
+
+    # Filters and aggregates
+
+    def where(
+        self,
+        status: str = None,
+        type: str = None,
+        project_id: int = None,
+        min_duration: float = None,
+        max_duration: float = None,
+        created_after: datetime = None,
+        created_before: datetime = None,
+    ) -> Sequence[int]:
+        """Indices of the rows matching all the given conditions"""
+        conditions = []  # (column name, test)
+        if status is not None:
+            code = self.status_code(status)
+            conditions.append(("status", "==", -1 if code is None else code))
+        if type is not None:
+            code = self.type_code(type)
+            conditions.append(("type", "==", -1 if code is None else code))
+        if project_id is not None:
+            conditions.append(("project_id", "==", project_id))
+        if min_duration is not None:
+            conditions.append(("duration", ">=", min_duration))
+        if max_duration is not None:
+            conditions.append(("duration", "<=", max_duration))
+        if created_after is not None:
+            conditions.append(("created", ">=", _epoch(created_after)))
+        if created_before is not None:
+            conditions.append(("created", "<", _epoch(created_before)))
+
+        if self._np is not None:
+            np = self._np
+            mask = np.ones(len(self), dtype=bool)
+            for name, operator, value in conditions:
+                values = self.column(name)
+                if operator == "==":
+                    mask &= values == value
+                elif operator == ">=":
+                    mask &= values >= value
+                elif operator == "<=":
+                    mask &= values <= value
+                else:
+                    mask &= values < value
+            return np.flatnonzero(mask)
+
+        tests = {
+            "==": lambda a, b: a == b,
+            ">=": lambda a, b: a >= b,
+            "<=": lambda a, b: a <= b,
+            "<": lambda a, b: a < b,
+        }
+        indices = range(len(self))
+        for name, operator, value in conditions:
+            values, test = getattr(self, name), tests[operator]
+            indices = [index for index in indices if test(values[index], value)]
+        return list(indices)
+
+    def filter(self, **conditions) -> "MediaTable":
+        """A new table with the rows matching where(**conditions)"""
+        return self.take(self.where(**conditions))
+
+    def count_by_status(self) -> Dict[str, int]:
+        if self._np is not None:
+            counts = self._np.bincount(self.column("status"), minlength=len(self._statuses.values))
+            return {
+                status: int(count)
+                for status, count in zip(self._statuses.values, counts)
+                if count
+            }
+        counts = [0] * len(self._statuses.values)
+        for code in self.status:
+            counts[code] += 1
+        return {status: count for status, count in zip(self._statuses.values, counts) if count}
+
+    def duration_by_project(self) -> Dict[Optional[int], float]:
+        """Total duration in seconds per project_id (None for medias without one)"""
+        if self._np is not None:
+            np = self._np
+            project_ids, inverse = np.unique(self.column("project_id"), return_inverse=True)
+            totals = np.bincount(inverse, weights=np.nan_to_num(self.column("duration")))
+            return {
+                (None if project_id == MISSING_INT else int(project_id)): float(total)
+                for project_id, total in zip(project_ids, totals)
+            }
+        totals = {}
+        for project_id, duration in zip(self.project_id, self.duration):
+            key = None if project_id == MISSING_INT else project_id
+            totals[key] = totals.get(key, 0.0) + (0.0 if math.isnan(duration) else duration)
+        return totals
+
+    def total_duration(self) -> float:
+        if self._np is not None:
+            return float(self._np.nansum(self.column("duration")))
+        return math.fsum(duration for duration in self.duration if not math.isnan(duration))
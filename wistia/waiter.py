@@ -0,0 +1,183 @@
+"""
+Wait for uploaded medias to finish processing
+
+    for media in wait_until_ready(client, hashed_ids, timeout=1800):
+        print(media.hashed_id, media.status)  # "ready" or "failed", as each one settles
+
+Pending medias are polled together with list_medias(hashed_ids=...), up to
+`batch_size` per request. Each media is polled again after an interval derived
+from its processing progress: half the time its progress rate predicts it still
+needs, or an exponential backoff while that can't be estimated, within
+[min_interval, max_interval].
+
+With webhooks set up, a media.ready, media.failed or media.deleted event makes
+the waiter check that media straight away instead of at its next poll:
+
+    waiter = MediaWaiter(client, hashed_ids)
+    # in the webhook consumer thread:
+    waiter.handle_event_delivery(parse_webhook_event_delivery(body))
+    # in the waiting thread:
+    for media in waiter.wait(timeout=1800):
+        ...
+"""
+
+import logging
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional
+
+import requests
+
+from wistia.client import WistiaClient
+from wistia.schema import Media
+
+log = logging.getLogger(__name__)
+
+SETTLED_STATUSES = {"ready", "failed"}
+SETTLING_EVENTS = {"media.ready", "media.failed", "media.deleted"}
+
+
+class WaitTimeout(TimeoutError):
+    def __init__(self, pending: List[str]):
+        super().__init__(f"{len(pending)} medias still processing")
+        self.pending = pending
+
+
+class _Tracked:
+    __slots__ = ("next_poll_at", "interval", "progress", "progress_at")
+
+    def __init__(self):
+        self.next_poll_at = 0.0
+        self.interval: Optional[float] = None
+        self.progress: Optional[float] = None
+        self.progress_at: Optional[float] = None
+
+
+class MediaWaiter:
+    def __init__(
+        self,
+        client: WistiaClient,
+        hashed_ids: Iterable[str],
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        backoff: float = 1.5,
+        batch_size: int = 100,
+    ):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.missing: List[str] = []  # deleted while waiting
+        self._pending = {hashed_id: _Tracked() for hashed_id in hashed_ids}
+        self._notified = set()
+        self._condition = threading.Condition()
+
+    @property
+    def pending(self) -> List[str]:
+        with self._condition:
+            return list(self._pending)
+
+    def notify(self, hashed_id: str) -> None:
+        """Check this media at the next opportunity. Thread-safe."""
+        with self._condition:
+            if hashed_id in self._pending:
+                self._notified.add(hashed_id)
+                self._condition.notify_all()
+
+    def handle_event_delivery(self, delivery) -> None:
+        """Notify for the settling events in a webhook EventDelivery"""
+        for event in delivery.events:
+            if event.type in SETTLING_EVENTS:
+                self.notify(event.payload.media.id)
+
+    def _due(self, now: float) -> List[str]:
+        # Poll medias that are due soon along with those due now, to fill batches
+        horizon = now + self.min_interval / 2
+        with self._condition:
+            due = [
+                hashed_id
+                for hashed_id, tracked in self._pending.items()
+                if tracked.next_poll_at <= horizon or hashed_id in self._notified
+            ]
+            self._notified.clear()
+        return due
+
+    def _fetch(self, hashed_ids: List[str]) -> dict:
+        medias = {}
+        for start in range(0, len(hashed_ids), self.batch_size):
+            batch = hashed_ids[start:start + self.batch_size]
+            requested = set(batch)
+            for media in self.client.list_medias(hashed_ids=batch, per_page=len(batch)):
+                # Should the filter be ignored, other medias come back too
+                if media.hashed_id in requested:
+                    medias[media.hashed_id] = media
+        for hashed_id in hashed_ids:
+            if hashed_id not in medias:
+                # Not in the list response (e.g. the filter isn't supported); ask directly
+                try:
+                    medias[hashed_id] = self.client.show_media(hashed_id)
+                except requests.HTTPError as error:
+                    if getattr(error.response, "status_code", None) != 404:
+                        raise
+                    medias[hashed_id] = None
+        return medias
+
+    def _schedule(self, tracked: _Tracked, media: Media, now: float) -> None:
+        progress = media.progress
+        interval = None
+        if progress is not None and tracked.progress is not None and progress > tracked.progress:
+            rate = (progress - tracked.progress) / (now - tracked.progress_at)
+            interval = (1.0 - progress) / rate / 2
+        elif tracked.interval is not None:
+            interval = tracked.interval * self.backoff
+        else:
+            interval = self.min_interval
+        if progress is not None and progress != tracked.progress:
+            tracked.progress, tracked.progress_at = progress, now
+        tracked.interval = min(max(interval, self.min_interval), self.max_interval)
+        tracked.next_poll_at = now + tracked.interval
+
+    def wait(self, timeout: float = None) -> Iterator[Media]:
+        """
+        Yield each media once its status is ready or failed.
+        Raises WaitTimeout, listing the medias still pending, after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                raise WaitTimeout(self.pending)
+            due = self._due(now)
+            if not due:
+                with self._condition:
+                    wake_at = min(tracked.next_poll_at for tracked in self._pending.values())
+                    if deadline is not None:
+                        wake_at = min(wake_at, deadline)
+                    self._condition.wait_for(lambda: self._notified, timeout=wake_at - now)
+                continue
+
+            medias = self._fetch(due)
+            now = time.monotonic()
+            settled = []
+            with self._condition:
+                for hashed_id, media in medias.items():
+                    if media is None:
+                        log.warning(f"Media {hashed_id} was deleted while waiting for it")
+                        self.missing.append(hashed_id)
+                        del self._pending[hashed_id]
+                    elif media.status in SETTLED_STATUSES:
+                        settled.append(media)
+                        del self._pending[hashed_id]
+                    else:
+                        self._schedule(self._pending[hashed_id], media, now)
+            yield from settled
+
+
+def wait_until_ready(
+    client: WistiaClient, hashed_ids: Iterable[str], timeout: float = None, **waiter_options
+) -> Iterator[Media]:
+    """
+    Yield each media as it finishes processing; see MediaWaiter for the options.
+    """
+    return MediaWaiter(client, hashed_ids, **waiter_options).wait(timeout)
@@ -22,138 +22,34 @@ Content-Length	    The byte length of the request body.
 
 import hashlib
 import hmac
-from datetime import datetime
-from typing_extensions import Annotated, Literal
-from typing import (
-    List,
-    Optional,
-    Union,
-)
+from typing import TYPE_CHECKING, Union
 
-import uuid as uuid
+if TYPE_CHECKING:
+    from wistia._webhook_models import EventDelivery
 
-# noinspection PyUnresolvedReferences
-from pydantic import (
-    BaseModel,
-    Field,
-    ValidationError,
-)
 
-media_event_type_names = Literal[
-    "media.created",
-    "media.processing",
-    "media.ready",
-    "media.failed",
-    "media.updated",
-    "media.deleted",
-]
+def __getattr__(name):
+    # The pydantic models are only imported when first used, so that processes which
+    # only verify signatures don't pay for importing pydantic
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from wistia import _webhook_models
 
+    try:
+        return getattr(_webhook_models, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
 
-viewing_event_type_names = Literal[
-    "viewing_session.play",
-    "viewing_session.percent_watched",
-    "viewing_session.turnstile.converted",
-    "viewing_session.call_to_action.converted",
-    "viewing_session.annotation.converted",
-]
 
-
-class Thumbnail(BaseModel):
-    url: str
-
-
-class MediaInfo(BaseModel):
-    id: str
-    name: str
-    url: str
-    duration: Optional[float] = None
-    thumbnail: Thumbnail
-
-
-class MediaReference(BaseModel):
-    id: str
-
-
-class MediaPayload(BaseModel):
-    media: MediaInfo
-
-
-class MediaDeletedPayload(MediaPayload):
-    media: MediaReference
-
-
-class MediaUpdatedPayload(BaseModel):
-    media: MediaInfo
-    previous_attributes: dict = Field(default_factory=dict)
-
-
-class MediaEvent(BaseModel):
-    type: media_event_type_names
-    uuid: str
-    payload: Union[MediaPayload, MediaUpdatedPayload, MediaDeletedPayload]
-    metadata: dict
-    generated_at: datetime
-
-
-class MediaCreatedEvent(MediaEvent):
-    type: Literal["media.created"]
-    payload: MediaPayload
-
-
-class MediaProcessingEvent(MediaEvent):
-    type: Literal["media.processing"]
-    payload: MediaPayload
-
-
-class MediaReadyEvent(MediaEvent):
-    type: Literal["media.ready"]
-    payload: MediaPayload
-
-
-class MediaFailedEvent(MediaEvent):
-    type: Literal["media.failed"]
-    payload: MediaPayload
-
-
-class MediaUpdatedEvent(MediaEvent):
-    type: Literal["media.updated"]
-    payload: MediaUpdatedPayload
-
-
-class MediaDeletedEvent(MediaEvent):
-    type: Literal["media.deleted"]
-    payload: MediaDeletedPayload
-
-
-MediaEvent = Annotated[
-    Union[
-        MediaCreatedEvent,
-        MediaProcessingEvent,
-        MediaReadyEvent,
-        MediaFailedEvent,
-        MediaUpdatedEvent,
-        MediaDeletedEvent,
-    ],
-    Field(discriminator="type"),
-]
-
-
-class HookInfo(BaseModel):
-    uuid: uuid.UUID
-
-
-class EventDelivery(BaseModel):
-    hook: HookInfo
-    events: List[MediaEvent]
-
-
-def parse_webhook_event_delivery(event_data: Union[str, bytes, dict]) -> EventDelivery:
+def parse_webhook_event_delivery(event_data: Union[str, bytes, dict]) -> "EventDelivery":
     """
     Parse the event data from a Wistia webhook request.
     Raises ValidationError if the event data is invalid.
     :param event_data: Can be a JSON string, a bytes object, or a dict.
     :return: EventDelivery
     """
+    from wistia._webhook_models import EventDelivery
+
     if isinstance(event_data, dict):
         return EventDelivery(**event_data)
     else: